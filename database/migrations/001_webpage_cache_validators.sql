@@ -0,0 +1,7 @@
+USE siterummage;
+
+-- Cache validators returned by the last successful scan of a webpage, they
+-- are sent with rescans so unchanged pages can be answered with a 304.
+ALTER TABLE webpage
+    ADD COLUMN etag VARCHAR(512) DEFAULT NULL,
+    ADD COLUMN last_modified VARCHAR(64) DEFAULT NULL;
@@ -0,0 +1,32 @@
+USE siterummage;
+
+-- Hash of the full url of a webpage, url_path is too wide to index so the
+-- unique index is on the hash.  It is a generated column so it can never
+-- disagree with domain and url_path.
+ALTER TABLE webpage
+    ADD COLUMN url_hash BINARY(32)
+        AS (UNHEX(SHA2(CONCAT(domain, url_path), 256))) STORED NOT NULL,
+    ADD INDEX webpage_url_hash_lookup (url_hash);
+
+-- The old check then insert could add the same webpage more than once, keep
+-- the first of each before the index is made unique.
+DELETE md FROM webpage_metadata AS md
+    JOIN webpage AS wp ON md.webpage_id = wp.id
+    JOIN webpage AS first_wp
+        ON first_wp.url_hash = wp.url_hash AND first_wp.id < wp.id;
+
+DELETE wp FROM webpage AS wp
+    JOIN webpage AS first_wp
+        ON first_wp.url_hash = wp.url_hash AND first_wp.id < wp.id;
+
+DELETE md FROM webpage_metadata AS md
+    JOIN webpage_metadata AS first_md
+        ON first_md.webpage_id = md.webpage_id AND first_md.id < md.id;
+
+ALTER TABLE webpage
+    DROP INDEX webpage_url_hash_lookup,
+    ADD UNIQUE KEY webpage_url_hash (url_hash);
+
+-- A webpage has one metadata row, this lets it be written with an upsert.
+ALTER TABLE webpage_metadata
+    ADD UNIQUE KEY webpage_metadata_webpage_id (webpage_id);
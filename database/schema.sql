@@ -9,7 +9,12 @@ CREATE TABLE webpage
     last_scanned TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     read_successful BOOLEAN NOT NULL,
     page_hash VARCHAR(32) NOT NULL,
-    PRIMARY KEY(id)
+    etag VARCHAR(512) DEFAULT NULL,
+    last_modified VARCHAR(64) DEFAULT NULL,
+    url_hash BINARY(32)
+        AS (UNHEX(SHA2(CONCAT(domain, url_path), 256))) STORED NOT NULL,
+    PRIMARY KEY(id),
+    UNIQUE KEY webpage_url_hash (url_hash)
 ) DEFAULT CHARACTER SET utf8;
 
 CREATE TABLE webpage_metadata
@@ -20,5 +25,6 @@ CREATE TABLE webpage_metadata
     abstract VARCHAR(4096) NOT NULL,
 
     PRIMARY KEY(id),
+    UNIQUE KEY webpage_metadata_webpage_id (webpage_id),
     FOREIGN KEY(webpage_id) REFERENCES webpage(id)
 ) DEFAULT CHARACTER SET utf8;
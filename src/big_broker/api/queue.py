@@ -0,0 +1,183 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import json
+from quart import request
+import common.api_contracts.processing_queue.queue as schemas
+from common.api_utils import ApiUtils
+from common.http_status_code import HTTPStatusCode
+from common.logger import LogType
+from common.mime_type import MIMEType
+from common.url_utils import UrlUtils
+
+class ApiQueue:
+    ''' Implementation of the url queue api endpoints '''
+    __slots__ = ['_configuration', '_db_interface', '_interface', '_logger',
+                 '_robots_filter', '_seen_url_filter', '_url_scorer']
+
+    header_auth_key = 'AuthKey'
+
+    def __init__(self, interface_instance, configuration, db_interface,
+                 logger, url_scorer, seen_url_filter=None, robots_filter=None):
+        #pylint: disable=too-many-arguments
+        self._interface = interface_instance
+        self._configuration = configuration
+        self._db_interface = db_interface
+        self._logger = logger
+        self._url_scorer = url_scorer
+        self._seen_url_filter = seen_url_filter
+        self._robots_filter = robots_filter
+
+        # Add route : /queue/add
+        self._interface.add_url_rule('/queue/add',
+            methods = ['POST'], view_func = self._add_to_queue)
+
+    async def _add_to_queue(self) -> None:
+        """!@brief Implementation of the /queue/add endpoint, links are
+                   converted to canonical urls and new links already seen
+                   only have their inlink count updated.  Links robots.txt
+                   disallows are dropped if the robots filter is enabled.
+                   Each remaining link is scored and all of the links of a
+                   link type are added to the url queue in one batch.
+                   Rescan links can carry the cache validators of the last
+                   scan, these are sent with the task.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        auth_key = self._configuration.big_broker_api.auth_key
+
+        # Validate the request to ensure the auth key is present and valid.
+        validate_return = ApiUtils.validate_auth_key(request,
+                                                     self.header_auth_key,
+                                                     auth_key)
+        if validate_return is not HTTPStatusCode.OK:
+            return self._interface.response_class(
+                response='Invalid authentication key',
+                status=validate_return, mimetype=MIMEType.Text)
+
+        obj_instance, err_msg = await ApiUtils.convert_json_body_to_object(
+            request, schemas.AddToQueue.schema)
+
+        if not obj_instance:
+            return self._interface.response_class(
+                response=err_msg, status=HTTPStatusCode.BadRequest,
+                mimetype=MIMEType.Text)
+
+        elements = schemas.AddToQueue.Elements
+        strip_tracking = self._configuration.url_canonicalisation.\
+            strip_tracking_parameters
+        batches = {}
+        seen_urls = []
+        invalid = 0
+
+        for link in obj_instance.links:
+            url = UrlUtils.canonicalise(link.url,
+                                        strip_tracking=strip_tracking)
+            if not url:
+                invalid += 1
+                continue
+
+            link_type = getattr(link, elements.link_type, 'New')
+
+            # Most new links are repeats, the filter saves a failed insert
+            # for each.  A url is only added to the filter once it is in the
+            # db.  A rescan is of a url that has been seen so always goes on.
+            if link_type == 'New' and self._seen_url_filter is not None and \
+               url in self._seen_url_filter:
+                seen_urls.append(url)
+                continue
+
+            last_scanned = getattr(link, elements.last_scanned, None)
+            priority = self._url_scorer.priority(url, link_type,
+                                                 last_scanned)
+            urls, priorities, validators = batches.setdefault(
+                link_type, ([], [], []))
+            urls.append(url)
+            priorities.append(priority)
+            validators.append((getattr(link, elements.etag, None),
+                               getattr(link, elements.last_modified, None)))
+
+        disallowed = 0
+        if self._robots_filter is not None and batches:
+            disallowed = await self._remove_disallowed(batches)
+
+        inserted = 0
+        duplicates = len(seen_urls)
+
+        try:
+            if seen_urls:
+                self._db_interface.add_inlinks(
+                    seen_urls, self._url_scorer.inlink_adjustment)
+
+            for link_type, (urls, priorities, validators) in batches.items():
+                batch_inserted, batch_duplicates = self._db_interface.add_urls(
+                    urls, link_type, priorities,
+                    self._url_scorer.inlink_adjustment, validators)
+                inserted += batch_inserted
+                duplicates += batch_duplicates
+
+                if self._seen_url_filter is not None:
+                    for url in urls:
+                        self._seen_url_filter.add(url)
+
+        except RuntimeError as ex:
+            self._logger.log(LogType.Error,
+                             f'Failed to add urls to queue, reason: {ex}')
+            return self._interface.response_class(
+                response='Internal error',
+                status=HTTPStatusCode.InternalServerError,
+                mimetype=MIMEType.Text)
+
+        self._logger.log(LogType.Debug,
+                         f'Added {inserted} urls to queue, ' + \
+                         f'{duplicates} duplicates, {invalid} invalid and ' + \
+                         f'{disallowed} disallowed urls ignored')
+
+        response_body = {
+            schemas.AddToQueueResponse.Elements.inserted: inserted,
+            schemas.AddToQueueResponse.Elements.duplicates: duplicates,
+            schemas.AddToQueueResponse.Elements.invalid: invalid,
+            schemas.AddToQueueResponse.Elements.disallowed: disallowed
+        }
+
+        return self._interface.response_class(
+            response=json.dumps(response_body), status=HTTPStatusCode.OK,
+            mimetype=MIMEType.JSON)
+
+    async def _remove_disallowed(self, batches) -> int:
+        """!@brief Remove the urls robots.txt disallows from the batches.
+        @param self The object pointer.
+        @param batches Dictionary of link type to (urls, priorities,
+                       validators) lists, updated in place.
+        @returns Number of urls removed.
+        """
+
+        all_urls = [url for urls, _, _ in batches.values() for url in urls]
+        allowed = await self._robots_filter.allowed_urls(all_urls)
+
+        disallowed = 0
+        for link_type, batch in list(batches.items()):
+            kept = [entry for entry in zip(*batch) if entry[0] in allowed]
+            disallowed += len(batch[0]) - len(kept)
+
+            if kept:
+                batches[link_type] = tuple(list(column)
+                                           for column in zip(*kept))
+            else:
+                del batches[link_type]
+
+        return disallowed
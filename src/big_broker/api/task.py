@@ -23,14 +23,19 @@ from common.logger import LogType
 from common.mime_type import MIMEType
 
 class ApiTask:
-    __slots__ = ['_configuration', '_interface', '_logger']
+    __slots__ = ['_configuration', '_db_interface', '_interface', '_logger',
+                 '_task_leases']
 
     header_auth_key = 'AuthKey'
 
-    def __init__(self, interface_instance, configuration, logger):
+    def __init__(self, interface_instance, configuration, logger,
+                 task_leases, db_interface):
+        #pylint: disable=too-many-arguments
         self._interface = interface_instance
         self._configuration = configuration
         self._logger = logger
+        self._task_leases = task_leases
+        self._db_interface = db_interface
 
         # Add route : /task/complete_task
         self._interface.add_url_rule('/task/complete_task',
@@ -64,6 +69,29 @@ class ApiTask:
         self._logger.log(LogType.Info, f'Task Id       : {obj_instance.task_id}')
         self._logger.log(LogType.Info, f'Is Successful : {obj_instance.is_successful}')
 
+        lease = self._task_leases.complete(obj_instance.task_id)
+
+        # A task without a lease has expired and been queued again, it will
+        # be dispatched again so the completion is just acknowledged.
+        if not lease:
+            self._logger.log(LogType.Warn,
+                             f"Task '{obj_instance.task_id}' completed " + \
+                             'after its lease expired')
+            return self._interface.response_class(
+                response='Task lease expired', status=HTTPStatusCode.OK,
+                mimetype=MIMEType.Text)
+
+        try:
+            self._db_interface.set_id_to_completed(lease.queue_id)
+
+        except RuntimeError as ex:
+            self._logger.log(LogType.Error,
+                             f'Failed to complete task, reason: {ex}')
+            return self._interface.response_class(
+                response='Internal error',
+                status=HTTPStatusCode.InternalServerError,
+                mimetype=MIMEType.Text)
+
         return self._interface.response_class(
-            response='placeholder', status=HTTPStatusCode.OK,
+            response='Task completed', status=HTTPStatusCode.OK,
             mimetype=MIMEType.Text)
@@ -83,9 +83,76 @@ class BigBrokerApiSettings:
         self._private_key_file = private_key_file
         self._public_key_file = public_key_file
 
+class DatabaseTuningSettings:
+    """ SQLite performance settings applied when the database is opened, the
+        defaults are the SQLite defaults. """
+    __slots__ = ['_journal_mode', '_mmap_size', '_page_cache_size',
+                 '_statement_cache_size', '_synchronous', '_temp_store']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def journal_mode(self) -> str:
+        """!@brief Journal mode e.g. DELETE or WAL (Getter).
+        @param self The object pointer.
+        @returns str.
+        """
+        return self._journal_mode
+
+    @property
+    def synchronous(self) -> str:
+        """!@brief Synchronous level e.g. FULL or NORMAL (Getter).
+        @param self The object pointer.
+        @returns str.
+        """
+        return self._synchronous
+
+    @property
+    def mmap_size(self) -> int:
+        """!@brief Maximum bytes of the database to memory map (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._mmap_size
+
+    @property
+    def page_cache_size(self) -> int:
+        """!@brief Page cache size in KiB (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._page_cache_size
+
+    @property
+    def temp_store(self) -> str:
+        """!@brief Where temporary tables are stored e.g. MEMORY (Getter).
+        @param self The object pointer.
+        @returns str.
+        """
+        return self._temp_store
+
+    @property
+    def statement_cache_size(self) -> int:
+        """!@brief Number of prepared statements cached (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._statement_cache_size
+
+    def __init__(self, journal_mode='DELETE', synchronous='FULL',
+                 mmap_size=0, page_cache_size=2000, temp_store='DEFAULT',
+                 statement_cache_size=128):
+        #pylint: disable=too-many-arguments
+        self._journal_mode = journal_mode
+        self._synchronous = synchronous
+        self._mmap_size = mmap_size
+        self._page_cache_size = page_cache_size
+        self._temp_store = temp_store
+        self._statement_cache_size = statement_cache_size
+
 class DatabaseSettings:
     """ Settings related to the underlying database """
-    __slots__ = ['_cache_size', '_database_file', '_fail_on_no_database']
+    __slots__ = ['_cache_size', '_database_file', '_fail_on_no_database',
+                 '_tuning']
     #pylint: disable=too-few-public-methods
 
     @property
@@ -112,15 +179,346 @@ class DatabaseSettings:
         """
         return self._fail_on_no_database
 
-    def __init__(self, cache_size, database_file, fail_on_no_db):
+    @property
+    def tuning(self) -> DatabaseTuningSettings:
+        """!@brief Database performance tuning settings (Getter).
+        @param self The object pointer.
+        @returns DatabaseTuningSettings.
+        """
+        return self._tuning
+
+    def __init__(self, cache_size, database_file, fail_on_no_db, tuning):
         self._cache_size = cache_size
         self._database_file = database_file
         self._fail_on_no_database = fail_on_no_db
+        self._tuning = tuning
+
+class QueueRefillSettings:
+    """ Settings for topping up the url processing queue """
+    __slots__ = ['_check_interval', '_high_water_mark', '_low_water_mark']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def high_water_mark(self) -> int:
+        """!@brief Number of tasks the queue is topped up to (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._high_water_mark
+
+    @property
+    def low_water_mark(self) -> int:
+        """!@brief Number of tasks the queue has to fall to before it is
+                   topped up (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._low_water_mark
+
+    @property
+    def check_interval(self) -> int:
+        """!@brief Milliseconds between checks of the queue depth (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._check_interval
+
+    def __init__(self, high_water_mark, low_water_mark, check_interval):
+        self._high_water_mark = high_water_mark
+        self._low_water_mark = low_water_mark
+        self._check_interval = check_interval
+
+class TaskLeaseSettings:
+    """ Settings for leases on dispatched tasks """
+    __slots__ = ['_lease_timeout', '_queue_timeout', '_sweep_interval']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def lease_timeout(self) -> int:
+        """!@brief Seconds a task has to complete once a scrape node has taken
+                   it before it is queued again (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._lease_timeout
+
+    @property
+    def queue_timeout(self) -> int:
+        """!@brief Seconds a published task can wait in the message queue for
+                   a scrape node to take it before it is queued again
+                   (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._queue_timeout
+
+    @property
+    def sweep_interval(self) -> int:
+        """!@brief Seconds between checks for expired leases (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._sweep_interval
+
+    def __init__(self, lease_timeout, sweep_interval, queue_timeout):
+        self._lease_timeout = lease_timeout
+        self._sweep_interval = sweep_interval
+        self._queue_timeout = queue_timeout
+
+class PolitenessSettings:
+    """ Settings for spacing out tasks for the same host """
+    __slots__ = ['_default_crawl_delay', '_domain_crawl_delays',
+                 '_max_queued_per_domain']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def default_crawl_delay(self) -> int:
+        """!@brief Milliseconds between tasks for the same host (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._default_crawl_delay
+
+    @property
+    def domain_crawl_delays(self) -> dict:
+        """!@brief Crawl delay overrides in milliseconds by host (Getter).
+        @param self The object pointer.
+        @returns dict.
+        """
+        return self._domain_crawl_delays
+
+    @property
+    def max_queued_per_domain(self) -> int:
+        """!@brief Maximum tasks held waiting for a single host (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_queued_per_domain
+
+    def __init__(self, default_crawl_delay, domain_crawl_delays,
+                 max_queued_per_domain):
+        self._default_crawl_delay = default_crawl_delay
+        self._domain_crawl_delays = domain_crawl_delays
+        self._max_queued_per_domain = max_queued_per_domain
+
+class UrlScoringSettings:
+    """ Settings for scoring the priority of urls added to the queue """
+    __slots__ = ['_base_priority', '_domain_adjustments', '_inlink_weight',
+                 '_path_depth_weight', '_rescan_age_weight']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def base_priority(self) -> int:
+        """!@brief Priority of a url before scoring, lower is dispatched
+                   first (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._base_priority
+
+    @property
+    def path_depth_weight(self) -> int:
+        """!@brief Priority added per level of url path depth (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._path_depth_weight
+
+    @property
+    def inlink_weight(self) -> int:
+        """!@brief Priority removed per extra inlink seen (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._inlink_weight
+
+    @property
+    def rescan_age_weight(self) -> int:
+        """!@brief Priority removed per day since a rescan url was last
+                   scanned (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._rescan_age_weight
+
+    @property
+    def domain_adjustments(self) -> dict:
+        """!@brief Priority adjustments by host (Getter).
+        @param self The object pointer.
+        @returns dict.
+        """
+        return self._domain_adjustments
+
+    def __init__(self, base_priority, path_depth_weight, inlink_weight,
+                 rescan_age_weight, domain_adjustments):
+        #pylint: disable=too-many-arguments
+        self._base_priority = base_priority
+        self._path_depth_weight = path_depth_weight
+        self._inlink_weight = inlink_weight
+        self._rescan_age_weight = rescan_age_weight
+        self._domain_adjustments = domain_adjustments
+
+class SeenUrlFilterSettings:
+    """ Settings for the filter of urls already added to the queue """
+    __slots__ = ['_enabled', '_error_rate', '_initial_capacity',
+                 '_snapshot_file', '_snapshot_interval']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def enabled(self) -> bool:
+        """!@brief Is the filter enabled flag (Getter).
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._enabled
+
+    @property
+    def initial_capacity(self) -> int:
+        """!@brief Number of urls the filter is first sized for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._initial_capacity
+
+    @property
+    def error_rate(self) -> float:
+        """!@brief Target false positive rate (Getter).
+        @param self The object pointer.
+        @returns float.
+        """
+        return self._error_rate
+
+    @property
+    def snapshot_file(self) -> str:
+        """!@brief Filename and path of the filter snapshot (Getter).
+        @param self The object pointer.
+        @returns str.
+        """
+        return self._snapshot_file
+
+    @property
+    def snapshot_interval(self) -> int:
+        """!@brief Seconds between filter snapshots (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._snapshot_interval
+
+    def __init__(self, enabled, initial_capacity, error_rate, snapshot_file,
+                 snapshot_interval):
+        #pylint: disable=too-many-arguments
+        self._enabled = enabled
+        self._initial_capacity = initial_capacity
+        self._error_rate = error_rate
+        self._snapshot_file = snapshot_file
+        self._snapshot_interval = snapshot_interval
+
+class UrlCanonicalisationSettings:
+    """ Settings for converting urls added to the queue to canonical form """
+    __slots__ = ['_strip_tracking_parameters']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def strip_tracking_parameters(self) -> bool:
+        """!@brief Remove tracking query parameters flag (Getter).
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._strip_tracking_parameters
+
+    def __init__(self, strip_tracking_parameters):
+        self._strip_tracking_parameters = strip_tracking_parameters
+
+class RobotsFilterSettings:
+    """ Settings for dropping urls a host's robots.txt disallows at ingest """
+    __slots__ = ['_enabled', '_error_ttl', '_fetch_threads', '_fetch_timeout',
+                 '_max_crawl_delay', '_max_hosts', '_ttl', '_user_agent']
+    #pylint: disable=too-few-public-methods
+
+    @property
+    def enabled(self) -> bool:
+        """!@brief Is the filter enabled flag (Getter).
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._enabled
+
+    @property
+    def user_agent(self) -> str:
+        """!@brief Product token robots.txt groups are matched on (Getter).
+        @param self The object pointer.
+        @returns str.
+        """
+        return self._user_agent
+
+    @property
+    def max_hosts(self) -> int:
+        """!@brief Maximum number of hosts to cache rules for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_hosts
+
+    @property
+    def ttl(self) -> int:
+        """!@brief Seconds the rules of a host are cached for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._ttl
+
+    @property
+    def error_ttl(self) -> int:
+        """!@brief Seconds a robots.txt that couldn't be read is cached for
+                   (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._error_ttl
+
+    @property
+    def fetch_timeout(self) -> int:
+        """!@brief Seconds to wait when reading a robots.txt (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._fetch_timeout
+
+    @property
+    def fetch_threads(self) -> int:
+        """!@brief Number of robots.txt files read at once (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._fetch_threads
+
+    @property
+    def max_crawl_delay(self) -> int:
+        """!@brief Largest robots.txt crawl delay honoured in seconds
+                   (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_crawl_delay
+
+    def __init__(self, enabled, user_agent, max_hosts, ttl, error_ttl,
+                 fetch_timeout, fetch_threads, max_crawl_delay):
+        #pylint: disable=too-many-arguments
+        self._enabled = enabled
+        self._user_agent = user_agent
+        self._max_hosts = max_hosts
+        self._ttl = ttl
+        self._error_ttl = error_ttl
+        self._fetch_timeout = fetch_timeout
+        self._fetch_threads = fetch_threads
+        self._max_crawl_delay = max_crawl_delay
 
 class Configuration:
     """ Overal configuration settings """
-    __slots__ = ['_big_broker_api', '_db_settings',
-                 '_page_store_api', '_processing_queue_api']
+    __slots__ = ['_big_broker_api', '_db_settings', '_page_store_api',
+                 '_politeness', '_processing_queue_api', '_queue_refill',
+                 '_robots_filter', '_seen_url_filter', '_task_leases',
+                 '_url_canonicalisation', '_url_scoring']
 
     @property
     def page_store_api(self) -> PageStoreApi:
@@ -146,8 +544,74 @@ class Configuration:
         """
         return self._db_settings
 
+    @property
+    def queue_refill(self) -> QueueRefillSettings:
+        """!@brief Queue refill settings (Getter).
+        @param self The object pointer.
+        @returns QueueRefillSettings.
+        """
+        return self._queue_refill
+
+    @property
+    def task_leases(self) -> TaskLeaseSettings:
+        """!@brief Task lease settings (Getter).
+        @param self The object pointer.
+        @returns TaskLeaseSettings.
+        """
+        return self._task_leases
+
+    @property
+    def politeness(self) -> PolitenessSettings:
+        """!@brief Politeness settings (Getter).
+        @param self The object pointer.
+        @returns PolitenessSettings.
+        """
+        return self._politeness
+
+    @property
+    def url_scoring(self) -> UrlScoringSettings:
+        """!@brief Url scoring settings (Getter).
+        @param self The object pointer.
+        @returns UrlScoringSettings.
+        """
+        return self._url_scoring
+
+    @property
+    def seen_url_filter(self) -> SeenUrlFilterSettings:
+        """!@brief Seen url filter settings (Getter).
+        @param self The object pointer.
+        @returns SeenUrlFilterSettings.
+        """
+        return self._seen_url_filter
+
+    @property
+    def url_canonicalisation(self) -> UrlCanonicalisationSettings:
+        """!@brief Url canonicalisation settings (Getter).
+        @param self The object pointer.
+        @returns UrlCanonicalisationSettings.
+        """
+        return self._url_canonicalisation
+
+    @property
+    def robots_filter(self) -> RobotsFilterSettings:
+        """!@brief Robots filter settings (Getter).
+        @param self The object pointer.
+        @returns RobotsFilterSettings.
+        """
+        return self._robots_filter
+
     def __init__(self, page_store_api, big_broker_api,
-                 db_settings):
+                 db_settings, queue_refill, task_leases, politeness,
+                 url_scoring, seen_url_filter, url_canonicalisation,
+                 robots_filter):
+        #pylint: disable=too-many-arguments
         self._page_store_api = page_store_api
         self._big_broker_api = big_broker_api
         self._db_settings = db_settings
+        self._queue_refill = queue_refill
+        self._task_leases = task_leases
+        self._politeness = politeness
+        self._url_scoring = url_scoring
+        self._seen_url_filter = seen_url_filter
+        self._url_canonicalisation = url_canonicalisation
+        self._robots_filter = robots_filter
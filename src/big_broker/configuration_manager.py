@@ -19,7 +19,11 @@ from typing import Union
 import jsonschema
 from common.common_configuration_key import CommonConfigurationKey
 from .configuration import BigBrokerApiSettings, Configuration, PageStoreApi, \
-                           DatabaseSettings
+                           DatabaseSettings, DatabaseTuningSettings, \
+                           PolitenessSettings, QueueRefillSettings, \
+                           RobotsFilterSettings, SeenUrlFilterSettings, \
+                           TaskLeaseSettings, UrlCanonicalisationSettings, \
+                           UrlScoringSettings
 from .configuration_schema import ConfigurationSchema as schema
 
 class ConfigurationManager:
@@ -86,7 +90,36 @@ class ConfigurationManager:
         raw_db_settings = raw_json[schema.element_database_settings]
         db_settings = self._process_db_settings(raw_db_settings)
 
-        return Configuration(page_store_api, big_broker_api, db_settings)
+        raw_data = raw_json.get(schema.element_queue_refill, {})
+        queue_refill = self._process_queue_refill(raw_data,
+                                                  db_settings.cache_size)
+        if not queue_refill:
+            return None
+
+        raw_data = raw_json.get(schema.element_task_leases, {})
+        task_leases = self._process_task_leases(raw_data)
+
+        raw_data = raw_json.get(schema.element_politeness, {})
+        politeness = self._process_politeness(raw_data)
+
+        raw_data = raw_json.get(schema.element_url_scoring, {})
+        url_scoring = self._process_url_scoring(raw_data)
+
+        raw_data = raw_json.get(schema.element_seen_url_filter, {})
+        seen_url_filter = self._process_seen_url_filter(raw_data)
+
+        raw_data = raw_json.get(schema.element_url_canonicalisation, {})
+        strip_tracking = raw_data.get(
+            schema.url_canonicalisation_strip_tracking, True)
+        url_canonicalisation = UrlCanonicalisationSettings(strip_tracking)
+
+        raw_data = raw_json.get(schema.element_robots_filter, {})
+        robots_filter = self._process_robots_filter(raw_data)
+
+        return Configuration(page_store_api, big_broker_api, db_settings,
+                             queue_refill, task_leases, politeness,
+                             url_scoring, seen_url_filter,
+                             url_canonicalisation, robots_filter)
 
     def _process_page_store_api(self, settings) -> PageStoreApi:
         """!@brief Parse the Page Store Api settings.
@@ -127,4 +160,158 @@ class ConfigurationManager:
         cache_size = settings[schema.db_settings_cache_size]
         db_filename = settings[schema.db_settings_database_file]
         fail_no_db = settings[schema.db_settings_fail_on_no_database]
-        return DatabaseSettings(cache_size, db_filename, fail_no_db)
+
+        tuning = self._process_db_tuning_settings(
+            settings.get(schema.db_settings_tuning, {}))
+
+        return DatabaseSettings(cache_size, db_filename, fail_no_db, tuning)
+
+    def _process_queue_refill(self, settings, cache_size) \
+            -> Union[QueueRefillSettings, None]:
+        """!@brief Process the optional queue refill section, the high water
+                   mark defaults to the database cache size and the low water
+                   mark to half of the high water mark.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @param cache_size Database cache size.
+        @returns QueueRefillSettings or None if the water marks are invalid.
+        """
+
+        high_water_mark = settings.get(schema.queue_refill_high_water_mark,
+                                       cache_size)
+        low_water_mark = settings.get(schema.queue_refill_low_water_mark,
+                                      high_water_mark // 2)
+        check_interval = settings.get(schema.queue_refill_check_interval,
+                                      1000)
+
+        if low_water_mark >= high_water_mark:
+            self._last_error_msg = "Queue refill 'low water mark' must be " + \
+                "less than the 'high water mark'"
+            return None
+
+        return QueueRefillSettings(high_water_mark, low_water_mark,
+                                   check_interval)
+
+    def _process_task_leases(self, settings) -> TaskLeaseSettings:
+        """!@brief Process the optional task leases section.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns TaskLeaseSettings.
+        """
+        #pylint: disable=no-self-use
+
+        lease_timeout = settings.get(schema.task_leases_lease_timeout, 600)
+        sweep_interval = settings.get(schema.task_leases_sweep_interval, 10)
+        queue_timeout = settings.get(schema.task_leases_queue_timeout, 3600)
+
+        return TaskLeaseSettings(lease_timeout, sweep_interval, queue_timeout)
+
+    def _process_politeness(self, settings) -> PolitenessSettings:
+        """!@brief Process the optional politeness section.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns PolitenessSettings.
+        """
+        #pylint: disable=no-self-use
+
+        default_delay = settings.get(schema.politeness_default_crawl_delay,
+                                     1000)
+        domain_delays = settings.get(schema.politeness_domain_crawl_delays, {})
+        max_queued = settings.get(schema.politeness_max_queued_per_domain, 100)
+
+        return PolitenessSettings(default_delay, domain_delays, max_queued)
+
+    def _process_url_scoring(self, settings) -> UrlScoringSettings:
+        """!@brief Process the optional url scoring section.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns UrlScoringSettings.
+        """
+        #pylint: disable=no-self-use
+
+        base_priority = settings.get(schema.url_scoring_base_priority, 100)
+        path_depth_weight = settings.get(schema.url_scoring_path_depth_weight,
+                                         10)
+        inlink_weight = settings.get(schema.url_scoring_inlink_weight, 1)
+        rescan_age_weight = settings.get(schema.url_scoring_rescan_age_weight,
+                                         1)
+        domain_adjustments = settings.get(
+            schema.url_scoring_domain_adjustments, {})
+
+        return UrlScoringSettings(base_priority, path_depth_weight,
+                                  inlink_weight, rescan_age_weight,
+                                  domain_adjustments)
+
+    def _process_seen_url_filter(self, settings) -> SeenUrlFilterSettings:
+        """!@brief Process the optional seen url filter section.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns SeenUrlFilterSettings.
+        """
+        #pylint: disable=no-self-use
+
+        enabled = settings.get(schema.seen_url_filter_enabled, True)
+        initial_capacity = settings.get(
+            schema.seen_url_filter_initial_capacity, 1000000)
+        error_rate = settings.get(schema.seen_url_filter_error_rate, 0.001)
+        snapshot_file = settings.get(schema.seen_url_filter_snapshot_file,
+                                     'seen_urls.filter')
+        snapshot_interval = settings.get(
+            schema.seen_url_filter_snapshot_interval, 300)
+
+        return SeenUrlFilterSettings(enabled, initial_capacity, error_rate,
+                                     snapshot_file, snapshot_interval)
+
+    def _process_robots_filter(self, settings) -> RobotsFilterSettings:
+        """!@brief Process the optional robots filter section, the filter is
+                   disabled by default as each scrape node checks robots.txt
+                   before reading a page.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns RobotsFilterSettings.
+        """
+        #pylint: disable=no-self-use
+
+        enabled = settings.get(schema.robots_filter_enabled, False)
+        user_agent = settings.get(schema.robots_filter_user_agent,
+                                  'siterummage')
+        max_hosts = settings.get(schema.robots_filter_max_hosts, 100000)
+        ttl = settings.get(schema.robots_filter_ttl, 86400)
+        error_ttl = settings.get(schema.robots_filter_error_ttl, 3600)
+        fetch_timeout = settings.get(schema.robots_filter_fetch_timeout, 10)
+        fetch_threads = settings.get(schema.robots_filter_fetch_threads, 8)
+        max_crawl_delay = settings.get(schema.robots_filter_max_crawl_delay,
+                                       30)
+
+        return RobotsFilterSettings(enabled, user_agent, max_hosts, ttl,
+                                    error_ttl, fetch_timeout, fetch_threads,
+                                    max_crawl_delay)
+
+    def _process_db_tuning_settings(self, settings) -> DatabaseTuningSettings:
+        """!@brief Process the optional database tuning section, any setting
+                   not present is left at the SQLite default.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns DatabaseTuningSettings.
+        """
+        #pylint: disable=no-self-use
+
+        defaults = DatabaseTuningSettings()
+
+        journal_mode = settings.get(schema.db_tuning_journal_mode,
+                                    defaults.journal_mode)
+        synchronous = settings.get(schema.db_tuning_synchronous,
+                                   defaults.synchronous)
+        mmap_size = settings.get(schema.db_tuning_mmap_size,
+                                 defaults.mmap_size)
+        page_cache_size = settings.get(schema.db_tuning_page_cache_size,
+                                       defaults.page_cache_size)
+        temp_store = settings.get(schema.db_tuning_temp_store,
+                                  defaults.temp_store)
+        statement_cache_size = settings.get(
+            schema.db_tuning_statement_cache_size,
+            defaults.statement_cache_size)
+
+        return DatabaseTuningSettings(journal_mode, synchronous, mmap_size,
+                                      page_cache_size, temp_store,
+                                      statement_cache_size)
@@ -26,6 +26,13 @@ class ConfigurationSchema:
     element_big_broker_api = 'api settings'
     element_database_settings = 'database settings'
     element_message_service = 'message service'
+    element_queue_refill = 'queue refill'
+    element_task_leases = 'task leases'
+    element_politeness = 'politeness'
+    element_url_scoring = 'url scoring'
+    element_seen_url_filter = 'seen url filter'
+    element_url_canonicalisation = 'url canonicalisation'
+    element_robots_filter = 'robots filter'
 
     # -- Page Store Api sub-elements --
     # ---------------------------------
@@ -37,6 +44,65 @@ class ConfigurationSchema:
     db_settings_cache_size = 'cache size'
     db_settings_database_file = 'database file'
     db_settings_fail_on_no_database = 'fail on no database'
+    db_settings_tuning = 'tuning'
+
+    # -- Queue Refill sub-elements --
+    # -------------------------------
+    queue_refill_high_water_mark = 'high water mark'
+    queue_refill_low_water_mark = 'low water mark'
+    queue_refill_check_interval = 'check interval'
+
+    # -- Task Leases sub-elements --
+    # ------------------------------
+    task_leases_lease_timeout = 'lease timeout'
+    task_leases_sweep_interval = 'sweep interval'
+    task_leases_queue_timeout = 'queue timeout'
+
+    # -- Politeness sub-elements --
+    # -----------------------------
+    politeness_default_crawl_delay = 'default crawl delay'
+    politeness_domain_crawl_delays = 'domain crawl delays'
+    politeness_max_queued_per_domain = 'max queued per domain'
+
+    # -- Url Scoring sub-elements --
+    # ------------------------------
+    url_scoring_base_priority = 'base priority'
+    url_scoring_path_depth_weight = 'path depth weight'
+    url_scoring_inlink_weight = 'inlink weight'
+    url_scoring_rescan_age_weight = 'rescan age weight'
+    url_scoring_domain_adjustments = 'domain adjustments'
+
+    # -- Seen Url Filter sub-elements --
+    # ----------------------------------
+    seen_url_filter_enabled = 'enabled'
+    seen_url_filter_initial_capacity = 'initial capacity'
+    seen_url_filter_error_rate = 'error rate'
+    seen_url_filter_snapshot_file = 'snapshot file'
+    seen_url_filter_snapshot_interval = 'snapshot interval'
+
+    # -- Url Canonicalisation sub-elements --
+    # ---------------------------------------
+    url_canonicalisation_strip_tracking = 'strip tracking parameters'
+
+    # -- Robots Filter sub-elements --
+    # --------------------------------
+    robots_filter_enabled = 'enabled'
+    robots_filter_user_agent = 'user agent'
+    robots_filter_max_hosts = 'max hosts'
+    robots_filter_ttl = 'ttl'
+    robots_filter_error_ttl = 'error ttl'
+    robots_filter_fetch_timeout = 'fetch timeout'
+    robots_filter_fetch_threads = 'fetch threads'
+    robots_filter_max_crawl_delay = 'max crawl delay'
+
+    # -- Database Tuning sub-elements --
+    # ----------------------------------
+    db_tuning_journal_mode = 'journal mode'
+    db_tuning_synchronous = 'synchronous'
+    db_tuning_mmap_size = 'mmap size'
+    db_tuning_page_cache_size = 'page cache size'
+    db_tuning_temp_store = 'temp store'
+    db_tuning_statement_cache_size = 'statement cache size'
 
     schema = \
     {
@@ -108,11 +174,242 @@ class ConfigurationSchema:
                     db_settings_fail_on_no_database:
                     {
                         "type": "boolean"
+                    },
+                    db_settings_tuning:
+                    {
+                        "additionalProperties" : False,
+                        "properties":
+                        {
+                            db_tuning_journal_mode:
+                            {
+                                "type" : "string",
+                                "enum": ["DELETE", "TRUNCATE", "PERSIST",
+                                         "MEMORY", "WAL", "OFF"]
+                            },
+                            db_tuning_synchronous:
+                            {
+                                "type" : "string",
+                                "enum": ["OFF", "NORMAL", "FULL", "EXTRA"]
+                            },
+                            db_tuning_mmap_size:
+                            {
+                                "type" : "integer",
+                                "minimum": 0
+                            },
+                            db_tuning_page_cache_size:
+                            {
+                                "type" : "integer",
+                                "minimum": 1
+                            },
+                            db_tuning_temp_store:
+                            {
+                                "type" : "string",
+                                "enum": ["DEFAULT", "FILE", "MEMORY"]
+                            },
+                            db_tuning_statement_cache_size:
+                            {
+                                "type" : "integer",
+                                "minimum": 0
+                            }
+                        }
                     }
                 },
                 "required" : [db_settings_cache_size,
                               db_settings_database_file,
                               db_settings_fail_on_no_database]
+            },
+            element_queue_refill:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    queue_refill_high_water_mark:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    queue_refill_low_water_mark:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    },
+                    queue_refill_check_interval:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    }
+                }
+            },
+            element_task_leases:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    task_leases_lease_timeout:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    task_leases_sweep_interval:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    task_leases_queue_timeout:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    }
+                }
+            },
+            element_politeness:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    politeness_default_crawl_delay:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    },
+                    politeness_domain_crawl_delays:
+                    {
+                        "type" : "object",
+                        "additionalProperties" :
+                        {
+                            "type" : "integer",
+                            "minimum": 0
+                        }
+                    },
+                    politeness_max_queued_per_domain:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    }
+                }
+            },
+            element_url_scoring:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    url_scoring_base_priority:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    },
+                    url_scoring_path_depth_weight:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    },
+                    url_scoring_inlink_weight:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    },
+                    url_scoring_rescan_age_weight:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    },
+                    url_scoring_domain_adjustments:
+                    {
+                        "type" : "object",
+                        "additionalProperties" :
+                        {
+                            "type" : "integer"
+                        }
+                    }
+                }
+            },
+            element_seen_url_filter:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    seen_url_filter_enabled:
+                    {
+                        "type": "boolean"
+                    },
+                    seen_url_filter_initial_capacity:
+                    {
+                        "type" : "integer",
+                        "minimum": 1000
+                    },
+                    seen_url_filter_error_rate:
+                    {
+                        "type" : "number",
+                        "exclusiveMinimum": 0,
+                        "maximum": 0.5
+                    },
+                    seen_url_filter_snapshot_file:
+                    {
+                        "type" : "string"
+                    },
+                    seen_url_filter_snapshot_interval:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    }
+                }
+            },
+            element_url_canonicalisation:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    url_canonicalisation_strip_tracking:
+                    {
+                        "type": "boolean"
+                    }
+                }
+            },
+            element_robots_filter:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    robots_filter_enabled:
+                    {
+                        "type": "boolean"
+                    },
+                    robots_filter_user_agent:
+                    {
+                        "type" : "string",
+                        "minLength": 1
+                    },
+                    robots_filter_max_hosts:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_filter_ttl:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_filter_error_ttl:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_filter_fetch_timeout:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_filter_fetch_threads:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_filter_max_crawl_delay:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    }
+                }
             }
         },
         "required" : [element_big_broker_api, element_page_store_api,
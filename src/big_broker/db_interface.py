@@ -16,13 +16,14 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
 import os
 import time
+from typing import Tuple
 from uuid import uuid1
 import sqlite3
 
 class DbInterface:
     """ Wrappinf of Sqlite database functionality """
     __slots__ = ['_connection', '_database_filename', '_is_connected',
-                 '_last_error_msg']
+                 '_last_error_msg', '_tuning']
 
     ## Link type can be:
     ## 0 - New
@@ -40,6 +41,30 @@ class DbInterface:
 
     sql_index_url_queue = "CREATE UNIQUE INDEX idx_queue_url ON url_queue(url)"
 
+    ## Schema migrations, applied in order on open.  The index of a migration
+    ## plus one is the schema version (PRAGMA user_version) once applied.
+    sql_migrations = [
+        # 1 - Index the dequeue order so refills don't scan and sort.
+        "CREATE INDEX IF NOT EXISTS idx_queue_dequeue ON " + \
+        "url_queue(cached, insertion_date, id)",
+        # 2 - Record that a dispatched task has been completed.
+        "ALTER TABLE url_queue ADD COLUMN completed boolean DEFAULT 0",
+        # 3 - Index tasks dispatched but not completed, for lease recovery.
+        "CREATE INDEX IF NOT EXISTS idx_queue_dispatched ON " + \
+        "url_queue(id) WHERE cached = 1 AND completed = 0",
+        # 4 - Dispatch priority, lower is dispatched first.
+        "ALTER TABLE url_queue ADD COLUMN priority integer DEFAULT 0",
+        # 5 - Number of links to the url seen whilst it was queued.
+        "ALTER TABLE url_queue ADD COLUMN inlink_count integer DEFAULT 1",
+        # 6 - Dequeue is now in priority order, replace the dequeue index.
+        "DROP INDEX IF EXISTS idx_queue_dequeue",
+        "CREATE INDEX IF NOT EXISTS idx_queue_priority ON " + \
+        "url_queue(cached, priority, insertion_date, id)",
+        # 8 - Cache validators from the last scan, sent with rescan tasks.
+        "ALTER TABLE url_queue ADD COLUMN etag text DEFAULT NULL",
+        "ALTER TABLE url_queue ADD COLUMN last_modified text DEFAULT NULL"
+    ]
+
     @property
     def is_connected(self) -> bool:
         """!@brief Is connected (Getter).
@@ -56,10 +81,11 @@ class DbInterface:
         """
         return self._last_error_msg
 
-    def __init__(self, database_filename):
+    def __init__(self, database_filename, tuning=None):
         """!@brief Class constructor.
         @param self The object pointer.
         @param database_filename Filename and path of the database.
+        @param tuning Optional DatabaseTuningSettings applied on open.
         @returns SqliteInterface instance.
         """
 
@@ -67,6 +93,7 @@ class DbInterface:
         self._database_filename = database_filename
         self._last_error_msg = ''
         self._is_connected = False
+        self._tuning = tuning
 
     def database_exists(self) -> bool:
         """!@brief Check to see if the database exists.  We verify that:
@@ -141,9 +168,14 @@ class DbInterface:
         @returns Boolean indicating success status.
         """
 
+        cached_statements = self._tuning.statement_cache_size \
+            if self._tuning else 128
+
         try:
-            self._connection = sqlite3.connect(self._database_filename)
+            self._connection = sqlite3.connect(
+                self._database_filename, cached_statements=cached_statements)
             cursor = self._connection.cursor()
+            self._apply_tuning(cursor)
             cursor.execute('SELECT id FROM url_queue LIMIT 1')
 
         except sqlite3.Error as sqlite_except:
@@ -151,10 +183,79 @@ class DbInterface:
             self._connection = None
             return False
 
+        try:
+            self._migrate(cursor)
+
+        except sqlite3.Error as sqlite_except:
+            self._last_error_msg = 'schema migration failed, reason: ' + \
+                f'{sqlite_except}'
+            self._connection.close()
+            self._connection = None
+            return False
+
         self._is_connected = True
 
         return True
 
+    def effective_pragmas(self) -> dict:
+        """!@brief Read back the performance related pragmas in effect on the
+                   open connection.
+        @param self The object pointer.
+        @returns Dictionary of pragma name to value.
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        pragmas = {}
+        cursor = self._connection.cursor()
+
+        for pragma in ['journal_mode', 'synchronous', 'mmap_size',
+                       'cache_size', 'temp_store']:
+            cursor.execute(f'PRAGMA {pragma}')
+            pragmas[pragma] = cursor.fetchone()[0]
+
+        cursor.close()
+        return pragmas
+
+    def _migrate(self, cursor) -> None:
+        """!@brief Apply any schema migrations the database hasn't had yet,
+                   each migration is committed along with its version.
+        @param self The object pointer.
+        @param cursor Cursor on the open connection.
+        @returns None.
+        """
+
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+
+        for new_version, migration in enumerate(self.sql_migrations[version:],
+                                                start=version + 1):
+            cursor.execute(migration)
+            cursor.execute(f'PRAGMA user_version = {new_version}')
+            self._connection.commit()
+
+    def _apply_tuning(self, cursor) -> None:
+        """!@brief Apply the tuning settings to a newly opened connection.
+                   Values are validated by the configuration schema, pragmas
+                   cannot take bound parameters.
+        @param self The object pointer.
+        @param cursor Cursor on the new connection.
+        @returns None.
+        """
+
+        if not self._tuning:
+            return
+
+        cursor.execute(f'PRAGMA journal_mode = {self._tuning.journal_mode}')
+        cursor.execute(f'PRAGMA synchronous = {self._tuning.synchronous}')
+        cursor.execute(f'PRAGMA mmap_size = {int(self._tuning.mmap_size)}')
+
+        # A negative cache size is a size in KiB rather than in pages.
+        cursor.execute(
+            f'PRAGMA cache_size = -{int(self._tuning.page_cache_size)}')
+        cursor.execute(f'PRAGMA temp_store = {self._tuning.temp_store}')
+
     def close(self) -> None:
         """!@brief Close the connection.
         @param self The object pointer.
@@ -165,29 +266,56 @@ class DbInterface:
 
         self._connection = None
 
-    def get_queue_cache(self, cache_size, get_cached=False) -> list:
-        """!@brief Get queue for caching purposes.
+    def get_queue_cache(self, cache_size, get_cached=False,
+                        existing_ids=None, after=None) -> list:
+        """!@brief Get queue for caching purposes, entries are returned in
+                   (priority, insertion_date, id) order.
         @param self The object pointer.
         @param cache_size Get max number of items to cache.
-        @param existing_ids List of items to not get, default is None.
+        @param get_cached Also get entries already flagged as cached.
+        @param existing_ids Set of ids of items to not get, default is None.
+        @param after Optional (priority, insertion_date, id) of the last entry
+                     read by a previous call, only entries after it are
+                     returned.
         @returns List of data rows stored in a dictionary.
         """
 
         if not self._connection:
             raise RuntimeError('No connection')
 
-        cache_clause = 'WHERE NOT cached' if not get_cached else ''
-
-        query = f"SELECT * FROM url_queue {cache_clause} ORDER BY " + \
-             f"insertion_date ASC LIMIT {cache_size}"
+        columns = ['id', 'url', 'insertion_date', 'task_id', 'link_type',
+                   'priority', 'etag', 'last_modified']
+        conditions = []
+        query_args = []
+
+        if get_cached:
+            columns.append('cached')
+        else:
+            conditions.append('cached = 0')
+
+        # Resume from the last position read rather than skipping rows, this
+        # is a range on idx_queue_priority so the cost doesn't grow with the
+        # number of entries already read.
+        if after:
+            conditions.append('(priority, insertion_date, id) > (?, ?, ?)')
+            query_args.extend(after)
+
+        # Read enough extra rows to still fill the cache once the existing
+        # ids have been skipped.
+        existing_ids = existing_ids if existing_ids else set()
+        limit = cache_size + len(existing_ids) if cache_size >= 0 else -1
+        query_args.append(limit)
+
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions \
+            else ''
+        query = f"SELECT {', '.join(columns)} FROM url_queue " + \
+            f"{where_clause} ORDER BY priority ASC, insertion_date ASC, " + \
+            "id ASC LIMIT ?"
 
         cursor = self._connection.cursor()
 
-        column_names = []
-
         try:
-            cursor.execute(query)
-            column_names = list(map(lambda x: x[0], cursor.description))
+            cursor.execute(query, query_args)
 
         except sqlite3.Error as sqlite_except:
             raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
@@ -198,15 +326,48 @@ class DbInterface:
         data = []
 
         for row in rows:
-            entry = {}
+            entry = dict(zip(columns, row))
 
-            for idx, column in enumerate(row):
-                entry[column_names[idx]] = column
+            if entry['id'] in existing_ids:
+                continue
 
             data.append(entry)
 
+            if len(data) == cache_size:
+                break
+
         return data
 
+    def get_queue_entries(self, id_list) -> list:
+        """!@brief Get the entries for a list of ids that are still waiting to
+                   be cached, entries are returned in (priority,
+                   insertion_date, id) order.
+        @param self The object pointer.
+        @param id_list List of ids of the entries to get.
+        @returns List of data rows stored in a dictionary.
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        columns = ['id', 'url', 'insertion_date', 'task_id', 'link_type',
+                   'priority', 'etag', 'last_modified']
+
+        id_list = ','.join([str(id) for id in id_list])
+        query = f"SELECT {', '.join(columns)} FROM url_queue " + \
+            f"WHERE id IN ({id_list}) AND cached = 0 " + \
+            "ORDER BY priority ASC, insertion_date ASC, id ASC"
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute(query)
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
     def set_ids_to_cached(self, id_list) -> None:
         """!@brief Update entries to be flagged as caching.
         @param self The object pointer.
@@ -229,6 +390,146 @@ class DbInterface:
             raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
                 sqlite_except
 
+    def set_ids_to_uncached(self, id_list) -> None:
+        """!@brief Update entries to no longer be flagged as cached so they are
+                   dispatched again.
+        @param self The object pointer.
+        @param id_list List of id entries to be flagged.
+        @returns None
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        id_list = ','.join([str(id) for id in id_list])
+        query = "UPDATE url_queue SET cached = 0 WHERE id IN " + \
+            f"({id_list}) AND completed = 0"
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute(query)
+            self._connection.commit()
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+    def set_id_to_completed(self, entry_id) -> None:
+        """!@brief Flag an entry as having been completed.
+        @param self The object pointer.
+        @param entry_id Id of the entry.
+        @returns None
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        query = "UPDATE url_queue SET completed = 1 WHERE id = ?"
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute(query, (entry_id,))
+            self._connection.commit()
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+    def set_ids_to_completed(self, id_list) -> None:
+        """!@brief Flag a batch of entries as having been completed.
+        @param self The object pointer.
+        @param id_list List of id entries to be flagged.
+        @returns None
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        id_list = ','.join([str(id) for id in id_list])
+        query = f"UPDATE url_queue SET completed = 1 WHERE id IN ({id_list})"
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute(query)
+            self._connection.commit()
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+    def get_max_id(self) -> int:
+        """!@brief Get the highest id in the url queue.
+        @param self The object pointer.
+        @returns int, 0 if the queue is empty.
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM url_queue')
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+        return cursor.fetchone()[0]
+
+    def iterate_urls(self, after_id=0):
+        """!@brief Iterate over the urls in the url queue without reading them
+                   all into memory.
+        @param self The object pointer.
+        @param after_id Only urls of entries with an id after this are read.
+        @returns Generator of (id, url) tuples in id order.
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute('SELECT id, url FROM url_queue WHERE id > ? ' + \
+                           'ORDER BY id', (after_id,))
+
+            rows = cursor.fetchmany(10000)
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(10000)
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+        finally:
+            cursor.close()
+
+    def get_dispatched_entries(self) -> list:
+        """!@brief Get the entries that have been dispatched but not completed.
+        @param self The object pointer.
+        @returns List of (id, task_id) tuples.
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        # Without statistics the planner prefers idx_queue_dequeue, which
+        # would also walk every completed entry.
+        query = "SELECT id, task_id FROM url_queue INDEXED BY " + \
+            "idx_queue_dispatched WHERE cached = 1 AND completed = 0"
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute(query)
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+        return cursor.fetchall()
+
     def add_url(self, url, task_type) -> None:
         """!@brief Add a url to the processing queue database.
         @param self The object pointer.
@@ -242,15 +543,130 @@ class DbInterface:
         task_type_id = 0 if task_type == 'New' else 1
 
         query = "INSERT INTO url_queue(url, insertion_date, cached, " + \
-            f"task_id, link_type) VALUES(\"{url}\", {insert_time}, 0, " + \
-            f"{task_id}\", {task_type_id})"
+            "task_id, link_type) VALUES(?, ?, 0, ?, ?)"
+        query_args = (url, insert_time, task_id, task_type_id)
 
         cursor = self._connection.cursor()
 
         try:
-            cursor.execute(query)
+            cursor.execute(query, query_args)
+            self._connection.commit()
+
+        except sqlite3.Error as sqlite_except:
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+    def add_inlinks(self, urls, inlink_adjustment=0) -> None:
+        """!@brief Count another inlink to each of a batch of urls already in
+                   the queue, as add_urls does for a repeated new link.  This
+                   is for links the seen url filter knows are in the queue,
+                   it is a cheaper update than a failed insert.
+        @param self The object pointer.
+        @param urls List of URLs, a url repeated in the batch counts once.
+        @param inlink_adjustment Priority reduction for a repeated url.
+        @returns None
+        """
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        query = "UPDATE url_queue SET inlink_count = inlink_count + 1, " + \
+            "priority = MAX(priority - ?, 0) WHERE url = ? AND cached = 0"
+        rows = [(inlink_adjustment, url) for url in dict.fromkeys(urls)]
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.executemany(query, rows)
             self._connection.commit()
 
         except sqlite3.Error as sqlite_except:
+            self._connection.rollback()
             raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
                 sqlite_except
+
+        finally:
+            cursor.close()
+
+    def add_urls(self, urls, task_type='New', priorities=None,
+                 inlink_adjustment=0, validators=None) -> Tuple[int, int]:
+        """!@brief Add a batch of urls to the processing queue database in a
+                   single transaction.  A url already in the queue isn't
+                   added again.  For a new link, if it is still waiting to
+                   be dispatched its inlink count is incremented, its
+                   priority is reduced by the inlink adjustment and any new
+                   cache validators replace the ones it has.  A rescan of a
+                   url that isn't in flight (waiting or completed) queues it
+                   again as a rescan with a new task id, priority and cache
+                   validators.
+        @param self The object pointer.
+        @param urls List of URLs to be processed.
+        @param task_type Task type e.g new or rescan.
+        @param priorities Optional list of priorities, one per url.
+        @param inlink_adjustment Priority reduction for a repeated url.
+        @param validators Optional list of (etag, last modified) tuples, one
+                          per url, either value can be None.
+        @returns Tuple of number of urls inserted and number of duplicates.
+        """
+        #pylint: disable=too-many-locals
+
+        if not self._connection:
+            raise RuntimeError('No connection')
+
+        insert_time = round(time.time())
+        task_type_id = 0 if task_type == 'New' else 1
+        priorities = priorities if priorities else [0] * len(urls)
+        validators = validators if validators else [(None, None)] * len(urls)
+
+        # Duplicates within the batch would be ignored by the insert anyway,
+        # dropping them here saves generating a task id for each.
+        unique_urls = dict(zip(urls, zip(priorities, validators)))
+        rows = [(url, insert_time, str(uuid1()), task_type_id, priority,
+                 etag, last_modified)
+                for url, (priority, (etag, last_modified))
+                in unique_urls.items()]
+
+        query = "INSERT INTO url_queue(url, insertion_date, cached, " + \
+            "task_id, link_type, priority, etag, last_modified) " + \
+            "VALUES(?, ?, 0, ?, ?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET "
+
+        if task_type_id == 0:
+            query += "inlink_count = inlink_count + 1, " + \
+                "priority = MAX(priority - ?, 0), " + \
+                "etag = COALESCE(excluded.etag, etag), " + \
+                "last_modified = COALESCE(excluded.last_modified, " + \
+                "last_modified) WHERE cached = 0"
+            rows = [row + (inlink_adjustment,) for row in rows]
+
+        # A url that is in flight is left alone, its lease is on the entry
+        # and completing it would complete the rescan.
+        else:
+            query += "cached = 0, completed = 0, link_type = 1, " + \
+                "task_id = excluded.task_id, " + \
+                "priority = excluded.priority, etag = excluded.etag, " + \
+                "last_modified = excluded.last_modified " + \
+                "WHERE cached = 0 OR completed = 1"
+
+        cursor = self._connection.cursor()
+
+        try:
+            # The row count includes updated duplicates, ids are allocated
+            # in order so the new rows are those after the highest id.
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM url_queue')
+            last_id = cursor.fetchone()[0]
+
+            cursor.executemany(query, rows)
+
+            cursor.execute('SELECT COUNT(*) FROM url_queue WHERE id > ?',
+                           (last_id,))
+            inserted = cursor.fetchone()[0]
+            self._connection.commit()
+
+        except sqlite3.Error as sqlite_except:
+            self._connection.rollback()
+            raise RuntimeError(f'Query failed, reason: {sqlite_except}') from \
+                sqlite_except
+
+        finally:
+            cursor.close()
+
+        return inserted, len(urls) - inserted
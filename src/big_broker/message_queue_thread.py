@@ -33,10 +33,11 @@ class MessageQueueThread(Thread):
         return self._queue_consumer
 
     def __init__(self, settings : MessagingQueueSettings,
-                 logger : Logger) -> None:
+                 logger : Logger, task_update_handler=None) -> None:
         super().__init__()
 
         self._logger = logger
+        self._task_update_handler = task_update_handler
         self._queue_consumer = MessagingQueue(settings, logger)
         self._queue_consumer.set_message_processor(self._process_scrape_result)
         self._thread_running = False
@@ -79,10 +80,16 @@ class MessageQueueThread(Thread):
             time.sleep(reconnect_delay)
             self._queue_consumer.reset_for_reconnect()
 
-    def _process_scrape_result(self, _channel, method, _properties, body):
+    def _process_scrape_result(self, channel, method, _properties, body):
         msg_body = json.loads(body)
         self._logger.log(LogType.Debug, f" [x] received {msg_body}")
-        self._queue_consumer.acknowledge_message(method.delivery_tag)
+
+        # Task started messages and scrape results both carry the task id,
+        # they are handed to the task update handler to update the leases.
+        if self._task_update_handler and 'task_id' in msg_body:
+            self._task_update_handler(msg_body)
+
+        self._queue_consumer.acknowledge_message(method.delivery_tag, channel)
 
     def _get_reconnect_delay(self):
         if self._queue_consumer.was_consuming:
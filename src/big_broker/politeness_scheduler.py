@@ -0,0 +1,199 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+from collections import deque
+import heapq
+import itertools
+import time
+from common.url_utils import UrlUtils
+
+class PolitenessScheduler:
+    """ Holds queue entries waiting to be dispatched in a ready queue per
+        host so that tasks for the same host are spaced at least its crawl
+        delay apart.  Hosts are kept in a min-heap on the time they can next
+        be fetched from, one entry is taken from a host per turn so hosts
+        that are ready at the same time are served round-robin.  A longer
+        crawl delay from a host's robots.txt is used if a robots filter is
+        given.  Ids of entries turned away because their host already has
+        its maximum waiting are kept as that host's overflow, so they can be
+        read again once the host has room. """
+    __slots__ = ['_default_delay', '_domain_delays', '_heap',
+                 '_max_per_domain', '_next_allowed', '_overflow',
+                 '_prune_threshold', '_queued_count', '_ready_queues',
+                 '_robots_filter', '_sequence']
+
+    @property
+    def queued_count(self) -> int:
+        """!@brief Number of entries waiting to be dispatched (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._queued_count
+
+    @property
+    def domain_count(self) -> int:
+        """!@brief Number of hosts with entries waiting (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return len(self._ready_queues)
+
+    def __init__(self, default_delay, domain_delays, max_per_domain,
+                 robots_filter=None):
+        """!@brief PolitenessScheduler class constructor.
+        @param self The object pointer.
+        @param default_delay Milliseconds between tasks for the same host.
+        @param domain_delays Dictionary of host to crawl delay overrides.
+        @param max_per_domain Maximum entries waiting for a single host.
+        @param robots_filter Optional RobotsFilter for robots.txt delays.
+        @returns None.
+        """
+        self._default_delay = default_delay / 1000
+        self._domain_delays = {domain.lower(): delay / 1000
+                               for domain, delay in domain_delays.items()}
+        self._max_per_domain = max_per_domain
+        self._robots_filter = robots_filter
+
+        self._ready_queues = {}
+        self._overflow = {}
+        self._next_allowed = {}
+        self._prune_threshold = 1024
+        self._heap = []
+        self._sequence = itertools.count()
+        self._queued_count = 0
+
+    def add(self, entry) -> bool:
+        """!@brief Add a queue entry to the ready queue for its host.
+        @param self The object pointer.
+        @param entry Queue entry dictionary, must contain 'url'.
+        @returns True if added, False if the host already has the maximum
+                 number of entries waiting, the entry id is then added to
+                 the host's overflow.
+        """
+
+        domain = UrlUtils.get_host(entry['url'])
+
+        ready_queue = self._ready_queues.get(domain)
+        overflow = self._overflow.get(domain)
+
+        if ready_queue is None:
+            ready_queue = deque()
+            self._ready_queues[domain] = ready_queue
+            due = self._next_allowed.get(domain, 0)
+            heapq.heappush(self._heap, (due, next(self._sequence), domain))
+
+        elif len(ready_queue) >= self._max_per_domain:
+            # A dict keeps the ids in the order they were read.  Only enough
+            # to fill the host's ready queue again are kept, any beyond that
+            # are read again once the dequeue position wraps around.
+            if overflow is None:
+                overflow = {}
+                self._overflow[domain] = overflow
+            if len(overflow) < self._max_per_domain:
+                overflow[entry['id']] = None
+            return False
+
+        if overflow is not None:
+            overflow.pop(entry['id'], None)
+            if not overflow:
+                del self._overflow[domain]
+
+        ready_queue.append(entry)
+        self._queued_count += 1
+        return True
+
+    def take_overflow(self, max_ids) -> list:
+        """!@brief Take the overflow ids of hosts that have room in their
+                   ready queue again.
+        @param self The object pointer.
+        @param max_ids Maximum number of ids to take.
+        @returns List of queue entry ids, oldest read first for each host.
+        """
+
+        taken = []
+
+        for domain in list(self._overflow):
+            if len(taken) >= max_ids:
+                break
+
+            ready_queue = self._ready_queues.get(domain)
+            room = self._max_per_domain - \
+                (len(ready_queue) if ready_queue else 0)
+            room = min(room, max_ids - len(taken))
+            if room <= 0:
+                continue
+
+            overflow = self._overflow[domain]
+            ids = list(itertools.islice(overflow, room))
+            for entry_id in ids:
+                del overflow[entry_id]
+            if not overflow:
+                del self._overflow[domain]
+
+            taken.extend(ids)
+
+        return taken
+
+    def pop_ready(self, max_entries=None) -> list:
+        """!@brief Take the entries that can be dispatched now.
+        @param self The object pointer.
+        @param max_entries Optional maximum number of entries to take.
+        @returns List of queue entries.
+        """
+
+        now = time.monotonic()
+        ready = []
+
+        while self._heap and self._heap[0][0] <= now:
+            if max_entries is not None and len(ready) >= max_entries:
+                break
+
+            _, _, domain = heapq.heappop(self._heap)
+            ready_queue = self._ready_queues[domain]
+
+            entry = ready_queue.popleft()
+            ready.append(entry)
+            self._queued_count -= 1
+
+            delay = self._domain_delays.get(domain, self._default_delay)
+            if self._robots_filter is not None:
+                robots_delay = self._robots_filter.crawl_delay(entry['url'])
+                if robots_delay:
+                    delay = max(delay, robots_delay / 1000)
+
+            due = now + delay
+            self._next_allowed[domain] = due
+
+            # Go to the back of the hosts due at the same time so each gets
+            # a turn before this one is served again.
+            if ready_queue:
+                heapq.heappush(self._heap, (due, next(self._sequence), domain))
+            else:
+                del self._ready_queues[domain]
+
+        self._prune_next_allowed(now)
+
+        return ready
+
+    def _prune_next_allowed(self, now) -> None:
+        # Only hosts still inside their crawl delay need remembering, this
+        # stops the table growing with every host ever dispatched to.
+        if len(self._next_allowed) <= self._prune_threshold:
+            return
+
+        self._next_allowed = {domain: due for domain, due in
+                              self._next_allowed.items() if due > now}
+        self._prune_threshold = 2 * len(self._next_allowed) + 1024
@@ -0,0 +1,122 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import time
+
+class QueueRefillController:
+    ''' Decides when the url processing queue is topped up and by how much.
+        Tasks in flight are those held waiting to be published plus those
+        ready in the queue, once they fall to the low water mark the queue is
+        topped up by the deficit to the high water mark in one batch.  The
+        queue depth is only checked when nothing is waiting on a publish
+        confirm, so a published task is never counted twice. '''
+    __slots__ = ['_check_interval', '_depth_requested_at', '_high_water_mark',
+                 '_last_check', '_low_water_mark', '_queue_depth']
+
+    ## Milliseconds after which an unanswered depth request is abandoned.
+    depth_request_timeout = 5000
+
+    @property
+    def high_water_mark(self) -> int:
+        """!@brief Number of tasks the queue is topped up to (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._high_water_mark
+
+    @property
+    def low_water_mark(self) -> int:
+        """!@brief Number of tasks that triggers a top up (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._low_water_mark
+
+    @property
+    def queue_depth(self) -> int:
+        """!@brief Last queue depth reported, None if not known (Getter).
+        @param self The object pointer.
+        @returns int or None.
+        """
+        return self._queue_depth
+
+    def __init__(self, high_water_mark, low_water_mark, check_interval):
+        """!@brief QueueRefillController class constructor.
+        @param self The object pointer.
+        @param high_water_mark Number of tasks the queue is topped up to.
+        @param low_water_mark Number of tasks that triggers a top up.
+        @param check_interval Milliseconds between queue depth checks.
+        @returns None.
+        """
+        self._high_water_mark = high_water_mark
+        self._low_water_mark = low_water_mark
+        self._check_interval = check_interval
+        self._queue_depth = None
+        self._depth_requested_at = None
+        self._last_check = None
+
+    def is_depth_check_due(self, publishes_in_flight) -> bool:
+        """!@brief Check if the queue depth should be requested.
+        @param self The object pointer.
+        @param publishes_in_flight Tasks published but not yet confirmed.
+        @returns True if a depth request should be made.
+        """
+
+        now = self._now()
+
+        if self._depth_requested_at is not None:
+            if now - self._depth_requested_at < self.depth_request_timeout:
+                return False
+            self._depth_requested_at = None
+
+        if publishes_in_flight:
+            return False
+
+        return self._last_check is None or \
+            now - self._last_check >= self._check_interval
+
+    def depth_check_requested(self) -> None:
+        """!@brief Record that a depth request has been made.
+        @param self The object pointer.
+        @returns None.
+        """
+        self._depth_requested_at = self._now()
+        self._last_check = self._depth_requested_at
+
+    def refill_size(self, queue_depth, held=0) -> int:
+        """!@brief Record the result of a depth request and calculate how many
+                   tasks should be published.
+        @param self The object pointer.
+        @param queue_depth Messages ready in the queue, None if unknown.
+        @param held Tasks read but held back waiting to be published.
+        @returns Number of tasks to publish, 0 if no top up is required.
+        """
+
+        self._depth_requested_at = None
+        self._queue_depth = queue_depth
+
+        if queue_depth is None:
+            return 0
+
+        in_flight = queue_depth + held
+        if in_flight > self._low_water_mark:
+            return 0
+
+        return self._high_water_mark - in_flight
+
+    def _now(self) -> float:
+        #pylint: disable=no-self-use
+        return time.monotonic() * 1000
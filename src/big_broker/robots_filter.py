@@ -0,0 +1,122 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from common.robots_cache import RobotsCache
+
+class RobotsFilter:
+    """ Filter for urls added to the queue that a host's robots.txt doesn't
+        allow to be crawled, dropping them at ingest saves a queue slot and a
+        wasted fetch for each.  Robots.txt files are fetched on a small
+        thread pool so that the event loop isn't blocked. """
+    __slots__ = ['_cache', '_disallowed', '_executor', '_fetch_timeout',
+                 '_max_crawl_delay', '_user_agent']
+
+    @property
+    def cache(self) -> RobotsCache:
+        """!@brief Cache of the robots.txt rules of each host (Getter).
+        @param self The object pointer.
+        @returns RobotsCache.
+        """
+        return self._cache
+
+    @property
+    def disallowed(self) -> int:
+        """!@brief Number of urls dropped by the filter (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._disallowed
+
+    def __init__(self, settings):
+        """!@brief RobotsFilter class constructor.
+        @param self The object pointer.
+        @param settings RobotsFilterSettings.
+        @returns RobotsFilter instance.
+        """
+        self._cache = RobotsCache(self._fetch, settings.user_agent,
+                                  settings.max_hosts, settings.ttl,
+                                  settings.error_ttl)
+        self._disallowed = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.fetch_threads,
+            thread_name_prefix='robots')
+        self._fetch_timeout = settings.fetch_timeout
+        self._max_crawl_delay = settings.max_crawl_delay
+        self._user_agent = settings.user_agent
+
+    async def allowed_urls(self, urls) -> set:
+        """!@brief Check a batch of urls against the robots.txt of their
+                   hosts, hosts that aren't cached are fetched concurrently.
+        @param self The object pointer.
+        @param urls List of canonical urls.
+        @returns Set of the urls that are allowed.
+        """
+
+        uncached = {}
+        for url in urls:
+            if self._cache.cached_rules(url) is None:
+                uncached.setdefault(RobotsCache.origin(url), url)
+
+        if uncached:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[
+                loop.run_in_executor(self._executor, self._cache.rules, url)
+                for url in uncached.values()])
+
+        allowed = set()
+        for url in urls:
+            rules = self._cache.cached_rules(url)
+            if rules is None or rules.is_allowed(url):
+                allowed.add(url)
+
+        self._disallowed += len(set(urls)) - len(allowed)
+        return allowed
+
+    def crawl_delay(self, url):
+        """!@brief Crawl delay a host's robots.txt asks for, only cached rules
+                   are used so this never blocks.
+        @param self The object pointer.
+        @param url Url on the host.
+        @returns Crawl delay in milliseconds, limited to the maximum crawl
+                 delay, or None if the host doesn't set one.
+        """
+
+        rules = self._cache.cached_rules(url)
+        if not rules or rules.crawl_delay is None:
+            return None
+
+        return min(rules.crawl_delay, self._max_crawl_delay) * 1000
+
+    def shutdown(self) -> None:
+        """!@brief Stop the fetch threads.
+        @param self The object pointer.
+        @returns None.
+        """
+        self._executor.shutdown(wait=False)
+
+    def _fetch(self, robots_url):
+        request = Request(robots_url, headers={'User-agent': self._user_agent})
+
+        try:
+            with urlopen(request, timeout=self._fetch_timeout) as response:
+                return response.status, response.read(RobotsCache.max_size)
+
+        except HTTPError as ex:
+            return ex.code, b''
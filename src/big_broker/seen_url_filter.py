@@ -0,0 +1,285 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import hashlib
+import math
+import os
+import struct
+
+class BloomFilter:
+    """ Fixed capacity Bloom filter using double hashing over a bytearray """
+    __slots__ = ['_bits', '_capacity', '_count', '_error_rate', '_hash_count',
+                 '_size']
+
+    @property
+    def capacity(self) -> int:
+        """!@brief Number of items the filter is sized for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._capacity
+
+    @property
+    def count(self) -> int:
+        """!@brief Number of items added (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._count
+
+    @property
+    def error_rate(self) -> float:
+        """!@brief False positive rate when at capacity (Getter).
+        @param self The object pointer.
+        @returns float.
+        """
+        return self._error_rate
+
+    @property
+    def bits(self) -> bytearray:
+        """!@brief Bit array of the filter (Getter).
+        @param self The object pointer.
+        @returns bytearray.
+        """
+        return self._bits
+
+    @property
+    def memory_bytes(self) -> int:
+        """!@brief Bytes used by the bit array (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return len(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """!@brief Estimated false positive rate at the current fill (Getter).
+        @param self The object pointer.
+        @returns float.
+        """
+        return (1 - math.exp(-self._hash_count * self._count / self._size)) \
+            ** self._hash_count
+
+    def __init__(self, capacity, error_rate, bits=None, count=0):
+        """!@brief BloomFilter class constructor.
+        @param self The object pointer.
+        @param capacity Number of items the filter is sized for.
+        @param error_rate False positive rate when at capacity.
+        @param bits Optional bit array to restore.
+        @param count Number of items in the restored bit array.
+        @returns None.
+        """
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._size = math.ceil(-capacity * math.log(error_rate) /
+                               (math.log(2) ** 2))
+        self._size = (self._size + 7) // 8 * 8
+        self._hash_count = max(round(self._size / capacity * math.log(2)), 1)
+        self._bits = bits if bits is not None else \
+            bytearray(self._size // 8)
+        self._count = count
+
+    def __contains__(self, item_hash):
+        bits = self._bits
+        return all(bits[index >> 3] & (1 << (index & 7))
+                   for index in self._indexes(item_hash))
+
+    def add(self, item_hash) -> None:
+        """!@brief Add an item by its hash.
+        @param self The object pointer.
+        @param item_hash Tuple of two 64 bit hashes of the item.
+        @returns None.
+        """
+        bits = self._bits
+        for index in self._indexes(item_hash):
+            bits[index >> 3] |= 1 << (index & 7)
+        self._count += 1
+
+    def is_full(self) -> bool:
+        """!@brief Check if the filter has reached its capacity.
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._count >= self._capacity
+
+    def _indexes(self, item_hash):
+        hash_1, hash_2 = item_hash
+        hash_2 |= 1
+        size = self._size
+        return ((hash_1 + i * hash_2) % size for i in range(self._hash_count))
+
+class SeenUrlFilter:
+    """ Scalable Bloom filter of urls already added to the queue.  When the
+        current filter is full a new one of twice the capacity and a tighter
+        error rate is added, so the overall false positive rate stays bounded
+        however many urls are added.  A false positive means a new url is
+        taken as already seen. """
+    __slots__ = ['_error_rate', '_filters', '_initial_capacity']
+
+    ## Growth in capacity and tightening of error rate for each new filter.
+    growth_factor = 2
+    tightening_ratio = 0.9
+
+    snapshot_magic = b'SRSUF001'
+
+    @property
+    def count(self) -> int:
+        """!@brief Number of urls added (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return sum(bloom.count for bloom in self._filters)
+
+    @property
+    def memory_bytes(self) -> int:
+        """!@brief Bytes used by the filter bit arrays (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return sum(bloom.memory_bytes for bloom in self._filters)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """!@brief Estimated false positive rate at the current fill (Getter).
+        @param self The object pointer.
+        @returns float.
+        """
+        true_negative = 1.0
+        for bloom in self._filters:
+            true_negative *= 1 - bloom.false_positive_rate
+        return 1 - true_negative
+
+    def __init__(self, initial_capacity, error_rate):
+        """!@brief SeenUrlFilter class constructor.
+        @param self The object pointer.
+        @param initial_capacity Number of urls the first filter is sized for.
+        @param error_rate Target overall false positive rate.
+        @returns None.
+        """
+        self._initial_capacity = initial_capacity
+        self._error_rate = error_rate
+        self._filters = []
+
+    def __contains__(self, url):
+        url_hash = self._hash(url)
+        return any(url_hash in bloom for bloom in self._filters)
+
+    def add(self, url) -> bool:
+        """!@brief Add a url to the filter.
+        @param self The object pointer.
+        @param url URL to add.
+        @returns True if the url was added, False if it was already seen.
+        """
+
+        url_hash = self._hash(url)
+        if any(url_hash in bloom for bloom in self._filters):
+            return False
+
+        if not self._filters or self._filters[-1].is_full():
+            self._add_filter()
+
+        self._filters[-1].add(url_hash)
+        return True
+
+    def copy(self):
+        """!@brief Copy the filter, e.g. so a snapshot can be written whilst
+                   urls are still being added to the original.
+        @param self The object pointer.
+        @returns SeenUrlFilter.
+        """
+
+        seen_filter = SeenUrlFilter(self._initial_capacity, self._error_rate)
+        seen_filter._filters = [  #pylint: disable=protected-access
+            BloomFilter(bloom.capacity, bloom.error_rate,
+                        bytearray(bloom.bits), bloom.count)
+            for bloom in self._filters]
+        return seen_filter
+
+    def save(self, filename, last_id) -> None:
+        """!@brief Write a snapshot of the filter, the file is replaced
+                   atomically so a crash mid-write leaves the old snapshot.
+        @param self The object pointer.
+        @param filename Snapshot filename.
+        @param last_id Id of the last url queue entry in the filter.
+        @returns None.
+        """
+
+        temp_filename = f'{filename}.tmp'
+
+        with open(temp_filename, 'wb') as handle:
+            handle.write(self.snapshot_magic)
+            handle.write(struct.pack('<QdqI', self._initial_capacity,
+                                     self._error_rate, last_id,
+                                     len(self._filters)))
+            for bloom in self._filters:
+                handle.write(struct.pack('<QdQ', bloom.capacity,
+                                         bloom.error_rate, bloom.count))
+                handle.write(bloom.bits)
+
+        os.replace(temp_filename, filename)
+
+    @classmethod
+    def load(cls, filename):
+        """!@brief Read a filter snapshot.
+        @param cls The class.
+        @param filename Snapshot filename.
+        @returns Tuple of SeenUrlFilter and the id of the last url queue
+                 entry in it.  ValueError is raised if the file is invalid.
+        """
+
+        with open(filename, 'rb') as handle:
+            if handle.read(len(cls.snapshot_magic)) != cls.snapshot_magic:
+                raise ValueError('not a seen url filter snapshot')
+
+            header = struct.Struct('<QdqI')
+            initial_capacity, error_rate, last_id, filter_count = \
+                cls._unpack(header, handle)
+
+            seen_filter = cls(initial_capacity, error_rate)
+
+            slice_header = struct.Struct('<QdQ')
+            for _ in range(filter_count):
+                capacity, slice_error_rate, count = \
+                    cls._unpack(slice_header, handle)
+                bloom = BloomFilter(capacity, slice_error_rate)
+                bits = bytearray(handle.read(bloom.memory_bytes))
+                if len(bits) != bloom.memory_bytes:
+                    raise ValueError('truncated seen url filter snapshot')
+                seen_filter._filters.append(  #pylint: disable=protected-access
+                    BloomFilter(capacity, slice_error_rate, bits, count))
+
+        return seen_filter, last_id
+
+    @staticmethod
+    def _unpack(header, handle):
+        data = handle.read(header.size)
+        if len(data) != header.size:
+            raise ValueError('truncated seen url filter snapshot')
+        return header.unpack(data)
+
+    def _add_filter(self) -> None:
+        # The first filter takes (1 - r) of the error budget, each following
+        # one r times the previous, which sums to the target error rate.
+        index = len(self._filters)
+        capacity = self._initial_capacity * self.growth_factor ** index
+        error_rate = self._error_rate * (1 - self.tightening_ratio) * \
+            self.tightening_ratio ** index
+        self._filters.append(BloomFilter(capacity, error_rate))
+
+    @staticmethod
+    def _hash(url):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        return struct.unpack('<QQ', digest)
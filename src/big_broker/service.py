@@ -14,9 +14,12 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
+from collections import deque
+import functools
 import json
-from operator import itemgetter
 import os
+import threading
+import time
 from common.crypto_utils import CryptoUtils
 from common.logger import Logger, LogType
 from common.info import BUILD_NO, COPYRIGHT_TEXT, CORE_VERSION, LICENSE_TEXT
@@ -24,13 +27,20 @@ from common.message_queue_config_mananger import MessagingQueueConfigManager
 from common.messaging_queue_settings import MessagingQueueSettings, QueueEntry
 from common.service_base import ServiceBase
 from .api.node_management import ApiNodeManagement
+from .api.queue import ApiQueue
 from .api.schedule import ApiSchedule
 from .api.task import ApiTask
 from .configuration_manager import ConfigurationManager
-from .db_caching.queue_cache import QueueCache
 from .db_interface import DbInterface
+from .queue_refill_controller import QueueRefillController
+from .robots_filter import RobotsFilter
 from .scrape_node_list import ScrapeNodeList
+from .seen_url_filter import SeenUrlFilter
+from .task_lease_table import TaskLeaseTable
+from .url_scorer import DomainRule, InlinkRule, PathDepthRule, \
+                        RescanAgeRule, UrlScorer
 from .message_queue_thread import MessageQueueThread
+from .politeness_scheduler import PolitenessScheduler
 
 class Service(ServiceBase):
     #pylint: disable=too-many-instance-attributes
@@ -39,6 +49,13 @@ class Service(ServiceBase):
     ## Title text logged during initialisation.
     title_text = 'Site Rummagge Big Broker Microservice'
 
+    ## Queue that urls to be processed are published to.
+    url_processing_queue = 'urls_to_be_processed'
+
+    ## Most reads from the queue database for a single refill, entries for
+    ## hosts that already have their maximum waiting don't fill the refill.
+    max_refill_reads = 4
+
     def __init__(self, new_instance):
         super().__init__()
 
@@ -54,12 +71,38 @@ class Service(ServiceBase):
         self._messaging_config = None
         self._api_schedule = None
         self._api_node_management = None
+        self._api_queue = None
         self._api_task = None
         self._scrape_node_list = ScrapeNodeList()
         self._crypto_utils = CryptoUtils()
         self._messaging_thread = None
-        self._queue_cache = None
+        self._refill_controller = None
+        self._politeness_scheduler = None
         self._db_interface = None
+        self._task_leases = None
+        self._next_lease_sweep = 0
+        self._seen_url_filter = None
+        self._next_filter_snapshot = 0
+        self._filter_snapshot_thread = None
+        self._robots_filter = None
+
+        # Ids of entries read from the db but not yet confirmed by the broker,
+        # either waiting in the politeness scheduler or published, and the
+        # (id, task_id, confirmed) results passed back from the messaging
+        # thread.
+        self._pending_publish_ids = set()
+        self._publish_confirmations = deque()
+
+        # Task started messages and scrape results passed back from the
+        # messaging thread.
+        self._task_updates = deque()
+
+        # (priority, insertion_date, id) of the last queue entry read from the
+        # db, the next read resumes after it.
+        self._dequeue_position = None
+
+        # Queue depths reported back from the messaging thread.
+        self._queue_depth_results = deque()
 
     def _initialise(self) -> bool:
         self._logger.write_to_console = True
@@ -111,8 +154,24 @@ class Service(ServiceBase):
         if not self._open_url_processing_db():
             return False
 
-        self._queue_cache = QueueCache(self._db_interface, self._configuration,
-                                       self._logger)
+        refill_cfg = self._configuration.queue_refill
+        self._refill_controller = QueueRefillController(
+            refill_cfg.high_water_mark, refill_cfg.low_water_mark,
+            refill_cfg.check_interval)
+
+        if self._configuration.robots_filter.enabled:
+            self._robots_filter = RobotsFilter(
+                self._configuration.robots_filter)
+
+        politeness_cfg = self._configuration.politeness
+        self._politeness_scheduler = PolitenessScheduler(
+            politeness_cfg.default_crawl_delay,
+            politeness_cfg.domain_crawl_delays,
+            politeness_cfg.max_queued_per_domain,
+            self._robots_filter)
+
+        self._recover_task_leases()
+        self._load_seen_url_filter()
 
         self._api_node_management = ApiNodeManagement(self._quart,
                                                       self._configuration,
@@ -121,7 +180,14 @@ class Service(ServiceBase):
                                                       self._crypto_utils)
 
         self._api_task = ApiTask(self._quart, self._configuration,
-                                 self._logger)
+                                 self._logger, self._task_leases,
+                                 self._db_interface)
+
+        self._api_queue = ApiQueue(self._quart, self._configuration,
+                                   self._db_interface, self._logger,
+                                   self._create_url_scorer(),
+                                   self._seen_url_filter,
+                                   self._robots_filter)
 
         self._create_message_queue_thread()
 
@@ -132,7 +198,8 @@ class Service(ServiceBase):
     def _open_url_processing_db(self):
         db_settings_cfg = self._configuration.db_settings
 
-        self._db_interface = DbInterface(db_settings_cfg.database_file)
+        self._db_interface = DbInterface(db_settings_cfg.database_file,
+                                         db_settings_cfg.tuning)
 
         if not self._db_interface.database_exists():
             if self._configuration.db_settings.fail_on_no_database:
@@ -155,6 +222,10 @@ class Service(ServiceBase):
                              self._db_interface.last_error_message)
             return False
 
+        self._logger.log(LogType.Info, 'Database pragmas in effect :->')
+        for pragma, value in self._db_interface.effective_pragmas().items():
+            self._logger.log(LogType.Info, f'+= {pragma} : {value}')
+
         return True
 
     def _display_configuration_settings(self):
@@ -180,6 +251,103 @@ class Service(ServiceBase):
                          f'+= database file : {db_settings_cfg.database_file}')
         self._logger.log(LogType.Info,
                          f'+= Fail on no db : {db_settings_cfg.fail_on_no_database}')
+        tuning = db_settings_cfg.tuning
+        self._logger.log(LogType.Info,
+                         f'+= Journal mode : {tuning.journal_mode}')
+        self._logger.log(LogType.Info,
+                         f'+= Synchronous : {tuning.synchronous}')
+        self._logger.log(LogType.Info,
+                         f'+= mmap size : {tuning.mmap_size}')
+        self._logger.log(LogType.Info,
+                         f'+= Page cache size (KiB) : {tuning.page_cache_size}')
+        self._logger.log(LogType.Info,
+                         f'+= Temp store : {tuning.temp_store}')
+        self._logger.log(LogType.Info,
+                         '+= Statement cache size : ' + \
+                         f'{tuning.statement_cache_size}')
+        self._logger.log(LogType.Info, '+==============================+')
+        refill_cfg = self._configuration.queue_refill
+        self._logger.log(LogType.Info, 'Queue Refill Settings :->')
+        self._logger.log(LogType.Info,
+                         f'+= High water mark : {refill_cfg.high_water_mark}')
+        self._logger.log(LogType.Info,
+                         f'+= Low water mark : {refill_cfg.low_water_mark}')
+        self._logger.log(LogType.Info,
+                         f'+= Check interval : {refill_cfg.check_interval}ms')
+        self._logger.log(LogType.Info, '+==============================+')
+        politeness_cfg = self._configuration.politeness
+        self._logger.log(LogType.Info, 'Politeness Settings :->')
+        self._logger.log(LogType.Info,
+                         '+= Default crawl delay : ' + \
+                         f'{politeness_cfg.default_crawl_delay}ms')
+        for domain, delay in politeness_cfg.domain_crawl_delays.items():
+            self._logger.log(LogType.Info,
+                             f'+= Crawl delay for {domain} : {delay}ms')
+        self._logger.log(LogType.Info,
+                         '+= Max queued per domain : ' + \
+                         f'{politeness_cfg.max_queued_per_domain}')
+        self._logger.log(LogType.Info, '+==============================+')
+        robots_cfg = self._configuration.robots_filter
+        self._logger.log(LogType.Info, 'Robots Filter Settings :->')
+        self._logger.log(LogType.Info, f'+= Enabled : {robots_cfg.enabled}')
+        self._logger.log(LogType.Info,
+                         f'+= User agent : {robots_cfg.user_agent}')
+        self._logger.log(LogType.Info,
+                         f'+= Max hosts : {robots_cfg.max_hosts}')
+        self._logger.log(LogType.Info, f'+= TTL : {robots_cfg.ttl}s')
+        self._logger.log(LogType.Info,
+                         f'+= Error TTL : {robots_cfg.error_ttl}s')
+        self._logger.log(LogType.Info,
+                         f'+= Fetch timeout : {robots_cfg.fetch_timeout}s')
+        self._logger.log(LogType.Info,
+                         f'+= Fetch threads : {robots_cfg.fetch_threads}')
+        self._logger.log(LogType.Info,
+                         f'+= Max crawl delay : {robots_cfg.max_crawl_delay}s')
+        self._logger.log(LogType.Info, '+==============================+')
+        canonical_cfg = self._configuration.url_canonicalisation
+        self._logger.log(LogType.Info, 'Url Canonicalisation Settings :->')
+        self._logger.log(LogType.Info,
+                         '+= Strip tracking parameters : ' + \
+                         f'{canonical_cfg.strip_tracking_parameters}')
+        self._logger.log(LogType.Info, '+==============================+')
+        filter_cfg = self._configuration.seen_url_filter
+        self._logger.log(LogType.Info, 'Seen Url Filter Settings :->')
+        self._logger.log(LogType.Info, f'+= Enabled : {filter_cfg.enabled}')
+        self._logger.log(LogType.Info,
+                         '+= Initial capacity : ' + \
+                         f'{filter_cfg.initial_capacity}')
+        self._logger.log(LogType.Info,
+                         f'+= Error rate : {filter_cfg.error_rate}')
+        self._logger.log(LogType.Info,
+                         f'+= Snapshot file : {filter_cfg.snapshot_file}')
+        self._logger.log(LogType.Info,
+                         '+= Snapshot interval : ' + \
+                         f'{filter_cfg.snapshot_interval}s')
+        self._logger.log(LogType.Info, '+==============================+')
+        scoring_cfg = self._configuration.url_scoring
+        self._logger.log(LogType.Info, 'Url Scoring Settings :->')
+        self._logger.log(LogType.Info,
+                         f'+= Base priority : {scoring_cfg.base_priority}')
+        self._logger.log(LogType.Info,
+                         '+= Path depth weight : ' + \
+                         f'{scoring_cfg.path_depth_weight}')
+        self._logger.log(LogType.Info,
+                         f'+= Inlink weight : {scoring_cfg.inlink_weight}')
+        self._logger.log(LogType.Info,
+                         '+= Rescan age weight : ' + \
+                         f'{scoring_cfg.rescan_age_weight}')
+        for domain, adjustment in scoring_cfg.domain_adjustments.items():
+            self._logger.log(LogType.Info,
+                             f'+= Adjustment for {domain} : {adjustment}')
+        self._logger.log(LogType.Info, '+==============================+')
+        lease_cfg = self._configuration.task_leases
+        self._logger.log(LogType.Info, 'Task Lease Settings :->')
+        self._logger.log(LogType.Info,
+                         f'+= Lease timeout : {lease_cfg.lease_timeout}s')
+        self._logger.log(LogType.Info,
+                         f'+= Sweep interval : {lease_cfg.sweep_interval}s')
+        self._logger.log(LogType.Info,
+                         f'+= Queue timeout : {lease_cfg.queue_timeout}s')
         self._logger.log(LogType.Info, '+==============================+')
         cfg = self._messaging_config.connection_settings
         self._logger.log(LogType.Info, 'Messaging Service Settings :->')
@@ -195,9 +363,20 @@ class Service(ServiceBase):
                 f'{cfg.queue.name}')
             self._logger.log(LogType.Info, '+= Is durable : ' + \
                 f'{cfg.queue.is_durable}')
+            self._logger.log(LogType.Info, '+= Prefetch count : ' + \
+                f'{cfg.prefetch_count}')
+            self._logger.log(LogType.Info, '+= Worker threads : ' + \
+                f'{cfg.worker_threads}')
 
         cfg = self._messaging_config.producers_settings
         if cfg:
+            self._logger.log(LogType.Info, '  Producer batching :->')
+            self._logger.log(LogType.Info, '+= Batch size : ' + \
+                f'{cfg.batch_size}')
+            self._logger.log(LogType.Info, '+= Batch interval : ' + \
+                f'{cfg.batch_interval}ms')
+            self._logger.log(LogType.Info, '+= Publisher confirms : ' + \
+                f'{cfg.publisher_confirms}')
             for queue in cfg.queues:
                 self._logger.log(LogType.Info, '  Producer queue :->')
                 self._logger.log(LogType.Info, '+= Queue  name : ' + \
@@ -220,6 +399,16 @@ class Service(ServiceBase):
             consumer_settings.queue.is_durable
         settings.queue_consumer_definition.queue.name = \
             consumer_settings.queue.name
+        settings.queue_consumer_definition.prefetch_count = \
+            consumer_settings.prefetch_count
+        settings.queue_consumer_definition.worker_threads = \
+            consumer_settings.worker_threads
+
+        settings.publishing_queues.batch_size = producers_settings.batch_size
+        settings.publishing_queues.batch_interval = \
+            producers_settings.batch_interval
+        settings.publishing_queues.publisher_confirms = \
+            producers_settings.publisher_confirms
 
         for producer in producers_settings.queues:
             entry = QueueEntry()
@@ -227,51 +416,143 @@ class Service(ServiceBase):
             entry.is_durable = producer.is_durable
             settings.publishing_queues.add_queue(entry)
 
-        self._messaging_thread = MessageQueueThread(settings, self._logger)
+        self._messaging_thread = MessageQueueThread(settings, self._logger,
+                                                    self._task_updates.append)
         self._messaging_thread.start()
 
     async def _main_loop(self) -> None:
-        cached_entries = self._get_cached_queue_entries()
+        self._process_publish_confirmations()
+        self._process_task_updates()
+        self._sweep_expired_leases()
+        self._snapshot_seen_url_filter()
+        self._refill_url_queue()
 
-        if cached_entries:
-            self._add_cached_entries_to_message_queue(cached_entries)
+        ready_entries = self._politeness_scheduler.pop_ready()
+        if ready_entries:
+            self._add_cached_entries_to_message_queue(ready_entries)
 
     def _shutdown(self):
         self._logger.log(LogType.Info, 'Shutting down...')
         self._messaging_thread.stop()
         self._messaging_thread.join()
 
+        if self._seen_url_filter is not None:
+            if self._filter_snapshot_thread:
+                self._filter_snapshot_thread.join()
+            self._write_filter_snapshot(self._seen_url_filter,
+                                        self._db_interface.get_max_id())
+            self._logger.log(LogType.Info, '|-> Seen url filter saved')
+
+        if self._robots_filter is not None:
+            self._robots_filter.shutdown()
+            cache = self._robots_filter.cache
+            self._logger.log(LogType.Info, '|-> Robots filter stopped, ' + \
+                             f'{self._robots_filter.disallowed} urls ' + \
+                             f'disallowed, {cache.size} hosts cached')
+
         if self._db_interface.is_connected:
             self._db_interface.close()
             self._logger.log(LogType.Info, '|-> Database connection closed')
 
-    def _get_cached_queue_entries(self) -> list:
-        """!@brief Get a list of cached queue from queue database, the number
-                   of entries depends on the size/length of the current cache
-                   queue and the configurable size of queue from the config.
+    def _refill_url_queue(self) -> None:
+        """!@brief Top up the url processing queue from the queue database.
+                   The depth of the queue is requested from the messaging
+                   thread and once it is reported the refill controller
+                   decides how many entries are needed.
         @param self The object pointer.
-        @returns Variable lengthed list of queue entries, enpty if none are
-                 required or available.
+        @returns None.
         """
 
-        queue_size = self._queue_cache.size_all_queue
+        scheduler = self._politeness_scheduler
+
+        while self._queue_depth_results:
+            queue_depth = self._queue_depth_results.popleft()
+            refill_size = self._refill_controller.refill_size(
+                queue_depth, scheduler.queued_count)
+
+            if refill_size:
+                self._fill_politeness_scheduler(refill_size)
+
+        in_flight = len(self._pending_publish_ids) - scheduler.queued_count
+        if self._refill_controller.is_depth_check_due(in_flight):
+            queue_consumer = self._messaging_thread.queue_consumer
+            if queue_consumer.query_queue_depth(
+                    self.url_processing_queue,
+                    self._queue_depth_results.append):
+                self._refill_controller.depth_check_requested()
+
+    def _fill_politeness_scheduler(self, refill_size) -> None:
+        """!@brief Read entries from the queue database into the politeness
+                   scheduler until refill size entries have been added.
+                   Entries turned away by the per-host cap are kept as the
+                   host's overflow by the scheduler and read again by id
+                   once the host has room, so the dequeue position always
+                   moves on and other hosts aren't held up behind them.
+        @param self The object pointer.
+        @param refill_size Number of entries wanted.
+        @returns None.
+        """
 
-        if queue_size < self._configuration.db_settings.cache_size:
-            get_size = queue_size - self._configuration.db_settings.cache_size
+        scheduler = self._politeness_scheduler
+        added = 0
+
+        overflow_ids = [entry_id for entry_id in
+                        scheduler.take_overflow(refill_size)
+                        if entry_id not in self._pending_publish_ids]
+        if overflow_ids:
+            for entry in self._db_interface.get_queue_entries(overflow_ids):
+                if scheduler.add(entry):
+                    self._pending_publish_ids.add(entry['id'])
+                    added += 1
+
+        for _ in range(self.max_refill_reads):
+            if added >= refill_size:
+                break
+
+            entries = self._get_cached_queue_entries(refill_size - added)
+            if not entries:
+                break
+
+            for entry in entries:
+                if scheduler.add(entry):
+                    self._pending_publish_ids.add(entry['id'])
+                    added += 1
+
+    def _get_cached_queue_entries(self, get_size) -> list:
+        """!@brief Get a list of queue entries from the queue database that
+                   are not yet cached or waiting on a publish confirm.
+        @param self The object pointer.
+        @param get_size Maximum number of entries to get.
+        @returns Variable lengthed list of queue entries, enpty if none are
+                 available.
+        """
 
-            return self._db_interface.get_queue_cache(get_size)
+        entries = self._db_interface.get_queue_cache(
+            get_size, existing_ids=self._pending_publish_ids,
+            after=self._dequeue_position)
+
+        # Once the end of the queue is reached start again from the
+        # beginning, this picks up entries whose publish failed and any
+        # inserted ahead of the position, e.g. with a higher priority.
+        if entries:
+            last_entry = entries[-1]
+            self._dequeue_position = (last_entry['priority'],
+                                      last_entry['insertion_date'],
+                                      last_entry['id'])
+        else:
+            self._dequeue_position = None
 
-        return []
+        return entries
 
     def _add_cached_entries_to_message_queue(self, entries):
 
-        routing_key = 'urls_to_be_processed'
+        routing_key = self.url_processing_queue
 
-        self._logger.log(LogType.Info,
-                         f'Cached {len(entries)} new db entries...')
-        id_list = list(map(itemgetter('id'), entries))
-        self._db_interface.set_ids_to_cached(id_list)
+        self._logger.log(LogType.Debug,
+                         f'Dispatching {len(entries)} queue entries...')
 
+        # Entries are only flagged as cached once the broker has confirmed
+        # them, until then they are pending so they aren't read again.
         for entry in entries:
             task_type = 'New' if entry['link_type'] == 0 else 'Rescan'
             message_body = {
@@ -279,5 +560,266 @@ class Service(ServiceBase):
                 'task_type': task_type,
                 'task_id': entry['task_id']
             }
-            self._messaging_thread.queue_consumer.publish_message(
-                '', routing_key, json.dumps(message_body))
+
+            # Validators let the scrape node make a conditional request, so
+            # an unchanged page is not downloaded again.
+            if task_type == 'Rescan':
+                if entry['etag']:
+                    message_body['etag'] = entry['etag']
+                if entry['last_modified']:
+                    message_body['last_modified'] = entry['last_modified']
+            on_confirm = functools.partial(self._on_publish_confirm,
+                                           entry['id'], entry['task_id'])
+            self._pending_publish_ids.add(entry['id'])
+            self._messaging_thread.queue_consumer.queue_publish(
+                '', routing_key, json.dumps(message_body), on_confirm)
+
+    def _on_publish_confirm(self, entry_id, task_id, confirmed) -> None:
+        """!@brief Publish confirm callback, called on the messaging thread
+                   so the result is handed to the main loop to update the db.
+        @param self The object pointer.
+        @param entry_id Id of the queue entry that was published.
+        @param task_id Task id of the queue entry that was published.
+        @param confirmed True if the broker confirmed the message.
+        @returns None.
+        """
+        self._publish_confirmations.append((entry_id, task_id, confirmed))
+
+    def _process_publish_confirmations(self) -> None:
+        """!@brief Flag confirmed entries as cached in a single update and
+                   lease their tasks, entries that were not confirmed stop
+                   being pending so they will be read and published again.
+                   A task waits in the message queue before a scrape node
+                   takes it, so it is leased for the queue timeout until the
+                   node reports that it has started.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        confirmed_ids = []
+        failed = 0
+        queue_timeout = self._configuration.task_leases.queue_timeout
+
+        while self._publish_confirmations:
+            entry_id, task_id, confirmed = \
+                self._publish_confirmations.popleft()
+            self._pending_publish_ids.discard(entry_id)
+
+            if confirmed:
+                confirmed_ids.append(entry_id)
+                self._task_leases.add(task_id, entry_id, queue_timeout)
+            else:
+                failed += 1
+
+        if confirmed_ids:
+            self._db_interface.set_ids_to_cached(confirmed_ids)
+
+        if failed:
+            self._logger.log(LogType.Warn,
+                             f'{failed} queue entries were not confirmed ' + \
+                             'by the message queue, they will be resent')
+
+    def _process_task_updates(self) -> None:
+        """!@brief Process the task started messages and scrape results sent
+                   by the scrape nodes.  A started task has its lease
+                   restarted with the lease timeout, a task with a result has
+                   its lease released and its entry flagged as completed
+                   whether or not the scrape succeeded, as a failed scrape
+                   (e.g. a 404 or a page disallowed by robots.txt) would fail
+                   again.  Completed entries are flagged in a single update.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        completed_ids = []
+        late = 0
+
+        while self._task_updates:
+            update = self._task_updates.popleft()
+            task_id = update['task_id']
+
+            if update.get('started'):
+                self._task_leases.start(task_id, update.get('node_id'))
+                continue
+
+            lease = self._task_leases.complete(task_id)
+
+            # A task without a lease has expired and been queued again, it
+            # will be dispatched again so the result is just logged.
+            if lease:
+                completed_ids.append(lease.queue_id)
+            else:
+                late += 1
+
+        if completed_ids:
+            try:
+                self._db_interface.set_ids_to_completed(completed_ids)
+
+            except RuntimeError as ex:
+                self._logger.log(LogType.Error,
+                                 f'Failed to complete tasks, reason: {ex}')
+
+        if late:
+            self._logger.log(LogType.Warn,
+                             f'{late} task results arrived after their ' + \
+                             'lease expired')
+
+    def _create_url_scorer(self) -> UrlScorer:
+        """!@brief Create the url scorer with the scoring rules from the
+                   configuration.
+        @param self The object pointer.
+        @returns UrlScorer.
+        """
+
+        scoring_cfg = self._configuration.url_scoring
+
+        url_scorer = UrlScorer(scoring_cfg.base_priority)
+        url_scorer.add_rule(PathDepthRule(scoring_cfg.path_depth_weight))
+        url_scorer.add_rule(DomainRule(scoring_cfg.domain_adjustments))
+        url_scorer.add_rule(InlinkRule(scoring_cfg.inlink_weight))
+        url_scorer.add_rule(RescanAgeRule(scoring_cfg.rescan_age_weight))
+
+        return url_scorer
+
+    def _recover_task_leases(self) -> None:
+        """!@brief Create the task lease table, leasing any task dispatched
+                   but not completed before the broker last stopped so that
+                   it is queued again if it doesn't complete.  It isn't known
+                   whether these tasks have been started, so they are leased
+                   for the queue timeout.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        lease_cfg = self._configuration.task_leases
+        self._task_leases = TaskLeaseTable(lease_cfg.lease_timeout)
+
+        for entry_id, task_id in self._db_interface.get_dispatched_entries():
+            self._task_leases.add(task_id, entry_id, lease_cfg.queue_timeout)
+
+        self._logger.log(LogType.Info,
+                         f'Recovered {len(self._task_leases)} task leases')
+
+    def _sweep_expired_leases(self) -> None:
+        """!@brief Queue the tasks of all expired leases again in a single
+                   update, this is done at most once per sweep interval.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        now = time.monotonic()
+        if now < self._next_lease_sweep:
+            return
+
+        self._next_lease_sweep = now + \
+            self._configuration.task_leases.sweep_interval
+
+        expired = self._task_leases.pop_expired()
+        if not expired:
+            return
+
+        self._db_interface.set_ids_to_uncached(
+            [lease.queue_id for lease in expired])
+
+        # Re-queued entries are behind the dequeue position, start the next
+        # read from the beginning so they are picked up straight away.
+        self._dequeue_position = None
+
+        self._logger.log(LogType.Warn,
+                         f'{len(expired)} task leases expired, the tasks ' + \
+                         'have been queued again')
+
+    def _load_seen_url_filter(self) -> None:
+        """!@brief Load the seen url filter from its snapshot and add the urls
+                   queued since it was taken, if there is no usable snapshot
+                   the filter is rebuilt from the whole url queue.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        filter_cfg = self._configuration.seen_url_filter
+        if not filter_cfg.enabled:
+            return
+
+        seen_filter = None
+        last_id = 0
+
+        if os.path.isfile(filter_cfg.snapshot_file):
+            try:
+                seen_filter, last_id = SeenUrlFilter.load(
+                    filter_cfg.snapshot_file)
+
+            except (OSError, ValueError) as ex:
+                self._logger.log(LogType.Warn,
+                                 'Unable to load seen url filter ' + \
+                                 f'snapshot, reason: {ex}')
+
+            # A snapshot of entries the db doesn't have means the db has
+            # been replaced, the filter would drop urls it has never seen.
+            if seen_filter and last_id > self._db_interface.get_max_id():
+                self._logger.log(LogType.Warn,
+                                 'Seen url filter snapshot is ahead of ' + \
+                                 'the database, rebuilding it')
+                seen_filter = None
+                last_id = 0
+
+        if not seen_filter:
+            seen_filter = SeenUrlFilter(filter_cfg.initial_capacity,
+                                        filter_cfg.error_rate)
+
+        for _, url in self._db_interface.iterate_urls(last_id):
+            seen_filter.add(url)
+
+        self._seen_url_filter = seen_filter
+        self._next_filter_snapshot = time.monotonic() + \
+            filter_cfg.snapshot_interval
+        self._log_seen_url_filter_statistics()
+
+    def _snapshot_seen_url_filter(self) -> None:
+        """!@brief Write a snapshot of the seen url filter once per snapshot
+                   interval.  The filter is copied and written on a separate
+                   thread so urls can still be added whilst it is written.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        if self._seen_url_filter is None:
+            return
+
+        now = time.monotonic()
+        if now < self._next_filter_snapshot:
+            return
+
+        if self._filter_snapshot_thread and \
+           self._filter_snapshot_thread.is_alive():
+            return
+
+        self._next_filter_snapshot = now + \
+            self._configuration.seen_url_filter.snapshot_interval
+
+        self._log_seen_url_filter_statistics()
+
+        self._filter_snapshot_thread = threading.Thread(
+            target=self._write_filter_snapshot,
+            args=(self._seen_url_filter.copy(),
+                  self._db_interface.get_max_id()),
+            daemon=True)
+        self._filter_snapshot_thread.start()
+
+    def _write_filter_snapshot(self, seen_filter, last_id) -> None:
+        try:
+            seen_filter.save(self._configuration.seen_url_filter.snapshot_file,
+                             last_id)
+
+        except OSError as ex:
+            self._logger.log(LogType.Error,
+                             'Unable to save seen url filter snapshot, ' + \
+                             f'reason: {ex}')
+
+    def _log_seen_url_filter_statistics(self) -> None:
+        seen_filter = self._seen_url_filter
+        self._logger.log(LogType.Info,
+                         f'Seen url filter : {seen_filter.count} urls, ' + \
+                         f'{seen_filter.memory_bytes / 1048576:.1f}MB, ' + \
+                         'estimated false positive rate ' + \
+                         f'{seen_filter.false_positive_rate:.6f}')
@@ -0,0 +1,168 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import heapq
+import time
+
+class TaskLease:
+    """ Class that encapsulates a lease on a dispatched task """
+    #pylint: disable=too-few-public-methods
+    __slots__ = ['_deadline', '_dispatch_time', '_node_id', '_queue_id',
+                 '_task_id']
+
+    @property
+    def task_id(self) -> str:
+        """!@brief Unique identifier of the task (Getter).
+        @param self The object pointer.
+        @returns str.
+        """
+        return self._task_id
+
+    @property
+    def queue_id(self) -> int:
+        """!@brief Id of the url queue entry for the task (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._queue_id
+
+    @property
+    def dispatch_time(self) -> float:
+        """!@brief Time the task was dispatched (Getter).
+        @param self The object pointer.
+        @returns float seconds since the epoch.
+        """
+        return self._dispatch_time
+
+    @property
+    def node_id(self) -> str:
+        """!@brief Identifier of the scrape node running the task (Getter).
+        @param self The object pointer.
+        @returns str or None if no node has reported starting the task.
+        """
+        return self._node_id
+
+    @property
+    def deadline(self) -> float:
+        """!@brief Time the lease expires (Getter).
+        @param self The object pointer.
+        @returns float seconds since the epoch.
+        """
+        return self._deadline
+
+    def __init__(self, task_id, queue_id, dispatch_time, deadline,
+                 node_id=None):
+        #pylint: disable=too-many-arguments
+        self._task_id = task_id
+        self._queue_id = queue_id
+        self._dispatch_time = dispatch_time
+        self._deadline = deadline
+        self._node_id = node_id
+
+class TaskLeaseTable:
+    """ Leases on dispatched tasks keyed by task id.  A task that isn't
+        completed before its lease expires is handed back by pop_expired so
+        that it can be queued again. """
+    __slots__ = ['_deadlines', '_lease_timeout', '_leases']
+
+    @property
+    def lease_timeout(self) -> int:
+        """!@brief Seconds a task is leased for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._lease_timeout
+
+    def __init__(self, lease_timeout):
+        """!@brief TaskLeaseTable class constructor.
+        @param self The object pointer.
+        @param lease_timeout Seconds a task is leased for.
+        @returns None.
+        """
+        self._lease_timeout = lease_timeout
+        self._leases = {}
+
+        # Min-heap of (deadline, task_id), entries for leases that have been
+        # completed are left in the heap and skipped when they reach the top.
+        self._deadlines = []
+
+    def __len__(self):
+        return len(self._leases)
+
+    def add(self, task_id, queue_id, timeout=None, node_id=None) \
+            -> TaskLease:
+        """!@brief Lease a task that has just been dispatched.
+        @param self The object pointer.
+        @param task_id Unique identifier of the task.
+        @param queue_id Id of the url queue entry for the task.
+        @param timeout Optional seconds to lease the task for, the default
+                       is the lease timeout.
+        @param node_id Optional identifier of the scrape node running the
+                       task.
+        @returns TaskLease.
+        """
+
+        timeout = self._lease_timeout if timeout is None else timeout
+        dispatch_time = time.time()
+        lease = TaskLease(task_id, queue_id, dispatch_time,
+                          dispatch_time + timeout, node_id)
+        self._leases[task_id] = lease
+        heapq.heappush(self._deadlines, (lease.deadline, task_id))
+        return lease
+
+    def start(self, task_id, node_id=None) -> TaskLease:
+        """!@brief Restart the lease of a task that a scrape node has taken
+                   from the message queue, it then has the lease timeout to
+                   complete.
+        @param self The object pointer.
+        @param task_id Unique identifier of the task.
+        @param node_id Identifier of the scrape node that took the task.
+        @returns TaskLease or None if the task isn't leased.
+        """
+
+        lease = self._leases.get(task_id)
+        if not lease:
+            return None
+
+        return self.add(task_id, lease.queue_id, node_id=node_id)
+
+    def complete(self, task_id) -> TaskLease:
+        """!@brief Release the lease on a completed task.
+        @param self The object pointer.
+        @param task_id Unique identifier of the task.
+        @returns TaskLease or None if the task isn't leased.
+        """
+        return self._leases.pop(task_id, None)
+
+    def pop_expired(self) -> list:
+        """!@brief Remove and return all of the leases that have expired.
+        @param self The object pointer.
+        @returns List of TaskLease.
+        """
+
+        now = time.time()
+        expired = []
+
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, task_id = heapq.heappop(self._deadlines)
+
+            # Skip completed leases and those since replaced by a new lease.
+            lease = self._leases.get(task_id)
+            if lease and lease.deadline == deadline:
+                del self._leases[task_id]
+                expired.append(lease)
+
+        return expired
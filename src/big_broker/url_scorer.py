@@ -0,0 +1,150 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import time
+from common.url_utils import UrlUtils
+
+class ScoringRule:
+    """ Base class for a url scoring rule, a rule returns an adjustment to the
+        priority of a url being added to the queue.  Lower priorities are
+        dispatched first so a negative adjustment promotes a url. """
+    __slots__ = []
+
+    @property
+    def inlink_adjustment(self) -> int:
+        """!@brief Adjustment applied each time another link to a url that
+                   is already queued is seen (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        #pylint: disable=no-self-use
+        return 0
+
+    def score(self, url, host, link_type, last_scanned) -> int:
+        """!@brief Calculate the priority adjustment for a url.
+        @param self The object pointer.
+        @param url URL being added.
+        @param host Host of the url.
+        @param link_type Link type e.g. New or Rescan.
+        @param last_scanned Time the url was last scanned, None if unknown.
+        @returns int.
+        """
+        #pylint: disable=no-self-use, unused-argument, too-many-arguments
+        return 0
+
+class PathDepthRule(ScoringRule):
+    """ Demote urls the deeper they are in their site's path """
+    __slots__ = ['_weight']
+
+    def __init__(self, weight):
+        self._weight = weight
+
+    def score(self, url, host, link_type, last_scanned) -> int:
+        #pylint: disable=too-many-arguments
+        url_path = UrlUtils.split_url_into_domain_and_page(url)['url_path']
+        if not url_path:
+            return 0
+
+        depth = len([part for part in url_path.split('?')[0].split('/')
+                     if part])
+        return self._weight * depth
+
+class DomainRule(ScoringRule):
+    """ Fixed adjustment for urls on specific hosts """
+    __slots__ = ['_domain_adjustments']
+
+    def __init__(self, domain_adjustments):
+        self._domain_adjustments = {domain.lower(): adjustment for
+                                    domain, adjustment in
+                                    domain_adjustments.items()}
+
+    def score(self, url, host, link_type, last_scanned) -> int:
+        #pylint: disable=too-many-arguments
+        return self._domain_adjustments.get(host, 0)
+
+class InlinkRule(ScoringRule):
+    """ Promote queued urls each time another page links to them """
+    __slots__ = ['_weight']
+
+    def __init__(self, weight):
+        self._weight = weight
+
+    @property
+    def inlink_adjustment(self) -> int:
+        return self._weight
+
+class RescanAgeRule(ScoringRule):
+    """ Promote rescans the longer it has been since the last scan """
+    __slots__ = ['_weight_per_day']
+
+    def __init__(self, weight_per_day):
+        self._weight_per_day = weight_per_day
+
+    def score(self, url, host, link_type, last_scanned) -> int:
+        #pylint: disable=too-many-arguments
+        if link_type != 'Rescan' or not last_scanned:
+            return 0
+
+        days_since_scan = max(time.time() - last_scanned, 0) // 86400
+        return -int(self._weight_per_day * days_since_scan)
+
+class UrlScorer:
+    """ Calculates the queue priority of urls being added to the queue by
+        summing the adjustments of its rules onto a base priority. """
+    __slots__ = ['_base_priority', '_rules']
+
+    @property
+    def inlink_adjustment(self) -> int:
+        """!@brief Total priority reduction when another link to an already
+                   queued url is seen (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return sum(rule.inlink_adjustment for rule in self._rules)
+
+    def __init__(self, base_priority):
+        """!@brief UrlScorer class constructor.
+        @param self The object pointer.
+        @param base_priority Priority of a url before any rule is applied.
+        @returns None.
+        """
+        self._base_priority = base_priority
+        self._rules = []
+
+    def add_rule(self, rule : ScoringRule) -> None:
+        """!@brief Add a scoring rule.
+        @param self The object pointer.
+        @param rule Rule to add.
+        @returns None.
+        """
+        self._rules.append(rule)
+
+    def priority(self, url, link_type='New', last_scanned=None) -> int:
+        """!@brief Calculate the priority of a url, lower is dispatched first.
+        @param self The object pointer.
+        @param url URL being added.
+        @param link_type Link type e.g. New or Rescan.
+        @param last_scanned Time the url was last scanned, None if unknown.
+        @returns int, never negative.
+        """
+
+        host = UrlUtils.get_host(url)
+        priority = self._base_priority
+
+        for rule in self._rules:
+            priority += rule.score(url, host, link_type, last_scanned)
+
+        return max(priority, 0)
@@ -28,6 +28,8 @@ class WebpageAdd:
         general_url_path = 'url_path'
         general_read_successful = 'successfully_read'
         general_hash = 'hash'
+        general_etag = 'etag'
+        general_last_modified = 'last_modified'
 
         # -- Metadata sub-elements --
         # ---------------------------
@@ -63,6 +65,14 @@ class WebpageAdd:
                     'successfully_read':
                     {
                         "type" : "boolean"
+                    },
+                    'etag':
+                    {
+                        "type" : "string"
+                    },
+                    'last_modified':
+                    {
+                        "type" : "string"
                     }
                 },
                 "required" : ['domain', 'url_path', 'hash',
@@ -88,6 +98,68 @@ class WebpageAdd:
         "required" : ['general_settings', 'metadata']
     }
 
+class WebpageAddBatch:
+    ''' Definition of the webpage/add_batch JSON schema, each page is the
+        same as the body of a webpage/add request '''
+    #pylint: disable=too-few-public-methods
+
+    class Elements:
+        ''' Definition of the JSON elements'''
+        #pylint: disable=too-few-public-methods
+
+        pages = 'pages'
+
+    ## Most pages accepted in a single batch.
+    max_pages = 500
+
+    Schema = \
+    {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+
+        "type" : "object",
+        "additionalProperties" : False,
+
+        "properties":
+        {
+            'pages':
+            {
+                "type" : "array",
+                "minItems": 1,
+                "maxItems": max_pages,
+                "items":
+                {
+                    "type" : "object",
+                    "additionalProperties" : False,
+                    "properties": WebpageAdd.Schema['properties'],
+                    "required" : WebpageAdd.Schema['required']
+                }
+            }
+        },
+        "required" : ['pages']
+    }
+
+class WebpageAddBatchResponse:
+    ''' Definition of the webpage/add_batch response JSON elements, there
+        is a result for each page in the same order as the request '''
+    #pylint: disable=too-few-public-methods
+
+    class Elements:
+        ''' Definition of the JSON elements'''
+        #pylint: disable=too-few-public-methods
+
+        results = 'results'
+        domain = 'domain'
+        url_path = 'url_path'
+        status = 'status'
+
+    class Status:
+        ''' Status of a page in the batch '''
+        #pylint: disable=too-few-public-methods
+
+        added = 'added'
+        updated = 'updated'
+        duplicate = 'duplicate'
+
 class WebpageDetails:
     ''' Definition of the webpage/details JSON schema'''
     #pylint: disable=too-few-public-methods
@@ -122,6 +194,38 @@ class WebpageDetails:
         "required" : ['domain', 'url_path']
     }
 
+class WebpageNotModified:
+    ''' Definition of the webpage/not_modified JSON schema'''
+    #pylint: disable=too-few-public-methods
+
+    class Elements:
+        ''' Definition of the JSON elements'''
+        #pylint: disable=too-few-public-methods
+
+        domain = 'domain'
+        url_path = 'url_path'
+
+    Schema = \
+    {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+
+        "type" : "object",
+        "additionalProperties" : False,
+
+        "properties":
+        {
+            'domain':
+            {
+                "type" : "string"
+            },
+            'url_path':
+            {
+                "type" : "string"
+            }
+        },
+        "required" : ['domain', 'url_path']
+    }
+
 class WebpageDetailsResponse:
     ''' Definition of the webpage/details response JSON schema'''
     #pylint: disable=too-few-public-methods
@@ -135,6 +239,8 @@ class WebpageDetailsResponse:
         abstract = 'abstract'
         last_scanned = 'last scanned'
         page_hash = 'hash'
+        etag = 'etag'
+        last_modified = 'last modified'
 
     Schema = \
     {
@@ -164,6 +270,14 @@ class WebpageDetailsResponse:
             'hash':
             {
                 "type" : "string"
+            },
+            'etag':
+            {
+                "type" : ["string", "null"]
+            },
+            'last modified':
+            {
+                "type" : ["string", "null"]
             }
         },
         "required" : ['title', 'abstract', 'read successful', 'last scanned']
@@ -72,6 +72,9 @@ class AddToQueue:
 
         url = 'url'
         link_type = 'link_type'
+        last_scanned = 'last_scanned'
+        etag = 'etag'
+        last_modified = 'last_modified'
 
     schema = \
     {
@@ -88,6 +91,24 @@ class AddToQueue:
                     {
                         "type" : "string",
                         "minLength": 4
+                    },
+                    'link_type':
+                    {
+                        "type" : "string",
+                        "enum": ["New", "Rescan"]
+                    },
+                    'last_scanned':
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    },
+                    'etag':
+                    {
+                        "type" : "string"
+                    },
+                    'last_modified':
+                    {
+                        "type" : "string"
                     }
                 },
                 "additionalProperties": False,
@@ -107,6 +128,19 @@ class AddToQueue:
         "additionalProperties" : False
     }
 
+class AddToQueueResponse:
+    ''' Definition of the queue/add response JSON elements'''
+    #pylint: disable=too-few-public-methods
+
+    class Elements:
+        ''' Definition of the JSON elements'''
+        #pylint: disable=too-few-public-methods
+
+        inserted = 'inserted'
+        duplicates = 'duplicates'
+        invalid = 'invalid'
+        disallowed = 'disallowed'
+
 class PopFromQueue:
     ''' Definition of the queue/pop JSON schema'''
     #pylint: disable=too-few-public-methods
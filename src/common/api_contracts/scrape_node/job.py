@@ -25,6 +25,8 @@ class NewJobTaskRequest:
 
         url = 'url'
         task_type = 'task_type'
+        etag = 'etag'
+        last_modified = 'last_modified'
 
     schema = \
     {
@@ -45,6 +47,14 @@ class NewJobTaskRequest:
                 "enum": ["new", "rescan"]
             },
             'task_id':
+            {
+                "type" : "string"
+            },
+            'etag':
+            {
+                "type" : "string"
+            },
+            'last_modified':
             {
                 "type" : "string"
             }
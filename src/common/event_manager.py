@@ -14,12 +14,19 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
+from collections import deque
+import heapq
+import itertools
+import threading
 import time
 
 class EventManager:
-    """ Event Manager implementation. """
-    __slots__ = ['_callback_event_handlers', '_enabled', '_events',
-                 '_event_handlers']
+    """ Event Manager implementation.  Events without a trigger time go onto
+        a FIFO ready queue, delayed events are kept in a min-heap keyed on the
+        time they are due so only due events are ever looked at. """
+    __slots__ = ['_callback_event_handlers', '_condition', '_enabled',
+                 '_event_handlers', '_ready_events', '_sequence',
+                 '_timed_events']
 
     def __init__(self):
         """!@brief Event manager class constructor.
@@ -29,8 +36,16 @@ class EventManager:
         self._callback_event_handlers = {}
         self._enabled = True
         self._event_handlers = {}
-        self._events = []
- 
+        self._ready_events = deque()
+        self._timed_events = []
+
+        # Tie-breaker for events due at the same time, keeping them in the
+        # order they were queued and stopping the heap comparing events.
+        self._sequence = itertools.count()
+
+        # Events can be queued from other threads (e.g. api or messaging).
+        self._condition = threading.Condition()
+
     def queue_event(self, event):
         """!@brief Queue a new event, it will raise an exception if the event
                    manager is disabled or the event ID has not been registered.
@@ -49,12 +64,17 @@ class EventManager:
         if not self._is_valid_event(event.event_id):
             raise RuntimeError('Invalid event ID')
 
-        if event.trigger_time:
-            new_time = round(time.time() * 1000) + event.trigger_time
-            event.trigger_time = new_time
+        with self._condition:
+            if event.trigger_time:
+                new_time = self._now() + event.trigger_time
+                event.trigger_time = new_time
+                heapq.heappush(self._timed_events,
+                               (new_time, next(self._sequence), event))
 
-        # Add the event into the queue.
-        self._events.append(event)
+            else:
+                self._ready_events.append(event)
+
+            self._condition.notify()
 
     def callback_event(self, event):
         """!@brief Make an event callback, it will raise an exception if the
@@ -106,67 +126,102 @@ class EventManager:
         self._event_handlers[event_id] = callback
 
     async def process_next_event(self) -> None:
-        """!@brief Process the next event, if any exists.  An error will be
+        """!@brief Process all of the events that are due.  An error will be
                    generated if the event ID is invalid (should never happen).
         @param self The object pointer.
-        @returns True - None.
+        @returns None.
         """
-
-        # If nothing is ready for processing just return success (True).
-        if not self._events:
-            return
-
-        for idx, event in enumerate(self._events):
-            now = round(time.time() * 1000)
-
-            if event.trigger_time and now < event.trigger_time:
-                continue
-
-            #  Call the event processing function, this is defined by the
-            #  registered callback function.
-            self._event_handlers[event.event_id](event)
-
-            #  Once the event has been handled, delete it.. The event handler
-            # function should deal with issues with the event and therefore
-            #  deleting should be safe.
-            self._events.pop(idx)
-
-            return
+        self._process_due_events()
 
     def process_next_event_sync(self) -> None:
-        """!@brief Process the next event, if any exists.  An error will be
+        """!@brief Process all of the events that are due.  An error will be
                    generated if the event ID is invalid (should never happen).
         @param self The object pointer.
-        @returns True - None.
+        @returns None.
         """
+        self._process_due_events()
 
-        # If nothing is ready for processing just return success (True).
-        if not self._events:
-            return
+    def wait_for_event(self, timeout=None) -> bool:
+        """!@brief Block until an event is due or the timeout expires, this
+                   replaces polling on a fixed interval.
+        @param self The object pointer.
+        @param timeout Optional maximum time to wait (seconds).
+        @returns True if an event is due, otherwise False.
+        """
 
-        for idx, event in enumerate(self._events):
-            now = round(time.time() * 1000)
+        deadline = None if timeout is None else time.monotonic() + timeout
 
-            if event.trigger_time and now < event.trigger_time:
-                continue
+        with self._condition:
+            while not self._ready_events:
+                wait_time = None
 
-            #  Call the event processing function, this is defined by the
-            #  registered callback function.
-            self._event_handlers[event.event_id](event)
+                if self._timed_events:
+                    wait_time = (self._timed_events[0][0] - self._now()) / 1000
+                    if wait_time <= 0:
+                        break
 
-            #  Once the event has been handled, delete it.. The event handler
-            # function should deal with issues with the event and therefore
-            #  deleting should be safe.
-            self._events.pop(idx)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait_time = remaining if wait_time is None else \
+                        min(wait_time, remaining)
 
-            return
+                self._condition.wait(wait_time)
+
+        return True
 
     def delete_all_events(self) -> None:
         """!@brief Delete all events.
         @param self The object pointer.
         @return None.
         """
-        del self._events[:]
+        with self._condition:
+            self._ready_events.clear()
+            del self._timed_events[:]
+
+    def _process_due_events(self) -> None:
+        """!@brief Call the handler of each event that is due, events queued
+                   by a handler are left for the next call so a handler that
+                   re-queues itself cannot starve the caller.  An exception
+                   from a handler is passed on once the events not yet
+                   handled have been queued again.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        with self._condition:
+            now = self._now()
+
+            # Move timed events that are now due onto the ready queue.
+            while self._timed_events and self._timed_events[0][0] <= now:
+                self._ready_events.append(
+                    heapq.heappop(self._timed_events)[2])
+
+            due_events = self._ready_events
+            self._ready_events = deque()
+
+        try:
+            while due_events:
+                #  Call the event processing function, this is defined by the
+                #  registered callback function.  The event handler function
+                #  should deal with issues with the event.
+                event = due_events.popleft()
+                self._event_handlers[event.event_id](event)
+
+        # If a handler raises, the events after it are put back at the front
+        # of the ready queue rather than being lost with the exception.
+        finally:
+            if due_events:
+                with self._condition:
+                    self._ready_events.extendleft(reversed(due_events))
+
+    @staticmethod
+    def _now() -> int:
+        """!@brief Current time in milliseconds from a monotonic clock.
+        @returns int.
+        """
+        return round(time.monotonic() * 1000)
 
     def _is_valid_event(self, event_id):
         """!@brief Check if an event is valid.
@@ -38,6 +38,13 @@ class HTTPStatusCode:
     # 204 - No Content
     NoContent = 204
 
+    ###################
+    # 3xx redirection
+    ###################
+
+    # 304 - Not Modified
+    NotModified = 304
+
     ###################
     # 4xx client errors
     ###################
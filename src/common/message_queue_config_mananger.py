@@ -132,7 +132,11 @@ class MessagingQueueConfigManager:
         entry = MessagingQueueSettings(queue[schema.queue_entry_name],
                                        queue[schema.queue_entry_is_durable])
 
-        return MessagingQueueConsumerSettings(entry)
+        prefetch_count = settings.get(schema.queue_consumer_prefetch_count, 1)
+        worker_threads = settings.get(schema.queue_consumer_worker_threads, 0)
+
+        return MessagingQueueConsumerSettings(entry, prefetch_count,
+                                              worker_threads)
 
     def _process_producers(self, settings) -> MessagingQueueProducersSettings:
         """!@brief Process the message service settings section.
@@ -142,7 +146,13 @@ class MessagingQueueConfigManager:
         """
         #pylint: disable=no-self-use
 
-        producers = MessagingQueueProducersSettings()
+        batch_size = settings.get(schema.queue_producers_batch_size, 1)
+        batch_interval = settings.get(schema.queue_producers_batch_interval,
+                                      100)
+        confirms = settings.get(schema.queue_producers_publisher_confirms,
+                                False)
+        producers = MessagingQueueProducersSettings(batch_size, batch_interval,
+                                                    confirms)
 
         queues = settings[schema.queue_producers_queues]
 
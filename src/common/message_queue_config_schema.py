@@ -34,9 +34,14 @@ class ConfigurationSchema:
 
     # -- Messaging Consumer sub-elements --
     queue_consumer_queue = 'queue'
+    queue_consumer_prefetch_count = 'prefetch count'
+    queue_consumer_worker_threads = 'worker threads'
 
     # -- Messaging Producers sub-elements --
     queue_producers_queues = 'queues'
+    queue_producers_batch_size = 'batch size'
+    queue_producers_batch_interval = 'batch interval'
+    queue_producers_publisher_confirms = 'publisher confirms'
 
     schema = \
     {
@@ -96,7 +101,17 @@ class ConfigurationSchema:
                 "additionalProperties" : False,
                 "properties":
                 {
-                    queue_consumer_queue: { "$ref": "#/definitions/queue_entry"}
+                    queue_consumer_queue: { "$ref": "#/definitions/queue_entry"},
+                    queue_consumer_prefetch_count:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    queue_consumer_worker_threads:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    }
                 },
                 "required" : [queue_consumer_queue]
             },
@@ -110,6 +125,20 @@ class ConfigurationSchema:
                         "type": "array",
                         "items": {"$ref": "#/definitions/queue_entry"},
                         "default": []
+                    },
+                    queue_producers_batch_size:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    queue_producers_batch_interval:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    queue_producers_publisher_confirms:
+                    {
+                        "type" : "boolean"
                     }
                 },
                 "required" : [queue_producers_queues]
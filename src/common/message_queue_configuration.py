@@ -90,7 +90,7 @@ class MessagingServiceConnectSettings:
 
 class MessagingQueueConsumerSettings:
     """ Settings related to a messaging queue consumer """
-    __slots__ = ['_queue']
+    __slots__ = ['_prefetch_count', '_queue', '_worker_threads']
     #pylint: disable=too-few-public-methods
 
     @property
@@ -101,17 +101,39 @@ class MessagingQueueConsumerSettings:
         """
         return self._queue
 
-    def __init__(self, queue) -> Any:
+    @property
+    def prefetch_count(self) -> int:
+        """!@brief Maximum unacknowledged messages delivered (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._prefetch_count
+
+    @property
+    def worker_threads(self) -> int:
+        """!@brief Threads handling deliveries, 0 handles them on the
+                   messaging thread (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._worker_threads
+
+    def __init__(self, queue, prefetch_count=1, worker_threads=0) -> Any:
         """!@brief MessagingQueueConsumerSettings constructor.
         @param self The object pointer.
         @param queue Instance of the queue.
+        @param prefetch_count Maximum unacknowledged messages delivered.
+        @param worker_threads Number of threads handling deliveries.
         @returns Any.
         """
         self._queue = queue
+        self._prefetch_count = prefetch_count
+        self._worker_threads = worker_threads
 
 class MessagingQueueProducersSettings:
     """ Settings related to a messaging queue consumer """
-    __slots__ = ['_queues']
+    __slots__ = ['_batch_interval', '_batch_size', '_publisher_confirms',
+                 '_queues']
     #pylint: disable=too-few-public-methods
 
     @property
@@ -122,11 +144,42 @@ class MessagingQueueProducersSettings:
         """
         return self._queues
 
-    def __init__(self) -> Any:
+    @property
+    def batch_size(self) -> int:
+        """!@brief Buffered messages that trigger a batch publish.
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._batch_size
+
+    @property
+    def batch_interval(self) -> int:
+        """!@brief Longest time a message is buffered (milliseconds).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._batch_interval
+
+    @property
+    def publisher_confirms(self) -> bool:
+        """!@brief Are broker publisher confirms enabled flag.
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._publisher_confirms
+
+    def __init__(self, batch_size=1, batch_interval=100,
+                 publisher_confirms=False) -> Any:
         """!@brief MessagingQueueProducersSettings constructor.
         @param self The object pointer.
+        @param batch_size Buffered messages that trigger a batch publish.
+        @param batch_interval Longest time a message is buffered (ms).
+        @param publisher_confirms Enable broker publisher confirms.
         @returns Any.
         """
+        self._batch_interval = batch_interval
+        self._batch_size = batch_size
+        self._publisher_confirms = publisher_confirms
         self._queues = []
 
     def add_queue(self, new_queue : MessagingQueueSettings) ->  None:
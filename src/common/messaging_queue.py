@@ -14,7 +14,9 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
+from concurrent.futures import ThreadPoolExecutor
 import functools
+import threading
 from typing import Any
 import pika
 from common.logger import Logger, LogType
@@ -22,11 +24,13 @@ from common.messaging_queue_settings import MessagingQueueSettings
 
 class MessagingQueue:
     ''' Wrapper class for RabbitMQ functionality '''
-    __slots__ = ['_channel', '_connection', '_consumer_tag', '_is_connected',
-                 '_is_consuming', '_logger', '_message_processor',
-                 '_parameters', '_perform_close', '_reconnect_delay',
-                 '_settings', '_should_reconnect', '_shutdown_complete',
-                 '_was_consuming']
+    __slots__ = ['_channel', '_connection', '_consumer_tag', '_ioloop_thread',
+                 '_is_connected', '_is_consuming', '_logger',
+                 '_message_processor', '_parameters', '_perform_close',
+                 '_prefetch_count', '_publish_buffer', '_publish_lock',
+                 '_publish_sequence', '_reconnect_delay', '_settings',
+                 '_should_reconnect', '_shutdown_complete', '_unconfirmed',
+                 '_was_consuming', '_worker_pool']
 
     @property
     def was_consuming(self) -> bool:
@@ -44,6 +48,25 @@ class MessagingQueue:
         """
         return self._should_reconnect
 
+    @property
+    def prefetch_count(self) -> int:
+        """!@brief Number of unacknowledged messages the broker will deliver
+                   to the consumer (getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._prefetch_count
+
+    @prefetch_count.setter
+    def prefetch_count(self, value) -> None:
+        """!@brief Number of unacknowledged messages the broker will deliver
+                   to the consumer, applied on the next (re)connect (setter).
+        @param self The object pointer.
+        @param value New prefetch count.
+        @returns None.
+        """
+        self._prefetch_count = value
+
     def __init__(self, settings : MessagingQueueSettings,
                  logger : Logger) -> Any:
 
@@ -57,12 +80,33 @@ class MessagingQueue:
         self._is_connected = False
         self._is_consuming = False
         self._message_processor = None
+        self._ioloop_thread = None
         self._perform_close = False
         self._reconnect_delay = 0
         self._should_reconnect = False
         self._shutdown_complete = False
         self._was_consuming = False
 
+        consumer_definition = self._settings.queue_consumer_definition
+        self._prefetch_count = consumer_definition.prefetch_count
+
+        # With worker threads deliveries are handled off the ioloop thread, the
+        # number in progress is bounded by the prefetch count.
+        self._worker_pool = None
+        if consumer_definition.worker_threads:
+            self._worker_pool = ThreadPoolExecutor(
+                max_workers=consumer_definition.worker_threads)
+
+        # Messages waiting for a batch publish, shared with other threads.
+        self._publish_buffer = []
+        self._publish_lock = threading.Lock()
+
+        # Publisher confirm tracking, only touched on the ioloop thread.  The
+        # broker numbers publishes on a channel from 1, unconfirmed maps that
+        # number to the confirm callback in publish order.
+        self._publish_sequence = 0
+        self._unconfirmed = {}
+
         credentials = pika.PlainCredentials(
             self._settings.connection_settings.username,
             self._settings.connection_settings.password)
@@ -85,6 +129,7 @@ class MessagingQueue:
         """
 
         self._logger.log(LogType.Info, 'Messaging | Starting...')
+        self._ioloop_thread = threading.get_ident()
         self._connect()
         self._connection.ioloop.start()
         self._logger.log(LogType.Info, 'Messaging | Ended...')
@@ -115,13 +160,44 @@ class MessagingQueue:
         if self._connection:
             self._connection.ioloop.stop()
 
-    def acknowledge_message(self, delivery_tag) -> None:
-        """!@brief Publish a message to the queue.
+        if self._worker_pool:
+            self._worker_pool.shutdown(wait=False)
+
+    def acknowledge_message(self, delivery_tag, channel=None) -> None:
+        """!@brief Acknowledge a message, if called from a worker thread the
+                   acknowledgement is passed to the ioloop thread.
         @param self The object pointer.
         @param delivery_tag Delivery tag to identify what to acknowledge.
+        @param channel Channel the message was delivered on, by default the
+                       current channel.
         @returns None.
         """
-        self._channel.basic_ack(delivery_tag)
+
+        if self._on_ioloop_thread():
+            self._acknowledge(delivery_tag, channel)
+            return
+
+        callback = functools.partial(self._acknowledge, delivery_tag, channel)
+        if not self.add_callback_threadsafe(callback):
+            self._logger.log(LogType.Warn,
+                             'Messaging | Not connected, unable to ' + \
+                             f'acknowledge message {delivery_tag}')
+
+    def add_callback_threadsafe(self, callback) -> bool:
+        """!@brief Request that a callback is run on the ioloop thread, this
+                   is the only method that is safe to call from another thread.
+        @param self The object pointer.
+        @param callback Callable taking no arguments.
+        @returns True if the callback was scheduled, False if there is no
+                 connection to schedule it on.
+        """
+
+        connection = self._connection
+        if not connection or connection.is_closed:
+            return False
+
+        connection.add_callback_threadsafe(callback)
+        return True
 
     def publish_message(self, exchange, routing_key, body) -> None:
         """!@brief Publish a message to the queue.
@@ -135,8 +211,62 @@ class MessagingQueue:
         if not self._is_connected:
             raise RuntimeError('Not connected to message queue')
 
-        self._channel.basic_publish(exchange=exchange,
-                                    routing_key=routing_key, body=body)
+        if self._on_ioloop_thread():
+            self._basic_publish(exchange, routing_key, body)
+            return
+
+        callback = functools.partial(self.publish_message, exchange,
+                                     routing_key, body)
+        if not self.add_callback_threadsafe(callback):
+            raise RuntimeError('Not connected to message queue')
+
+    def queue_publish(self, exchange, routing_key, body,
+                      on_confirm=None) -> None:
+        """!@brief Buffer a message for a batch publish, this can be called
+                   from any thread.  The buffer is published once it reaches
+                   the batch size or the batch interval expires and is kept
+                   over a reconnect.  on_confirm(bool) is called on the ioloop
+                   thread with True once the broker has confirmed the message
+                   (or once published if confirms are disabled) and False if
+                   it was rejected or the channel closed before a confirm.
+        @param self The object pointer.
+        @param exchange Exchange to publish to.
+        @param routing_key Routing key for published message.
+        @param body Body of message.
+        @param on_confirm Optional confirm callback.
+        @returns None.
+        """
+        #pylint: disable=too-many-arguments
+
+        with self._publish_lock:
+            self._publish_buffer.append((exchange, routing_key, body,
+                                         on_confirm))
+            buffer_full = len(self._publish_buffer) >= \
+                self._settings.publishing_queues.batch_size
+
+        if not buffer_full:
+            return
+
+        if self._on_ioloop_thread():
+            self._flush_publish_buffer()
+
+        else:
+            self.add_callback_threadsafe(self._flush_publish_buffer)
+
+    def query_queue_depth(self, queue_name, on_result) -> bool:
+        """!@brief Request the number of messages ready in a queue, this can
+                   be called from any thread.  on_result(message_count) is
+                   called on the ioloop thread, message_count is None if the
+                   channel wasn't open.  The queue must already be declared.
+        @param self The object pointer.
+        @param queue_name Name of the queue.
+        @param on_result Result callback.
+        @returns True if the request was scheduled, otherwise False.
+        """
+
+        callback = functools.partial(self._query_queue_depth, queue_name,
+                                     on_result)
+        return self.add_callback_threadsafe(callback)
 
     def reset_for_reconnect(self) -> None:
         """!@brief Reset the messaging queue ready for reconnect attempt.
@@ -154,6 +284,119 @@ class MessagingQueue:
         self._shutdown_complete = False
         self._was_consuming = False
 
+    def _query_queue_depth(self, queue_name, on_result) -> None:
+        if not self._channel or not self._channel.is_open:
+            on_result(None)
+            return
+
+        # A passive declare only checks the queue, the declare ok frame holds
+        # the count of messages ready for delivery.
+        self._channel.queue_declare(
+            queue=queue_name, passive=True,
+            callback=lambda frame: on_result(frame.method.message_count))
+
+    def _on_ioloop_thread(self) -> bool:
+        return threading.get_ident() == self._ioloop_thread
+
+    def _basic_publish(self, exchange, routing_key, body,
+                       on_confirm=None) -> None:
+        self._channel.basic_publish(exchange=exchange,
+                                    routing_key=routing_key, body=body)
+
+        if self._settings.publishing_queues.publisher_confirms:
+            self._publish_sequence += 1
+            self._unconfirmed[self._publish_sequence] = on_confirm
+
+        elif on_confirm:
+            on_confirm(True)
+
+    def _flush_publish_buffer(self) -> None:
+        if not self._channel or not self._channel.is_open:
+            return
+
+        with self._publish_lock:
+            batch = self._publish_buffer
+            self._publish_buffer = []
+
+        for exchange, routing_key, body, on_confirm in batch:
+            self._basic_publish(exchange, routing_key, body, on_confirm)
+
+    def _on_publish_flush_timer(self) -> None:
+        # Only keep the timer going whilst the channel is up, a new timer is
+        # started when the channel is opened after a reconnect.
+        if not self._channel or not self._channel.is_open:
+            return
+
+        self._flush_publish_buffer()
+        self._schedule_publish_flush()
+
+    def _schedule_publish_flush(self) -> None:
+        interval = self._settings.publishing_queues.batch_interval / 1000
+        self._connection.ioloop.call_later(interval,
+                                           self._on_publish_flush_timer)
+
+    def _on_delivery_confirmation(self, method_frame) -> None:
+        confirmed = isinstance(method_frame.method, pika.spec.Basic.Ack)
+        delivery_tag = method_frame.method.delivery_tag
+
+        if not method_frame.method.multiple:
+            self._notify_confirm(delivery_tag, confirmed)
+            return
+
+        # A multiple confirm covers every outstanding publish up to and
+        # including the delivery tag, unconfirmed is in publish order.
+        while self._unconfirmed:
+            tag = next(iter(self._unconfirmed))
+            if tag > delivery_tag:
+                break
+            self._notify_confirm(tag, confirmed)
+
+    def _notify_confirm(self, delivery_tag, confirmed) -> None:
+        on_confirm = self._unconfirmed.pop(delivery_tag, None)
+        if on_confirm:
+            on_confirm(confirmed)
+
+    def _fail_unconfirmed(self) -> None:
+        unconfirmed = self._unconfirmed
+        self._unconfirmed = {}
+        self._publish_sequence = 0
+
+        if unconfirmed:
+            self._logger.log(LogType.Warn,
+                             f'Messaging | {len(unconfirmed)} published ' + \
+                             'messages were not confirmed before close')
+
+        for on_confirm in unconfirmed.values():
+            if on_confirm:
+                on_confirm(False)
+
+    def _acknowledge(self, delivery_tag, channel) -> None:
+        channel = channel if channel else self._channel
+
+        # A message from a channel that has since closed has already been
+        # requeued by the broker, its delivery tag isn't valid any more.
+        if not channel or not channel.is_open:
+            return
+
+        channel.basic_ack(delivery_tag)
+
+    def _on_message(self, channel, method, properties, body):
+        if not self._worker_pool:
+            self._message_processor(channel, method, properties, body)
+            return
+
+        self._worker_pool.submit(self._process_message, channel, method,
+                                 properties, body)
+
+    def _process_message(self, channel, method, properties, body):
+        #pylint: disable=broad-except
+        try:
+            self._message_processor(channel, method, properties, body)
+
+        except Exception as ex:
+            self._logger.log(LogType.Error,
+                             f'Messaging | Message processing failed: {ex}')
+
     def _connect(self):
         self._connection = pika.SelectConnection(
             parameters=self._parameters, on_open_callback=self._on_connection_open,
@@ -172,6 +415,13 @@ class MessagingQueue:
         self._logger.log(LogType.Info, 'Messaging | Adding channel close callback')
         self._channel.add_on_close_callback(self._on_channel_closed)
 
+        if self._settings.publishing_queues.publisher_confirms:
+            self._logger.log(LogType.Info,
+                             'Messaging | Enabling publisher confirms')
+            self._channel.confirm_delivery(self._on_delivery_confirmation)
+
+        self._schedule_publish_flush()
+
         queue_name = self._settings.queue_consumer_definition.queue.name
 
         # Declare queue for processed urls results and bind it to exchange.
@@ -186,6 +436,7 @@ class MessagingQueue:
         self._logger.log(LogType.Info, "Messaging | Channel was closed")
 
         self._is_consuming = False
+        self._fail_unconfirmed()
         if self._connection.is_closing or self._connection.is_closed:
             self._logger.log(LogType.Info,
                              'Connection is closing or already closed')
@@ -195,8 +446,7 @@ class MessagingQueue:
             self._connection.close()
 
     def _on_queue_declare_ok(self, _unused_frame, userdata):
-        prefetch_count = 1
-        self._channel.basic_qos(prefetch_count=prefetch_count,
+        self._channel.basic_qos(prefetch_count=self._prefetch_count,
                                 callback=self._on_queue_qos_ok)
 
     def _on_queue_qos_ok(self, _unused_frame):
@@ -228,7 +478,7 @@ class MessagingQueue:
 
         self._consumer_tag = self._channel.basic_consume(
             self._settings.queue_consumer_definition.queue.name,
-            self._message_processor)
+            self._on_message)
         self._was_consuming = True
         self._is_consuming = True
 
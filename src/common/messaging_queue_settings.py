@@ -144,7 +144,7 @@ class QueueEntry:
 
 class QueueConsumerDefinition:
     ''' Definition of the queue consumer '''
-    __slots__ = ['_queue']
+    __slots__ = ['_prefetch_count', '_queue', '_worker_threads']
 
     @property
     def queue(self) -> QueueEntry:
@@ -154,18 +154,110 @@ class QueueConsumerDefinition:
         """
         return self._queue
 
+    @property
+    def prefetch_count(self) -> int:
+        """!@brief Maximum unacknowledged messages delivered (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._prefetch_count
+
+    @prefetch_count.setter
+    def prefetch_count(self, value) -> None:
+        """!@brief Maximum unacknowledged messages delivered (Setter).
+        @param self The object pointer.
+        @param value New prefetch count.
+        @returns None.
+        """
+        self._prefetch_count = value
+
+    @property
+    def worker_threads(self) -> int:
+        """!@brief Threads handling deliveries, 0 handles them on the
+                   messaging thread (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._worker_threads
+
+    @worker_threads.setter
+    def worker_threads(self, value) -> None:
+        """!@brief Threads handling deliveries (Setter).
+        @param self The object pointer.
+        @param value New number of worker threads.
+        @returns None.
+        """
+        self._worker_threads = value
+
     def __init__(self) -> Any:
         self._queue = QueueEntry()
+        self._prefetch_count = 1
+        self._worker_threads = 0
 
 class PublishingQueues:
     ''' Definition of a list of queues we publish to '''
-    __slots__ = ['_queues']
+    __slots__ = ['_batch_interval', '_batch_size', '_publisher_confirms',
+                 '_queues']
 
     @property
     def queues(self):
         return self._queues.copy()
 
+    @property
+    def batch_size(self) -> int:
+        """!@brief Buffered messages that trigger a batch publish (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._batch_size
+
+    @batch_size.setter
+    def batch_size(self, value) -> None:
+        """!@brief Buffered messages that trigger a batch publish (Setter).
+        @param self The object pointer.
+        @param value New batch size.
+        @returns None.
+        """
+        self._batch_size = value
+
+    @property
+    def batch_interval(self) -> int:
+        """!@brief Longest time a message is buffered in ms (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._batch_interval
+
+    @batch_interval.setter
+    def batch_interval(self, value) -> None:
+        """!@brief Longest time a message is buffered in ms (Setter).
+        @param self The object pointer.
+        @param value New batch interval.
+        @returns None.
+        """
+        self._batch_interval = value
+
+    @property
+    def publisher_confirms(self) -> bool:
+        """!@brief Are broker publisher confirms enabled flag (Getter).
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._publisher_confirms
+
+    @publisher_confirms.setter
+    def publisher_confirms(self, value) -> None:
+        """!@brief Are broker publisher confirms enabled flag (Setter).
+        @param self The object pointer.
+        @param value New flag state.
+        @returns None.
+        """
+        self._publisher_confirms = value
+
     def __init__(self):
+        self._batch_interval = 100
+        self._batch_size = 1
+        self._publisher_confirms = False
         self._queues = []
 
     def add_queue(self, queue_entry):
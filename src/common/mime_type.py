@@ -58,5 +58,8 @@ class MIMEType:
     # .txt | Text, (generally ASCII or ISO 8859-n)
     Text = 'text/plain'
 
+    # .xhtml | XHTML
+    XHTML = 'application/xhtml+xml'
+
     # .xml | eXtensible Markup Language (XML)
     XM = 'application/xml'
@@ -0,0 +1,175 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+from common.mysql_connector.async_mysql_connection import AsyncMySQLConnection
+from common.mysql_connector.mysql_adaptor import MySQLAdaptor
+
+class AsyncMySQLAdaptor:
+    ''' Async access to a MySQL connection pool for use from an event loop.
+        The blocking mysql-connector calls are made on a thread pool the same
+        size as the connection pool, and acquiring a connection waits for a
+        free slot without blocking so concurrency matches the pool size. '''
+    __slots__ = ['_acquired', '_adaptor', '_executor', '_in_use',
+                 '_max_wait', '_password', '_pool_slots', '_timeouts',
+                 '_total_wait', '_waiters']
+
+    @property
+    def adaptor(self) -> MySQLAdaptor:
+        """!@brief Adaptor the connections are made with (getter).
+        @param self The object pointer.
+        @returns MySQLAdaptor
+        """
+        return self._adaptor
+
+    @property
+    def in_use(self) -> int:
+        """!@brief Number of connections currently in use (getter).
+        @param self The object pointer.
+        @returns int
+        """
+        return self._in_use
+
+    @property
+    def waiters(self) -> int:
+        """!@brief Number of requests waiting for a connection (getter).
+        @param self The object pointer.
+        @returns int
+        """
+        return self._waiters
+
+    @property
+    def acquired(self) -> int:
+        """!@brief Number of connections acquired (getter).
+        @param self The object pointer.
+        @returns int
+        """
+        return self._acquired
+
+    @property
+    def timeouts(self) -> int:
+        """!@brief Number of acquires that timed out (getter).
+        @param self The object pointer.
+        @returns int
+        """
+        return self._timeouts
+
+    @property
+    def average_wait_ms(self) -> float:
+        """!@brief Average wait for a connection in milliseconds, including
+            the acquires that timed out (getter).
+        @param self The object pointer.
+        @returns float
+        """
+        attempts = self._acquired + self._timeouts
+        return (self._total_wait * 1000 / attempts) if attempts else 0.0
+
+    @property
+    def max_wait_ms(self) -> float:
+        """!@brief Longest wait for a connection in milliseconds (getter).
+        @param self The object pointer.
+        @returns float
+        """
+        return self._max_wait * 1000
+
+    def __init__(self, adaptor : MySQLAdaptor, user_password):
+        """!@brief Default constructor for AsyncMySQLAdaptor class.
+        @param self The object pointer
+        @param adaptor MySQLAdaptor to connect with
+        @param user_password Password of the database user
+        @returns Constructed AsyncMySQLAdaptor instance.
+        """
+        self._adaptor = adaptor
+        self._executor = ThreadPoolExecutor(max_workers=adaptor.pool_size,
+                                            thread_name_prefix='mysql')
+        self._password = user_password
+
+        # Created on first use so that it belongs to the running loop.
+        self._pool_slots = None
+
+        self._in_use = 0
+        self._waiters = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def acquire(self, timeout=None) -> AsyncMySQLConnection:
+        """!@brief Get a connection from the pool, waiting for one to be
+            released if they are all in use.
+        @param self The object pointer.
+        @param timeout Optional seconds to wait for a free connection.
+        @returns AsyncMySQLConnection on success or RuntimeError on error.
+        """
+
+        if self._pool_slots is None:
+            self._pool_slots = asyncio.Semaphore(self._adaptor.pool_size)
+
+        start_time = time.monotonic()
+        self._waiters += 1
+
+        try:
+            await asyncio.wait_for(self._pool_slots.acquire(), timeout)
+
+        except asyncio.TimeoutError as ex:
+            self._timeouts += 1
+            raise RuntimeError('Connection pool exhausted') from ex
+
+        finally:
+            self._waiters -= 1
+            self._record_wait(time.monotonic() - start_time)
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            connection = await loop.run_in_executor(
+                self._executor, self._adaptor.connect, self._password)
+
+        except BaseException:
+            self._pool_slots.release()
+            raise
+
+        self._acquired += 1
+        self._in_use += 1
+
+        return AsyncMySQLConnection(connection, self._executor,
+                                    self._release)
+
+    def shutdown(self) -> None:
+        """!@brief Stop the thread pool, connections should be closed first.
+        @param self The object pointer.
+        @returns None
+        """
+        self._executor.shutdown(wait=True)
+
+    def _release(self) -> None:
+        """!@brief Called when a connection is closed to free its slot.
+        @param self The object pointer.
+        @returns None
+        """
+        self._in_use -= 1
+        self._pool_slots.release()
+
+    def _record_wait(self, wait) -> None:
+        """!@brief Add the wait for a pool slot to the statistics.
+        @param self The object pointer.
+        @param wait Seconds waited.
+        @returns None
+        """
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
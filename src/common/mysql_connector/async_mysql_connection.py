@@ -0,0 +1,123 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import asyncio
+from contextlib import asynccontextmanager
+import functools
+from common.mysql_connector.mysql_connection import MySQLConnection
+
+class AsyncMySQLConnection:
+    ''' Awaitable wrapper of a MySQLConnection, each call is run on the
+        adaptor's thread pool so the event loop isn't blocked while MySQL
+        works.  The connection must be closed to give its pool slot back,
+        using it with 'async with' guarantees that it is. '''
+    __slots__ = ['_connection', '_executor', '_on_close']
+
+    def __init__(self, connection : MySQLConnection, executor, on_close):
+        """!@brief Default constructor for AsyncMySQLConnection class.
+        @param self The object pointer
+        @param connection MySQLConnection to wrap
+        @param executor Executor the blocking calls are run on
+        @param on_close Callable that is called once the connection is closed
+        @returns Constructed AsyncMySQLConnection instance.
+        """
+        self._connection = connection
+        self._executor = executor
+        self._on_close = on_close
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self) -> None:
+        """!@brief Release the connection back to the pool, further calls
+            have no effect.
+        @param self The object pointer
+        @returns None
+        """
+
+        if not self._on_close:
+            return
+
+        on_close = self._on_close
+        self._on_close = None
+
+        try:
+            await self._run(self._connection.close)
+
+        finally:
+            on_close()
+
+    @asynccontextmanager
+    async def transaction(self):
+        """!@brief Async context manager for a transaction, see
+            MySQLConnection.transaction.
+        @param self The object pointer
+        @returns The connection.
+        """
+
+        try:
+            yield self
+
+        except BaseException:
+            await self.rollback()
+            raise
+
+        err_msg = await self.commit()
+        if err_msg:
+            raise RuntimeError(err_msg)
+
+    async def query(self, query, variables=(), commit=False):
+        """!@brief Execute a MySQL query, see MySQLConnection.query.
+        @param self The object pointer.
+        @param query SQL query to be executed
+        @param variables An optional list of parameters for query
+        @param commit Optional flag if query be committed. Default is False
+        @returns Tuple (results, error_message)
+        """
+        return await self._run(self._connection.query, query, variables,
+                               commit)
+
+    async def execute(self, query, variables=()):
+        """!@brief Execute a MySQL statement in the current transaction, see
+            MySQLConnection.execute.
+        @param self The object pointer.
+        @param query SQL statement to be executed
+        @param variables An optional list of parameters for the statement
+        @returns Tuple (row count, last insert id, error_message)
+        """
+        return await self._run(self._connection.execute, query, variables)
+
+    async def commit(self) -> str:
+        """!@brief Commit the current transaction.
+        @param self The object pointer
+        @returns Error message, empty if successful.
+        """
+        return await self._run(self._connection.commit)
+
+    async def rollback(self) -> str:
+        """!@brief Roll back the current transaction.
+        @param self The object pointer
+        @returns Error message, empty if successful.
+        """
+        return await self._run(self._connection.rollback)
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor,
+                                          functools.partial(function, *args))
@@ -14,10 +14,14 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
+from contextlib import contextmanager
 import mysql.connector
 
 class MySQLConnection:
-    ''' MySQL connection class '''
+    ''' MySQL connection class, a connection is held until it is closed so
+        that every statement of a request uses the same pooled connection
+        and cursor.  It can be used as a context manager to guarantee that
+        it is released back to the pool. '''
 
     def __init__(self, connection) -> object:
         """!@brief Default constructor for MySQLConnection class.
@@ -26,34 +30,79 @@ class MySQLConnection:
         @returns Constructed MySQLConnection instance.
         """
         self._connection = connection
+        self._cursor = None
+        self._released = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def close(self) -> None:
-        """!@brief Method to release connection from pool.
+        """!@brief Method to release connection back to the pool, not actually
+            close it.  Any uncommitted transaction is rolled back first.  It
+            is safe to call this after the connection has been released.
         @param self The object pointer
         @returns None
         """
-        self._connection.close()
 
-    def call_stored_procedure(self, procedure_name, params=(),
-                              keep_conn_alive=False):
+        if self._released:
+            return
+
+        self._released = True
+
+        try:
+            if self._cursor:
+                self._cursor.close()
+
+            if self._connection.in_transaction:
+                self._connection.rollback()
+
+        except mysql.connector.Error:
+            pass
+
+        finally:
+            self._cursor = None
+            self._connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """!@brief Context manager for a transaction, it is committed when the
+            block exits (unless already committed) and rolled back if the
+            block raises.  A failed commit raises a RuntimeError.
+        @param self The object pointer
+        @returns The connection.
+        """
+
+        try:
+            yield self
+
+        except BaseException:
+            self.rollback()
+            raise
+
+        err_msg = self.commit()
+        if err_msg:
+            raise RuntimeError(err_msg)
+
+    def call_stored_procedure(self, procedure_name, params=()):
         """!@brief Call a MySQL Stored procedure.  A ResultsSet is returned,
             if nothing is returned then it's empty.
         @param self The object pointer
         @param procedure_name Name of the procedure to call
         @param params Optional list of parameters for the stored procedures
-        @param keep_conn_alive Optional flag if to keep conneciton alive
-        @returns Constructed MySQLConnection instance.
+        @returns Tuple (results, error_message)
         """
 
-        cursor = self._connection.cursor()
+        cursor = self._get_cursor()
 
         try:
             cursor.callproc(procedure_name, params)
 
         # It's important to check for exceptions here, which include errors in
         # the query or invalid tables/columns.
-        except mysql.connector.errors.ProgrammingError as mysql_except:
-            self._close(cursor)
+        except mysql.connector.errors.DatabaseError as mysql_except:
             return (None, mysql_except.msg)
 
         results_set = []
@@ -61,13 +110,12 @@ class MySQLConnection:
         # Get the results from the stored procedure.
         results = cursor.stored_results()
 
-        result_rows = None
+        result_rows = []
 
         for row in results:
             result_rows = list(row.fetchall())
 
         if len(result_rows) == 0:
-            self._close(cursor)
             return (results_set, 'Missing column title!')
 
         # Pull out the field names and build a map of there position.
@@ -79,77 +127,122 @@ class MySQLConnection:
             field_position += 1
 
         results_set = self._build_results(field_names_map, result_rows)
-        if not keep_conn_alive:
-            self._close(cursor)
 
         return (results_set, '')
 
-    def query(self, query, variables=(), commit=False, keep_conn_alive=False):
+    def query(self, query, variables=(), commit=False):
         """!@brief Execute a MySQL query.  A ResultsSet is returned. A
             ResultsSet is returned, if nothing is returned then it's empty.
+            The connection is kept until close() is called, even if the
+            query fails.
         @param self The object pointer.
         @param query SQL query to be executed
         @param variables An optional list of parameters for query
         @param commit Optional flag if query be committed. Default is False
-        @param keep_conn_alive Optional flag if to keep conneciton alive
         @returns Tuple (results, error_message)
         """
-        cursor = self._connection.cursor()
+        cursor = self._get_cursor()
 
         try:
             cursor.execute(query, variables)
 
             if commit is True:
                 self._connection.commit()
-
-                if not keep_conn_alive:
-                    self._close(cursor)
-
                 return ([], '')
 
         # It's important to check for exceptions here, which include errors in
         # the query or invalid tables/columns.
-        except mysql.connector.errors.ProgrammingError as mysql_exception:
-            self._close(cursor)
-            return (None, mysql_exception.msg)
-
         except mysql.connector.errors.DatabaseError as mysql_except:
-            self._close(cursor)
             return (None, mysql_except.msg)
 
+        # A statement such as UPDATE doesn't return any results.
+        if not cursor.with_rows:
+            return ([], '')
+
+        # Fetch all of the results rows returned from MySQL.
+        rows = cursor.fetchall()
+
+        # Pull out the field names and build a map of there position.
+        field_names = [i[0] for i in cursor.description]
+        field_names_map = {}
+        field_position = 0
+        for field_name in field_names:
+            field_names_map[field_position] = field_name
+            field_position += 1
+
+        return (self._build_results(field_names_map, rows), '')
+
+    def execute(self, query, variables=()):
+        """!@brief Execute a MySQL statement that returns no results (e.g. an
+            INSERT) without committing it, so several statements can be made
+            in one transaction that is then committed with commit().
+        @param self The object pointer.
+        @param query SQL statement to be executed
+        @param variables An optional list of parameters for the statement
+        @returns Tuple (row count, last insert id, error_message)
+        """
+        cursor = self._get_cursor()
+
         try:
-            # Fetch all of the results rows returned from MySQL.
-            rows = cursor.fetchall()
+            cursor.execute(query, variables)
 
-            # Pull out the field names and build a map of there position.
-            field_names = [i[0] for i in cursor.description]
-            field_names_map = {}
-            field_position = 0
-            for field_name in field_names:
-                field_names_map[field_position] = field_name
-                field_position += 1
+        except mysql.connector.errors.DatabaseError as mysql_except:
+            return (None, None, mysql_except.msg)
 
-            results_set = self._build_results(field_names_map, rows)
+        return (cursor.rowcount, cursor.lastrowid, '')
 
-            if not keep_conn_alive:
-                self._close(cursor)
+    def commit(self) -> str:
+        """!@brief Commit the current transaction, it is rolled back if the
+            commit fails.
+        @param self The object pointer
+        @returns Error message, empty if successful.
+        """
 
-            return (results_set, '')
+        if not self._connection.in_transaction:
+            return ''
 
-        # This isn't an exception, we are using it to check if no results are
-        # returned (e.g. a query such as UPDATE).
-        except mysql.connector.errors.InterfaceError:
-            self._close(cursor)
-            return ([], '')
+        try:
+            self._connection.commit()
+
+        except mysql.connector.errors.DatabaseError as mysql_except:
+            self.rollback()
+            return mysql_except.msg
+
+        return ''
 
-    def _close(self, cursor) -> None:
-        """!@brief Method to release connection, not actually close it.
+    def rollback(self) -> str:
+        """!@brief Roll back the current transaction.
         @param self The object pointer
-        @param cursor Cursor object to clean up
-        @returns None
+        @returns Error message, empty if successful.
+        """
+
+        if self._released or not self._connection.in_transaction:
+            return ''
+
+        try:
+            self._connection.rollback()
+
+        except mysql.connector.Error as mysql_except:
+            return mysql_except.msg
+
+        return ''
+
+    def _get_cursor(self):
+        """!@brief Get the cursor of the connection, it is created on first
+            use and reused for every statement until the connection is
+            closed.  It is buffered so a statement never leaves unread rows
+            that would stop the next one being executed.
+        @param self The object pointer
+        @returns Cursor object.
         """
-        cursor.close()
-        self._connection.close()
+
+        if self._released:
+            raise RuntimeError('Connection has been released')
+
+        if self._cursor is None:
+            self._cursor = self._connection.cursor(buffered=True)
+
+        return self._cursor
 
     def _build_results(self, column_headers, results) -> list:
         """!@brief Take the raw results from MySQL and create a user-friendly
@@ -0,0 +1,214 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+from collections import OrderedDict
+import threading
+import time
+from urllib.parse import urlsplit
+from common.robots_rules import RobotsRules
+
+class RobotsCache:
+    """ Cache of the robots.txt rules of each host, it can be used from any
+        thread.  A host's robots.txt is fetched the first time one of its
+        urls is checked, threads checking the same host wait for that fetch
+        rather than each making their own.  Rules are kept for the ttl and
+        the least recently used hosts are evicted once the cache is full.
+
+        The fetcher is called with the robots.txt url and returns a tuple of
+        the http status code and body, reading at most max_size bytes.  It
+        should follow redirects and raise OSError if the host can't be read.
+        Following RFC 9309 a 4xx status means there are no rules and any
+        other failure disallows the whole host for the error ttl. """
+    __slots__ = ['_entries', '_error_ttl', '_fetch_errors', '_fetcher',
+                 '_hits', '_lock', '_max_hosts', '_misses', '_pending',
+                 '_ttl', '_user_agent']
+
+    ## Largest robots.txt read, RFC 9309 requires at least 500 KiB be parsed.
+    max_size = 512000
+
+    @property
+    def fetch_errors(self) -> int:
+        """!@brief Number of robots.txt files that couldn't be read (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._fetch_errors
+
+    @property
+    def hits(self) -> int:
+        """!@brief Number of checks answered from the cache (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """!@brief Number of checks that needed a fetch (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._misses
+
+    @property
+    def size(self) -> int:
+        """!@brief Number of hosts in the cache (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return len(self._entries)
+
+    def __init__(self, fetcher, user_agent, max_hosts, ttl, error_ttl):
+        """!@brief RobotsCache class constructor.
+        @param self The object pointer.
+        @param fetcher Callable that reads a robots.txt url.
+        @param user_agent Product token rules are matched against.
+        @param max_hosts Maximum number of hosts to cache.
+        @param ttl Seconds the rules of a host are cached for.
+        @param error_ttl Seconds a failed fetch is cached for.
+        @returns RobotsCache instance.
+        """
+        #pylint: disable=too-many-arguments
+        self._entries = OrderedDict()
+        self._error_ttl = error_ttl
+        self._fetch_errors = 0
+        self._fetcher = fetcher
+        self._hits = 0
+        self._lock = threading.Lock()
+        self._max_hosts = max_hosts
+        self._misses = 0
+        self._pending = {}
+        self._ttl = ttl
+        self._user_agent = user_agent
+
+    def is_allowed(self, url) -> bool:
+        """!@brief Check if robots.txt allows a url to be crawled, fetching
+                   the robots.txt of the host if it isn't cached.
+        @param self The object pointer.
+        @param url Full url to check.
+        @returns True if allowed, otherwise False.
+        """
+        return self.rules(url).is_allowed(url)
+
+    def rules(self, url) -> RobotsRules:
+        """!@brief Get the robots.txt rules for the host of a url, fetching
+                   them if they aren't cached.
+        @param self The object pointer.
+        @param url Full url.
+        @returns RobotsRules.
+        """
+
+        origin = self.origin(url)
+        if not origin:
+            return RobotsRules.allow_all()
+
+        while True:
+            with self._lock:
+                rules = self._cached(origin)
+                if rules:
+                    self._hits += 1
+                    return rules
+
+                pending = self._pending.get(origin)
+                if not pending:
+                    pending = threading.Event()
+                    self._pending[origin] = pending
+                    self._misses += 1
+                    break
+
+            # Another thread is fetching this host, use its result.
+            pending.wait()
+
+        try:
+            rules, ttl = self._fetch(origin)
+
+            with self._lock:
+                self._entries[origin] = (time.monotonic() + ttl, rules)
+                self._entries.move_to_end(origin)
+                if len(self._entries) > self._max_hosts:
+                    self._entries.popitem(last=False)
+
+        finally:
+            with self._lock:
+                del self._pending[origin]
+            pending.set()
+
+        return rules
+
+    def cached_rules(self, url):
+        """!@brief Get the robots.txt rules for the host of a url only if they
+                   are cached, nothing is fetched.
+        @param self The object pointer.
+        @param url Full url.
+        @returns RobotsRules or None if they aren't cached.
+        """
+
+        origin = self.origin(url)
+        if not origin:
+            return None
+
+        with self._lock:
+            return self._cached(origin)
+
+    def _cached(self, origin):
+        # Must be called with the lock held.
+        entry = self._entries.get(origin)
+        if not entry:
+            return None
+
+        if entry[0] <= time.monotonic():
+            del self._entries[origin]
+            return None
+
+        self._entries.move_to_end(origin)
+        return entry[1]
+
+    def _fetch(self, origin):
+        try:
+            status, body = self._fetcher(f'{origin}{RobotsRules.robots_path}')
+
+        except (OSError, ValueError):
+            status, body = None, None
+
+        if status is not None and 200 <= status < 300:
+            text = body[:self.max_size].decode('utf-8', errors='replace')
+            return RobotsRules.parse(text, self._user_agent), self._ttl
+
+        if status is not None and 400 <= status < 500 and status != 429:
+            return RobotsRules.allow_all(), self._ttl
+
+        with self._lock:
+            self._fetch_errors += 1
+        return RobotsRules.disallow_all(), self._error_ttl
+
+    @staticmethod
+    def origin(url):
+        """!@brief Get the origin a url's robots.txt is cached under.
+        @param url Full url.
+        @returns Lower case scheme and host (with any port) or None if the
+                 url isn't http(s).
+        """
+
+        try:
+            parts = urlsplit(url)
+
+        except ValueError:
+            return None
+
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            return None
+
+        return f'{parts.scheme}://{parts.netloc.lower()}'
@@ -0,0 +1,154 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import re
+from urllib.parse import urlsplit
+
+class RobotsRules:
+    """ Rules of a robots.txt file (RFC 9309) that apply to a user agent,
+        the allow and disallow patterns are compiled once when the file is
+        parsed.  The longest matching pattern decides if a path is allowed,
+        an allow wins a tie, and a path that matches no pattern is allowed. """
+    __slots__ = ['_crawl_delay', '_rules']
+
+    ## The robots.txt file itself is always allowed.
+    robots_path = '/robots.txt'
+
+    @property
+    def crawl_delay(self):
+        """!@brief Crawl delay in seconds requested by the host (Getter).
+        @param self The object pointer.
+        @returns float or None if the host didn't set one.
+        """
+        return self._crawl_delay
+
+    def __init__(self, rules=None, crawl_delay=None):
+        """!@brief RobotsRules class constructor.
+        @param self The object pointer.
+        @param rules List of (pattern, allowed) tuples.
+        @param crawl_delay Optional crawl delay in seconds.
+        @returns RobotsRules instance.
+        """
+
+        # Most specific pattern first so the first match decides.
+        ordered = sorted(rules or [], key=lambda rule: (-len(rule[0]),
+                                                        not rule[1]))
+        self._rules = [(self._compile(pattern), allowed)
+                       for pattern, allowed in ordered]
+        self._crawl_delay = crawl_delay
+
+    @classmethod
+    def allow_all(cls):
+        """!@brief Rules for a host without a robots.txt file.
+        @returns RobotsRules.
+        """
+        return cls()
+
+    @classmethod
+    def disallow_all(cls):
+        """!@brief Rules for a host whose robots.txt file couldn't be read.
+        @returns RobotsRules.
+        """
+        return cls([('/', False)])
+
+    @classmethod
+    def parse(cls, text, user_agent):
+        """!@brief Parse a robots.txt file, the groups for the user agent are
+                   used or, if there are none, the groups for '*'.
+        @param text Contents of the robots.txt file.
+        @param user_agent Product token of the crawler, e.g. 'siterummage'.
+        @returns RobotsRules.
+        """
+        #pylint: disable=too-many-branches
+
+        user_agent = user_agent.lower()
+        groups = {}
+        group_agents = []
+        in_rules = False
+
+        for line in text.splitlines():
+            line = line.split('#', 1)[0]
+            if ':' not in line:
+                continue
+
+            key, value = line.split(':', 1)
+            key = key.strip().lower()
+            value = value.strip()
+
+            if key == 'user-agent':
+                # A user agent line after rules starts a new group.
+                if in_rules:
+                    group_agents = []
+                    in_rules = False
+                agent = value.split('/', 1)[0].strip().lower()
+                group_agents.append(groups.setdefault(agent, ([], [])))
+                continue
+
+            if key not in ('allow', 'disallow', 'crawl-delay'):
+                continue
+
+            in_rules = True
+            for rules, delays in group_agents:
+                if key == 'crawl-delay':
+                    delays.append(value)
+                elif value:
+                    rules.append((value, key == 'allow'))
+
+        rules, delays = groups.get(user_agent) or groups.get('*', ([], []))
+
+        crawl_delay = None
+        for delay in delays:
+            try:
+                crawl_delay = max(float(delay), crawl_delay or 0.0)
+
+            except ValueError:
+                continue
+
+        return cls(rules, crawl_delay)
+
+    def is_allowed(self, url) -> bool:
+        """!@brief Check if the rules allow a url to be crawled.
+        @param self The object pointer.
+        @param url Full url or path (with any query) to check.
+        @returns True if allowed, otherwise False.
+        """
+
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if path == self.robots_path:
+            return True
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        for matches, allowed in self._rules:
+            if matches(path):
+                return allowed
+
+        return True
+
+    @staticmethod
+    def _compile(pattern):
+        # Plain patterns are a prefix match, '*' matches any characters and
+        # a trailing '$' anchors the pattern to the end of the path.
+        anchored = pattern.endswith('$')
+        if anchored:
+            pattern = pattern[:-1]
+
+        if '*' not in pattern and not anchored:
+            return lambda path: path.startswith(pattern)
+
+        regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+        return re.compile(regex + (r'\Z' if anchored else ''), re.S).match
@@ -15,6 +15,8 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
 from enum import Enum
+import re
+from urllib.parse import quote, urljoin, urlsplit, urlunsplit
 
 class UrlType(Enum):
     """ Enumeration for type of URL (e.g. http or secure http) """
@@ -33,6 +35,19 @@ class UrlUtils:
     """ General utilities to use with a URL """
     #pylint: disable=too-few-public-methods
 
+    ## Ports that are dropped from a canonical url as they are the default.
+    default_ports = {'http': 80, 'https': 443}
+
+    ## Query parameters used for tracking that don't change the page.
+    tracking_parameters = frozenset([
+        'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+        '_ga', 'yclid'])
+    tracking_parameter_prefixes = ('utm_',)
+
+    _percent_encoding = re.compile('%([0-9A-Fa-f]{2})')
+    _unreserved = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuv'
+                            'wxyz0123456789-._~')
+
     @staticmethod
     def split_url_into_domain_and_page(url):
         """!@brief Take a full url and break it into a domain, url and type of
@@ -76,3 +91,120 @@ class UrlUtils:
             'url_path': url_path,
             'url_type': url_type
             }
+
+    @staticmethod
+    def get_host(url):
+        """!@brief Get the host a url is for, this is the part of the domain
+                   that identifies the server (e.g. for politeness limits).
+        @param url URL to get the host of.
+        @returns Lower case host, including the port if there is one, or None
+                 if the url prefix is unknown.
+        """
+
+        if not url.startswith((UrlPrefix.http, UrlPrefix.https)):
+            return None
+
+        return urlsplit(url).netloc.lower()
+
+    @staticmethod
+    def canonicalise(url, base_url=None, strip_tracking=False):
+        """!@brief Convert a url into its canonical form so that aliases of
+                   the same page compare equal.  The url is resolved against
+                   the base url, the scheme and host are lower cased, the
+                   default port, fragment and dot segments are removed and
+                   percent-encoding is normalised.
+        @param url URL to canonicalise, it can be relative if base_url is set.
+        @param base_url Optional url to resolve a relative url against, e.g.
+                        the <base href> or url of the page the link is on.
+        @param strip_tracking Remove tracking query parameters (e.g. utm_*).
+        @returns Canonical url or None if it isn't a valid http(s) url.
+        """
+
+        url = url.strip()
+        if base_url:
+            url = urljoin(base_url, url)
+
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+
+        except ValueError:
+            return None
+
+        scheme = parts.scheme.lower()
+        if scheme not in UrlUtils.default_ports or not parts.hostname:
+            return None
+
+        host = parts.hostname.rstrip('.')
+        if ':' in host:
+            host = f'[{host}]'
+        if port is not None and port != UrlUtils.default_ports[scheme]:
+            host = f'{host}:{port}'
+
+        path = UrlUtils._normalise_percent_encoding(parts.path)
+        path = UrlUtils._remove_dot_segments(path) if path else '/'
+
+        query = parts.query
+        if query and strip_tracking:
+            query = '&'.join(param for param in query.split('&')
+                             if not UrlUtils._is_tracking_parameter(param))
+        query = UrlUtils._normalise_percent_encoding(query)
+
+        return urlunsplit((scheme, host, path, query, ''))
+
+    @staticmethod
+    def _normalise_percent_encoding(component):
+        # Decode escaped unreserved characters, upper case the hex of the
+        # other escapes and escape anything that isn't valid in a url.
+        def _decode_unreserved(match):
+            char = chr(int(match.group(1), 16))
+            if char in UrlUtils._unreserved:
+                return char
+            return f'%{match.group(1).upper()}'
+
+        component = UrlUtils._percent_encoding.sub(_decode_unreserved,
+                                                   component)
+        return quote(component, safe="%/:@!$&'()*+,;=?-._~")
+
+    @staticmethod
+    def _remove_dot_segments(path):
+        # RFC 3986 section 5.2.4, only '.' and '..' segments are removed so
+        # empty segments ('//') are kept as they are.
+        if '.' not in path:
+            return path
+
+        output = []
+
+        while path:
+            if path.startswith('../'):
+                path = path[3:]
+            elif path.startswith('./'):
+                path = path[2:]
+            elif path.startswith('/./'):
+                path = path[2:]
+            elif path == '/.':
+                path = '/'
+            elif path.startswith('/../'):
+                path = path[3:]
+                if output:
+                    output.pop()
+            elif path == '/..':
+                path = '/'
+                if output:
+                    output.pop()
+            elif path in ('.', '..'):
+                path = ''
+            else:
+                end = path.find('/', 1)
+                if end == -1:
+                    end = len(path)
+                output.append(path[:end])
+                path = path[end:]
+
+        return ''.join(output)
+
+    @staticmethod
+    def _is_tracking_parameter(param):
+        name = param.split('=', 1)[0].lower()
+        return name in UrlUtils.tracking_parameters or \
+            name.startswith(UrlUtils.tracking_parameter_prefixes)
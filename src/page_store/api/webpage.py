@@ -20,7 +20,9 @@ from quart import request
 from common.http_status_code import HTTPStatusCode
 from common.logger import LogType
 from common.mime_type import MIMEType
-from common.api_contracts.page_store import WebpageAdd, WebpageDetails
+from common.api_contracts.page_store import WebpageAdd, WebpageAddBatch, \
+                                           WebpageAddBatchResponse, \
+                                           WebpageDetails, WebpageNotModified
 from common.api_utils import ApiUtils
 
 HEADERKEY_AUTH = 'AuthKey'
@@ -37,12 +39,21 @@ class ApiWebpage:
         self._interface.add_url_rule('/webpage/add',
             methods = ['POST'], view_func = self._add_webpage)
 
+        # Add route : /webpage/add_batch
+        self._interface.add_url_rule('/webpage/add_batch',
+            methods = ['POST'], view_func = self._add_webpage_batch)
+
+        # Add route : /webpage/not_modified
+        self._interface.add_url_rule('/webpage/not_modified',
+            methods = ['POST'], view_func = self._webpage_not_modified)
+
         # Add route : /webpage/details
         self._interface.add_url_rule('/webpage/details',
             methods = ['GET'], view_func = self._get_webpage)
 
     async def _add_webpage(self) -> None:
-        """!@brief Implementation of the /webpage/add endpoint.
+        """!@brief Implementation of the /webpage/add endpoint, a webpage that
+                   already exists (e.g. a rescan) is updated.
         @param self The object pointer.
         @returns None.
         """
@@ -63,39 +74,134 @@ class ApiWebpage:
                 response=err_msg, status=HTTPStatusCode.BadRequest,
                 mimetype=MIMEType.Text)
 
-        connection = self._db_interface.get_connection()
+        connection = await self._db_interface.get_connection()
 
         if not connection:
             return self._interface.response_class(
                 response='System busy',status=HTTPStatusCode.RequestTimeout,
                 mimetype=MIMEType.Text)
 
-        try:
-            record_exists = self._db_interface.webpage_record_exists(
-                connection, obj_instance.general_settings.domain,
-                obj_instance.general_settings.url_path, keep_alive=True)
+        async with connection:
+            try:
+                await self._db_interface.add_webpage(connection, obj_instance)
+
+            except RuntimeError as ex:
+                return self._interface.response_class(
+                    response = str(ex), status = HTTPStatusCode.NotAcceptable,
+                    mimetype = MIMEType.Text)
+
+        return self._interface.response_class(
+            response = 'Success', status = HTTPStatusCode.OK,
+            mimetype = MIMEType.Text)
+
+    async def _add_webpage_batch(self) -> None:
+        """!@brief Implementation of the /webpage/add_batch endpoint, all of
+                   the pages are written in one transaction and the status of
+                   each is returned in the same order as the request.
+        @param self The object pointer.
+        @returns None.
+        """
 
-        except RuntimeError as ex:
+        # Validate the request to ensure the auth key is present and valid.
+        validate_return = ApiUtils.validate_auth_key(request, HEADERKEY_AUTH,
+                                                     self._auth_key)
+        if validate_return is not HTTPStatusCode.OK:
             return self._interface.response_class(
-                response = str(ex), status = HTTPStatusCode.NotAcceptable,
-                mimetype = MIMEType.Text)
+                response = 'Invalid authentication key',
+                status = validate_return, mimetype = MIMEType.Text)
+
+        obj_instance, err_msg = await ApiUtils.convert_json_body_to_object(
+            request, WebpageAddBatch.Schema)
 
-        if record_exists:
-            connection.close()
+        if not obj_instance:
             return self._interface.response_class(
-                response='Website and url already exists',
-                status=HTTPStatusCode.NotAcceptable,
+                response=err_msg, status=HTTPStatusCode.BadRequest,
                 mimetype=MIMEType.Text)
 
-        try:
-            await self._db_interface.add_webpage(connection, obj_instance)
+        connection = await self._db_interface.get_connection()
 
-        except RuntimeError as ex:
+        if not connection:
             return self._interface.response_class(
-                response = str(ex), status = HTTPStatusCode.NotAcceptable,
-                mimetype = MIMEType.Text)
+                response='System busy',status=HTTPStatusCode.RequestTimeout,
+                mimetype=MIMEType.Text)
 
-        connection.close()
+        async with connection:
+            try:
+                statuses = await self._db_interface.add_webpages(
+                    connection, obj_instance.pages)
+
+            except RuntimeError as ex:
+                return self._interface.response_class(
+                    response = str(ex), status = HTTPStatusCode.NotAcceptable,
+                    mimetype = MIMEType.Text)
+
+        elements = WebpageAddBatchResponse.Elements
+        response_body = {
+            elements.results:
+            [
+                {
+                    elements.domain: page.general_settings.domain,
+                    elements.url_path: page.general_settings.url_path,
+                    elements.status: status
+                }
+                for page, status in zip(obj_instance.pages, statuses)
+            ]
+        }
+
+        return self._interface.response_class(
+            response=json.dumps(response_body), status=HTTPStatusCode.OK,
+            mimetype=MIMEType.JSON)
+
+    async def _webpage_not_modified(self) -> None:
+        """!@brief Implementation of the /webpage/not_modified endpoint, a
+                   rescan found the webpage unchanged so only its last scanned
+                   time is updated.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        # Validate the request to ensure the auth key is present and valid.
+        validate_return = ApiUtils.validate_auth_key(request, HEADERKEY_AUTH,
+                                                     self._auth_key)
+        if validate_return is not HTTPStatusCode.OK:
+            return self._interface.response_class(
+                response = 'Invalid authentication key',
+                status = validate_return, mimetype = MIMEType.Text)
+
+        obj_instance, err_msg = await ApiUtils.convert_json_body_to_object(
+            request, WebpageNotModified.Schema)
+
+        if not obj_instance:
+            return self._interface.response_class(
+                response=err_msg, status=HTTPStatusCode.BadRequest,
+                mimetype=MIMEType.Text)
+
+        connection = await self._db_interface.get_connection()
+
+        if not connection:
+            return self._interface.response_class(
+                response='System busy',status=HTTPStatusCode.RequestTimeout,
+                mimetype=MIMEType.Text)
+
+        async with connection:
+            try:
+                record_exists = await self._db_interface.webpage_record_exists(
+                    connection, obj_instance.domain, obj_instance.url_path)
+
+                if record_exists:
+                    await self._db_interface.update_last_scanned(
+                        connection, obj_instance.domain, obj_instance.url_path)
+
+            except RuntimeError as ex:
+                return self._interface.response_class(
+                    response = str(ex), status = HTTPStatusCode.NotAcceptable,
+                    mimetype = MIMEType.Text)
+
+        if not record_exists:
+            return self._interface.response_class(
+                response='Website and url does not exist',
+                status=HTTPStatusCode.NotAcceptable,
+                mimetype=MIMEType.Text)
 
         return self._interface.response_class(
             response = 'Success', status = HTTPStatusCode.OK,
@@ -123,15 +229,22 @@ class ApiWebpage:
                 response=err_msg, status=HTTPStatusCode.BadRequest,
                 mimetype=MIMEType.Text)
 
-        connection = self._db_interface.get_connection()
+        connection = await self._db_interface.get_connection()
 
         if not connection:
             return self._interface.response_class(
                 response='System busy',status=HTTPStatusCode.RequestTimeout,
                 mimetype=MIMEType.Text)
 
-        resp = await self._db_interface.get_webpage(connection, obj_instance)
-        connection.close()
+        async with connection:
+            try:
+                resp = await self._db_interface.get_webpage(connection,
+                                                            obj_instance)
+
+            except RuntimeError as ex:
+                return self._interface.response_class(
+                    response = str(ex), status = HTTPStatusCode.NotAcceptable,
+                    mimetype = MIMEType.Text)
 
         return self._interface.response_class(
             response=json.dumps(resp),status=HTTPStatusCode.OK,
@@ -67,8 +67,18 @@ class DatabaseSettings:
         """
         return self._pool_size
 
-    def __init__(self, username, database, host, port, pool_name, pool_size):
+    @property
+    def acquire_timeout(self) -> float:
+        """!@brief Seconds to wait for a free pooled connection (Getter).
+        @param self The object pointer.
+        @returns float.
+        """
+        return self._acquire_timeout
+
+    def __init__(self, username, database, host, port, pool_name, pool_size,
+                 acquire_timeout):
         #pylint: disable=too-many-arguments
+        self._acquire_timeout = acquire_timeout
         self._database = database
         self._host = host
         self._pool_name = pool_name
@@ -95,6 +95,8 @@ class ConfigurationManager:
         pool_size = settings[schema.Elements.db_settings_pool_size]
         port = settings[schema.Elements.db_settings_port]
         username = settings[schema.Elements.db_settings_username]
+        acquire_timeout = settings.get(
+            schema.Elements.db_settings_acquire_timeout, 1.0)
 
         return DatabaseSettings(username, database, host, port, pool_name,
-                                pool_size)
+                                pool_size, acquire_timeout)
@@ -34,6 +34,7 @@ class ConfigurationSchema:
         db_settings_pool_size = 'pool_size'
         db_settings_port = 'port'
         db_settings_username = 'username'
+        db_settings_acquire_timeout = 'acquire_timeout'
 
     json_schema = \
     {
@@ -75,6 +76,11 @@ class ConfigurationSchema:
                     'username':
                     {
                         "type" : "string"
+                    },
+                    'acquire_timeout':
+                    {
+                        "type" : "number",
+                        "exclusiveMinimum": 0
                     }
                 },
                 "required" : ['database', 'host', 'pool_name', 'pool_size',
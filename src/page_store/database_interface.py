@@ -15,16 +15,35 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
 from time import sleep
-from common.api_contracts.page_store import WebpageDetailsResponse
+from common.api_contracts.page_store import WebpageAddBatchResponse, \
+                                           WebpageDetailsResponse
 from common.logger import LogType
+from common.mysql_connector.async_mysql_adaptor import AsyncMySQLAdaptor
+from common.mysql_connector.async_mysql_connection import AsyncMySQLConnection
 from common.mysql_connector.mysql_adaptor import MySQLAdaptor
 
 class DatabaseInterface:
     """ Database functionalty abstraction class """
-    __slots__ = ['_db_adaptor', '_config', '_logger']
+    __slots__ = ['_async_db_adaptor', '_db_adaptor', '_config', '_logger']
 
     domain_table_lock = 'domain_lock'
 
+    ## SQL for the url hash of a domain and url path, webpages are looked up
+    ## on the unique index of the hash as url_path is too wide to index.
+    url_hash_sql = 'UNHEX(SHA2(CONCAT(%s, %s), 256))'
+
+    ## Upserts of a webpage and its metadata, a rescan of a webpage that
+    ## already exists replaces its scan results and metadata.
+    webpage_upsert_sql = 'INSERT INTO webpage(domain, url_path, ' + \
+        'read_successful, page_hash, etag, last_modified)'
+    webpage_update_sql = 'last_scanned = CURRENT_TIMESTAMP, ' + \
+        'read_successful = VALUES(read_successful), ' + \
+        'page_hash = VALUES(page_hash), etag = VALUES(etag), ' + \
+        'last_modified = VALUES(last_modified)'
+    metadata_upsert_sql = 'INSERT INTO webpage_metadata(webpage_id, ' + \
+        'title, abstract)'
+    metadata_update_sql = 'title = VALUES(title), abstract = VALUES(abstract)'
+
     def __init__(self, logger, configuration):
         """!@brief DatabaseInterface class constructor
         @param self The object pointer.
@@ -42,6 +61,8 @@ class DatabaseInterface:
                                         self._config._db_settings.port,
                                         self._config._db_settings.pool_name,
                                         self._config._db_settings.pool_size)
+        self._async_db_adaptor = AsyncMySQLAdaptor(self._db_adaptor,
+                                                   'master_2021')
 
     def database_connection_valid(self) -> bool:
         """!@brief Check if the database connection is valid
@@ -85,42 +106,60 @@ class DatabaseInterface:
 
         return False
 
-    def get_connection(self):
-        """!@brief Get a database connection, retrying on error.
+    async def get_connection(self) -> AsyncMySQLConnection:
+        """!@brief Get a database connection, waiting up to the acquire
+                   timeout for one to be free without blocking the event loop.
         @param self The object pointer.
-        @returns MySQLConnection if a valid connection else it returns None.
+        @returns AsyncMySQLConnection if a valid connection else it returns
+                 None.
         """
 
-        tries = 1
-
-        while tries != 10:
+        try:
+            return await self._async_db_adaptor.acquire(
+                self._config.db_settings.acquire_timeout)
 
-            try:
-                return self._db_adaptor.connect('master_2021')
+        except RuntimeError as ex:
+            pool = self._async_db_adaptor
+            self._logger.log(LogType.Warn,
+                             f'Unable to get a database connection: {ex} ' + \
+                             f'({pool.in_use} in use, {pool.waiters} waiting)')
+            return None
 
-            except RuntimeError:
-                tries += 1
-
-            sleep(0.1)
+    def log_pool_statistics(self) -> None:
+        """!@brief Log the database connection pool statistics.
+        @param self The object pointer.
+        @returns None.
+        """
 
-        return None
+        pool = self._async_db_adaptor
+        self._logger.log(LogType.Info,
+                         f'Database pool: {pool.acquired} acquired, ' + \
+                         f'{pool.timeouts} timed out, ' + \
+                         f'{pool.in_use} in use, {pool.waiters} waiting, ' + \
+                         'average wait ' + \
+                         f'{pool.average_wait_ms:.1f}ms, max wait ' + \
+                         f'{pool.max_wait_ms:.1f}ms')
+
+    def shutdown(self) -> None:
+        """!@brief Stop the database thread pool.
+        @param self The object pointer.
+        @returns None.
+        """
+        self._async_db_adaptor.shutdown()
 
-    def webpage_record_exists(self, connection, domain, url_path,
-                              keep_alive=False):
+    async def webpage_record_exists(self, connection, domain, url_path):
         """!@brief Check to see if a webpage record exists, it is only basic
                    data.
         @param self The object pointer.
         @param connection Database connection.
         @param domain Base domain (e.g. http://www.google.com)
         @param url_path Url after domain (e.g. /index.html)
-        @param keep_alive Should connection be kept alive (default is False).
         @returns True = exists, False = doesn't exist.
         """
 
-        query = "SELECT id FROM webpage WHERE url_path = %s AND domain = %s"
-        query_args = (url_path, domain)
-        results, err_msg = connection.query(query, query_args,
-                                            keep_conn_alive=keep_alive)
+        query = f"SELECT id FROM webpage WHERE url_hash = {self.url_hash_sql}"
+        query_args = (domain, url_path)
+        results, err_msg = await connection.query(query, query_args)
 
         if err_msg:
             self._logger.log(LogType.Critical,
@@ -130,7 +169,7 @@ class DatabaseInterface:
 
         return len(results)
 
-    def get_table_lock(self, connection, lock_name) -> bool:
+    async def get_table_lock(self, connection, lock_name) -> bool:
         """!@brief Attempt to get a lock for write using lock_name as the lock
                    identifier.
         @param self The object pointer.
@@ -142,11 +181,10 @@ class DatabaseInterface:
 
         query = "SELECT GET_LOCK(%s,10) as 'lock'"
         query_args = (lock_name,)
-        results, _ = connection.query(query, query_args,
-                                      keep_conn_alive=True)
+        results, _ = await connection.query(query, query_args)
         return results[0]['lock'] == 1
 
-    def release_table_lock(self, connection, lock_name) -> bool:
+    async def release_table_lock(self, connection, lock_name) -> bool:
         """!@brief Release a lock using lock_name as the lock identifier.
         @param self The object pointer.
         @param connection Database connection.
@@ -157,56 +195,165 @@ class DatabaseInterface:
 
         query = "SELECT RELEASE_LOCK(%s) as 'lock'"
         query_args = (lock_name,)
-        results, _ = connection.query(query, query_args,
-                                      keep_conn_alive=True)
+        results, _ = await connection.query(query, query_args)
         return results[0]['lock'] == 1
 
-    async def add_webpage(self, connection, page_details) -> None:
-        """!@brief Add webpage entries for the domain (when it does not exist),
-                   webpage and its metadata.
+    async def add_webpage(self, connection, page_details) -> bool:
+        """!@brief Add or update a webpage and its metadata, a webpage that
+                   already exists (e.g. a rescan) is updated in place.  Each
+                   table is written with a single upsert in one transaction.
         @param self The object pointer.
         @param connection Database connection.
         @param page_details Dictionary containing page details.
-        @returns None.
+        @returns True if the webpage was added, False if it was updated.
+        """
+
+        settings = page_details.general_settings
+
+        async with connection.transaction():
+            query = self.webpage_upsert_sql + \
+                ' VALUES(%s, %s, %s, %s, %s, %s)' + \
+                ' ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id), ' + \
+                self.webpage_update_sql
+            query_args = (settings.domain, settings.url_path,
+                          settings.successfully_read, settings.hash,
+                          getattr(settings, 'etag', None),
+                          getattr(settings, 'last_modified', None))
+
+            # LAST_INSERT_ID(id) makes the id of an updated row the insert id.
+            row_count, webpage_id, err_msg = await connection.execute(
+                query, query_args)
+            if err_msg:
+                self._raise_query_error(query, err_msg)
+
+            query = self.metadata_upsert_sql + ' VALUES(%s, %s, %s)' + \
+                ' ON DUPLICATE KEY UPDATE ' + self.metadata_update_sql
+            query_args = (webpage_id, page_details.metadata.title,
+                          page_details.metadata.abstract)
+            _, _, err_msg = await connection.execute(query, query_args)
+            if err_msg:
+                self._raise_query_error(query, err_msg)
+
+            err_msg = await connection.commit()
+            if err_msg:
+                self._raise_query_error('COMMIT', err_msg)
+
+        # An upsert counts an inserted row once and an updated row twice.
+        return row_count == 1
+
+    async def add_webpages(self, connection, pages) -> list:
+        """!@brief Add or update a batch of webpages and their metadata in a
+                   single transaction using one multi-row upsert per table.
+                   A webpage repeated in the batch is only written once.
+        @param self The object pointer.
+        @param connection Database connection.
+        @param pages List of page details, the same as for add_webpage.
+        @returns List of WebpageAddBatchResponse.Status, one per page.
         """
 
-        # Add core webpage entry
-        ###########
-        query = "INSERT INTO webpage(domain, url_path, read_successful, " + \
-            "page_hash) VALUES(%s, %s, %s, %s)"
-        query_args = (page_details.general_settings.domain,
-                      page_details.general_settings.url_path,
-                      page_details.general_settings.successfully_read,
-                      page_details.general_settings.hash)
-        results, err_msg = connection.query(query, query_args, commit=True,
-                                            keep_conn_alive=True)
+        statuses = WebpageAddBatchResponse.Status
+        keys = [(page.general_settings.domain, page.general_settings.url_path)
+                for page in pages]
+
+        unique_pages = {}
+        for key, page in zip(keys, pages):
+            unique_pages.setdefault(key, page)
+        hash_args = tuple(value for key in unique_pages for value in key)
+        hash_list = ', '.join([self.url_hash_sql] * len(unique_pages))
+
+        query = "SELECT domain, url_path FROM webpage " + \
+            f"WHERE url_hash IN ({hash_list})"
+        results, err_msg = await connection.query(query, hash_args)
         if err_msg:
-            self._logger.log(LogType.Critical,
-                            f"Query '{query}' caused a critical " + \
-                            f"error: {err_msg}")
-            raise RuntimeError('Internal database error')
+            self._raise_query_error(query, err_msg)
+
+        existing = {(row['domain'], row['url_path']) for row in results}
+
+        async with connection.transaction():
+            query = self.webpage_upsert_sql + ' VALUES ' + \
+                ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(unique_pages)) + \
+                ' ON DUPLICATE KEY UPDATE ' + self.webpage_update_sql
+            query_args = []
+            for (domain, url_path), page in unique_pages.items():
+                settings = page.general_settings
+                query_args.extend([domain, url_path,
+                                   settings.successfully_read, settings.hash,
+                                   getattr(settings, 'etag', None),
+                                   getattr(settings, 'last_modified', None)])
+            _, _, err_msg = await connection.execute(query, query_args)
+            if err_msg:
+                self._raise_query_error(query, err_msg)
+
+            query = "SELECT id, domain, url_path FROM webpage " + \
+                f"WHERE url_hash IN ({hash_list})"
+            results, err_msg = await connection.query(query, hash_args)
+            if err_msg:
+                self._raise_query_error(query, err_msg)
+
+            webpage_ids = {(row['domain'], row['url_path']): row['id']
+                           for row in results}
+
+            query = self.metadata_upsert_sql + ' VALUES ' + \
+                ', '.join(['(%s, %s, %s)'] * len(unique_pages)) + \
+                ' ON DUPLICATE KEY UPDATE ' + self.metadata_update_sql
+            query_args = []
+            for key, page in unique_pages.items():
+                query_args.extend([webpage_ids[key], page.metadata.title,
+                                   page.metadata.abstract])
+            _, _, err_msg = await connection.execute(query, query_args)
+            if err_msg:
+                self._raise_query_error(query, err_msg)
+
+            err_msg = await connection.commit()
+            if err_msg:
+                self._raise_query_error('COMMIT', err_msg)
+
+        page_statuses = []
+        written = set()
+        for key in keys:
+            if key in written:
+                page_statuses.append(statuses.duplicate)
+            else:
+                page_statuses.append(statuses.updated if key in existing
+                                     else statuses.added)
+                written.add(key)
+
+        return page_statuses
+
+    def _raise_query_error(self, query, err_msg) -> None:
+        """!@brief Log a failed query and raise a RuntimeError, raising it
+                   inside a transaction block rolls the transaction back.
+        @param self The object pointer.
+        @param query Query that failed.
+        @param err_msg Error message of the failure.
+        @returns None.
+        """
+
+        self._logger.log(LogType.Critical,
+                        f"Query '{query}' caused a critical " + \
+                        f"error: {err_msg}")
+        raise RuntimeError('Internal database error')
 
-        results, _ = connection.query('SELECT LAST_INSERT_ID() as last_id',
-                                        keep_conn_alive=True)
-        webpage_id = results[0]['last_id']
-
-        # Add webpage metadata entry
-        ###########
-        query = "INSERT INTO webpage_metadata(webpage_id, title, abstract)" + \
-            " VALUES(%s, %s, %s)"
-        query_args = (webpage_id, page_details.metadata.title,
-                      page_details.metadata.abstract)
-        results, err_msg = connection.query(query, query_args, commit=True,
-                                            keep_conn_alive=True)
+    async def update_last_scanned(self, connection, domain, url_path) -> None:
+        """!@brief Update the last scanned time of a webpage that was found to
+                   be unchanged, nothing else about the webpage is altered.
+        @param self The object pointer.
+        @param connection Database connection.
+        @param domain Base domain (e.g. http://www.google.com)
+        @param url_path Url after domain (e.g. /index.html)
+        @returns None.
+        """
+
+        query = "UPDATE webpage SET last_scanned = CURRENT_TIMESTAMP " + \
+                f"WHERE url_hash = {self.url_hash_sql}"
+        query_args = (domain, url_path)
+        _, err_msg = await connection.query(query, query_args, commit=True)
         if err_msg:
             self._logger.log(LogType.Critical,
                             f"Query '{query}' caused a critical " + \
                             f"error: {err_msg}")
             raise RuntimeError('Internal database error')
 
-        results, _ = connection.query('SELECT LAST_INSERT_ID() as last_id',
-                                        keep_conn_alive=True)
-
     async def get_webpage(self, connection, page_details) -> object:
         """!@brief Get a webpages details (if it exists), if it doesn't then
                    return an emptry dictionary.
@@ -217,12 +364,13 @@ class DatabaseInterface:
         """
 
         query = "SELECT wp.last_scanned, wp.read_successful, " + \
-                "wp.page_hash, md.title, md.abstract " + \
+                "wp.page_hash, wp.etag, wp.last_modified, md.title, " + \
+                "md.abstract " + \
                 "FROM webpage as wp LEFT JOIN webpage_metadata as md " + \
-                "ON wp.id = md.webpage_id WHERE wp.domain = %s AND wp.url_path = %s"
+                "ON wp.id = md.webpage_id " + \
+                f"WHERE wp.url_hash = {self.url_hash_sql}"
         query_args = (page_details.domain, page_details.url_path)
-        results, err_msg = connection.query(query, query_args,
-                                            keep_conn_alive=True)
+        results, err_msg = await connection.query(query, query_args)
         if err_msg:
             self._logger.log(LogType.Critical,
                             f"Query '{query}' caused a critical " + \
@@ -243,7 +391,10 @@ class DatabaseInterface:
             WebpageDetailsResponse.Elements.abstract: abstract,
             WebpageDetailsResponse.Elements.read_successful: read_success,
             WebpageDetailsResponse.Elements.last_scanned: last_scanned,
-            WebpageDetailsResponse.Elements.page_hash: page_hash
+            WebpageDetailsResponse.Elements.page_hash: page_hash,
+            WebpageDetailsResponse.Elements.etag: results[0]['etag'],
+            WebpageDetailsResponse.Elements.last_modified:
+                results[0]['last_modified']
         }
 
         return response
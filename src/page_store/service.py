@@ -75,6 +75,8 @@ class Service(ServiceBase):
         self._logger.log(LogType.Info, f'+= port      : {db_config.port}')
         self._logger.log(LogType.Info, f'+= pool_name : {db_config.pool_name}')
         self._logger.log(LogType.Info, f'+= pool_size : {db_config.pool_size}')
+        self._logger.log(LogType.Info,
+                         f'+= acquire_timeout : {db_config.acquire_timeout}s')
         self._logger.log(LogType.Info, '+==============================+')
 
         self._db_interface = DatabaseInterface(self._logger,
@@ -97,3 +99,8 @@ class Service(ServiceBase):
 
     def _shutdown(self):
         self._logger.log(LogType.Info, 'Shutting down...')
+
+        if self._db_interface:
+            self._db_interface.log_pool_statistics()
+            self._db_interface.shutdown()
+            self._logger.log(LogType.Info, '|-> Database thread pool stopped')
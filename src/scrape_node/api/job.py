@@ -68,7 +68,12 @@ class ApiJob:
         message_body = {
             'url': obj_instance.url,
             'task_type': obj_instance.task_type,
-            'task_id': obj_instance.task_id
+            'task_id': obj_instance.task_id,
+            'etag': getattr(obj_instance, NewJobTaskRequest.Elements.etag,
+                            None),
+            'last_modified': getattr(obj_instance,
+                                     NewJobTaskRequest.Elements.last_modified,
+                                     None)
         }
         new_event = Event(EventID.NewScrapeTask, message_body)
         self._event_manager.queue_event(new_event)
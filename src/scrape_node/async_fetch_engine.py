@@ -0,0 +1,154 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from common.logger import Logger, LogType
+from common.url_utils import UrlUtils
+from page_scraper import PageScraper
+
+class AsyncFetchEngine:
+    ''' Fetch engine that runs an asyncio event loop in its own thread and
+        keeps up to max_in_flight pages being scraped at once, of which at
+        most max_per_host are for the same host. '''
+    __slots__ = ['_executor', '_host_slots', '_logger', '_loop',
+                 '_max_in_flight', '_max_per_host', '_node_slots',
+                 '_page_scraper', '_thread']
+
+    @property
+    def max_in_flight(self) -> int:
+        """!@brief Maximum pages being fetched at once by the node (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_in_flight
+
+    @property
+    def max_per_host(self) -> int:
+        """!@brief Maximum pages being fetched at once from a host (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_per_host
+
+    def __init__(self, page_scraper : PageScraper, logger : Logger,
+                 max_in_flight : int, max_per_host : int) -> None:
+        """!@brief AsyncFetchEngine class constructor.
+        @param self The object pointer.
+        @param page_scraper Page scraper used to fetch and scrape a page.
+        @param logger Instance of the logging wrapper class.
+        @param max_in_flight Maximum pages in flight for the whole node.
+        @param max_per_host Maximum pages in flight for a single host.
+        @returns None.
+        """
+        self._page_scraper = page_scraper
+        self._logger = logger
+        self._max_in_flight = max_in_flight
+        self._max_per_host = max_per_host
+
+        self._loop = asyncio.new_event_loop()
+        self._node_slots = None
+        self._host_slots = {}
+
+        # The blocking read and parse run on the executor, so it is sized to
+        # the number of pages that can be in flight.
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+
+    def start(self) -> None:
+        """!@brief Start the event loop thread.
+        @param self The object pointer.
+        @returns None.
+        """
+        self._logger.log(LogType.Info,
+                         'Fetch engine | Starting with ' + \
+                         f'{self._max_in_flight} pages in flight, ' + \
+                         f'{self._max_per_host} per host')
+        self._thread.start()
+
+    def stop(self) -> None:
+        """!@brief Stop the event loop thread, any pages still in flight are
+                   abandoned and their tasks are redelivered by the messaging
+                   queue as they were never acknowledged.
+        @param self The object pointer.
+        @returns None.
+        """
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._executor.shutdown(wait=False)
+
+    def submit(self, url, task_type, task_id, on_complete, etag=None,
+               last_modified=None) -> None:
+        """!@brief Schedule a page to be scraped, this can be called from any
+                   thread.  on_complete(links, results) is called from the
+                   fetch engine thread once the scrape has finished, results
+                   is None if the scrape raised an exception.
+        @param self The object pointer.
+        @param url URL to scrape.
+        @param task_type Type of task (e.g. New or Rescan).
+        @param task_id Unique identifier of the task.
+        @param on_complete Completion callback.
+        @param etag Optional ETag from the previous scan.
+        @param last_modified Optional Last-Modified from the previous scan.
+        @returns None.
+        """
+        #pylint: disable=too-many-arguments
+        asyncio.run_coroutine_threadsafe(
+            self._scrape(url, task_type, task_id, on_complete, etag,
+                         last_modified), self._loop)
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._node_slots = asyncio.Semaphore(self._max_in_flight)
+        self._loop.run_forever()
+
+    async def _scrape(self, url, task_type, task_id, on_complete, etag,
+                      last_modified) -> None:
+        #pylint: disable=too-many-arguments, broad-except
+
+        domain = UrlUtils.get_host(url)
+
+        # Per-host semaphores are only kept whilst a page for the host is in
+        # flight or waiting, so the table doesn't grow with every host seen.
+        host_slot = self._host_slots.get(domain)
+        if not host_slot:
+            host_slot = [asyncio.Semaphore(self._max_per_host), 0]
+            self._host_slots[domain] = host_slot
+        host_slot[1] += 1
+
+        links = []
+        results = None
+
+        try:
+            # Wait for the host slot before taking a node slot so a busy host
+            # does not hold node capacity that other hosts could use.
+            async with host_slot[0]:
+                async with self._node_slots:
+                    links, results = await self._loop.run_in_executor(
+                        self._executor, self._page_scraper.scrape_page, url,
+                        task_type, task_id, etag, last_modified)
+
+        except Exception as ex:
+            self._logger.log(LogType.Error,
+                             f"Scrape of url '{url}' failed, reason: {ex}")
+
+        finally:
+            host_slot[1] -= 1
+            if not host_slot[1]:
+                del self._host_slots[domain]
+
+        on_complete(links, results)
@@ -96,9 +96,273 @@ class ApiSettings:
         self._private_key_file = private_key_file
         self._public_key_file = public_key_file
 
+class DnsCacheSettings:
+    """ Settings related to caching the host name lookups of crawled hosts """
+    __slots__ = ['_enabled', '_max_entries', '_negative_ttl', '_ttl']
+
+    @property
+    def enabled(self) -> bool:
+        """!@brief Is the dns cache enabled (Getter).
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._enabled
+
+    @property
+    def max_entries(self) -> int:
+        """!@brief Maximum number of hosts cached (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_entries
+
+    @property
+    def negative_ttl(self) -> int:
+        """!@brief Seconds a failed lookup is cached for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._negative_ttl
+
+    @property
+    def ttl(self) -> int:
+        """!@brief Seconds the addresses of a host are cached for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._ttl
+
+    def __init__(self, enabled, max_entries, ttl, negative_ttl):
+        self._enabled = enabled
+        self._max_entries = max_entries
+        self._negative_ttl = negative_ttl
+        self._ttl = ttl
+
+class FetchEngineSettings:
+    """ Settings related to the page fetch engine """
+    __slots__ = ['_engine', '_max_in_flight', '_max_per_host']
+
+    @property
+    def engine(self) -> str:
+        """!@brief Fetch engine type, either 'sync' or 'async' (Getter).
+        @param self The object pointer.
+        @returns string.
+        """
+        return self._engine
+
+    @property
+    def max_in_flight(self) -> int:
+        """!@brief Maximum pages being fetched at once by the node (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_in_flight
+
+    @property
+    def max_per_host(self) -> int:
+        """!@brief Maximum pages being fetched at once from a host (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_per_host
+
+    def __init__(self, engine, max_in_flight, max_per_host):
+        self._engine = engine
+        self._max_in_flight = max_in_flight
+        self._max_per_host = max_per_host
+
+class HttpPoolSettings:
+    """ Settings related to the keep-alive http connection pools """
+    __slots__ = ['_big_broker_pool_size', '_crawled_hosts_max_pools',
+                 '_crawled_hosts_pool_size', '_page_store_pool_size',
+                 '_processing_queue_pool_size']
+
+    @property
+    def big_broker_pool_size(self) -> int:
+        """!@brief Connections kept alive to the Big Broker (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._big_broker_pool_size
+
+    @property
+    def crawled_hosts_max_pools(self) -> int:
+        """!@brief Number of crawled hosts to keep a pool for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._crawled_hosts_max_pools
+
+    @property
+    def crawled_hosts_pool_size(self) -> int:
+        """!@brief Connections kept alive to each crawled host (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._crawled_hosts_pool_size
+
+    @property
+    def page_store_pool_size(self) -> int:
+        """!@brief Connections kept alive to the Page Store (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._page_store_pool_size
+
+    @property
+    def processing_queue_pool_size(self) -> int:
+        """!@brief Connections kept alive to the Processing Queue (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._processing_queue_pool_size
+
+    def __init__(self, page_store_pool_size, big_broker_pool_size,
+                 processing_queue_pool_size, crawled_hosts_max_pools,
+                 crawled_hosts_pool_size):
+        #pylint: disable=too-many-arguments
+        self._big_broker_pool_size = big_broker_pool_size
+        self._crawled_hosts_max_pools = crawled_hosts_max_pools
+        self._crawled_hosts_pool_size = crawled_hosts_pool_size
+        self._page_store_pool_size = page_store_pool_size
+        self._processing_queue_pool_size = processing_queue_pool_size
+
+class PageDownloadSettings:
+    """ Settings related to downloading scraped pages """
+    __slots__ = ['_allowed_content_types', '_chunk_size', '_max_body_size']
+
+    @property
+    def allowed_content_types(self) -> list:
+        """!@brief Content types of pages that are downloaded (Getter).
+        @param self The object pointer.
+        @returns list of lower case MIME type strings.
+        """
+        return self._allowed_content_types
+
+    @property
+    def chunk_size(self) -> int:
+        """!@brief Size of the chunks a page body is read in (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._chunk_size
+
+    @property
+    def max_body_size(self) -> int:
+        """!@brief Largest page body downloaded in bytes (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_body_size
+
+    def __init__(self, max_body_size, allowed_content_types, chunk_size):
+        self._allowed_content_types = allowed_content_types
+        self._chunk_size = chunk_size
+        self._max_body_size = max_body_size
+
+class PageParserSettings:
+    """ Settings related to parsing scraped pages """
+    __slots__ = ['_byte_limit', '_mode', '_process_pool_size']
+
+    @property
+    def byte_limit(self) -> int:
+        """!@brief Maximum bytes of a page parsed in streaming mode (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._byte_limit
+
+    @property
+    def mode(self) -> str:
+        """!@brief Parse mode, either 'tree' or 'streaming' (Getter).
+        @param self The object pointer.
+        @returns string.
+        """
+        return self._mode
+
+    @property
+    def process_pool_size(self) -> int:
+        """!@brief Number of parse processes, 0 to parse on the fetch threads
+                   (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._process_pool_size
+
+    def __init__(self, mode, byte_limit, process_pool_size):
+        self._byte_limit = byte_limit
+        self._mode = mode
+        self._process_pool_size = process_pool_size
+
+class RobotsSettings:
+    """ Settings related to honouring the robots.txt of crawled hosts """
+    __slots__ = ['_enabled', '_error_ttl', '_fetch_timeout', '_max_hosts',
+                 '_ttl', '_user_agent']
+
+    @property
+    def enabled(self) -> bool:
+        """!@brief Is robots.txt checked before a page is read (Getter).
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._enabled
+
+    @property
+    def error_ttl(self) -> int:
+        """!@brief Seconds a robots.txt that couldn't be read is cached for
+                   (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._error_ttl
+
+    @property
+    def fetch_timeout(self) -> int:
+        """!@brief Seconds to wait when reading a robots.txt (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._fetch_timeout
+
+    @property
+    def max_hosts(self) -> int:
+        """!@brief Maximum number of hosts to cache rules for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._max_hosts
+
+    @property
+    def ttl(self) -> int:
+        """!@brief Seconds the rules of a host are cached for (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._ttl
+
+    @property
+    def user_agent(self) -> str:
+        """!@brief Product token robots.txt groups are matched on (Getter).
+        @param self The object pointer.
+        @returns str.
+        """
+        return self._user_agent
+
+    def __init__(self, enabled, user_agent, max_hosts, ttl, error_ttl,
+                 fetch_timeout):
+        #pylint: disable=too-many-arguments
+        self._enabled = enabled
+        self._error_ttl = error_ttl
+        self._fetch_timeout = fetch_timeout
+        self._max_hosts = max_hosts
+        self._ttl = ttl
+        self._user_agent = user_agent
+
 class Configuration:
     ''' Scrape Node configuration '''
-    __slots__ = ['_api_settings', '_big_broker_api', '_page_store_api']
+    __slots__ = ['_api_settings', '_big_broker_api', '_dns_cache',
+                 '_fetch_engine', '_http_pools', '_page_download',
+                 '_page_parser', '_page_store_api', '_robots']
 
     @property
     def api_settings(self) -> ApiSettings:
@@ -116,6 +380,46 @@ class Configuration:
         """
         return self._big_broker_api
 
+    @property
+    def dns_cache(self) -> DnsCacheSettings:
+        """!@brief Settings for the dns cache (Getter).
+        @param self The object pointer.
+        @returns DnsCacheSettings.
+        """
+        return self._dns_cache
+
+    @property
+    def fetch_engine(self) -> FetchEngineSettings:
+        """!@brief Settings for the page fetch engine (Getter).
+        @param self The object pointer.
+        @returns FetchEngineSettings.
+        """
+        return self._fetch_engine
+
+    @property
+    def http_pools(self) -> HttpPoolSettings:
+        """!@brief Settings for the http connection pools (Getter).
+        @param self The object pointer.
+        @returns HttpPoolSettings.
+        """
+        return self._http_pools
+
+    @property
+    def page_download(self) -> PageDownloadSettings:
+        """!@brief Settings for downloading scraped pages (Getter).
+        @param self The object pointer.
+        @returns PageDownloadSettings.
+        """
+        return self._page_download
+
+    @property
+    def page_parser(self) -> PageParserSettings:
+        """!@brief Settings for parsing scraped pages (Getter).
+        @param self The object pointer.
+        @returns PageParserSettings.
+        """
+        return self._page_parser
+
     @property
     def page_store_api(self) -> PageStoreApi:
         """!@brief Settings for the Page Store Api (Getter).
@@ -124,7 +428,24 @@ class Configuration:
         """
         return self._page_store_api
 
-    def __init__(self, api_settings, big_broker_api, page_store_api):
+    @property
+    def robots(self) -> RobotsSettings:
+        """!@brief Settings for honouring robots.txt (Getter).
+        @param self The object pointer.
+        @returns RobotsSettings.
+        """
+        return self._robots
+
+    def __init__(self, api_settings, big_broker_api, page_store_api,
+                 fetch_engine, http_pools, page_parser, page_download,
+                 dns_cache, robots):
+        #pylint: disable=too-many-arguments
         self._api_settings = api_settings
         self._big_broker_api = big_broker_api
+        self._dns_cache = dns_cache
+        self._fetch_engine = fetch_engine
+        self._http_pools = http_pools
+        self._page_download = page_download
+        self._page_parser = page_parser
         self._page_store_api = page_store_api
+        self._robots = robots
@@ -18,8 +18,11 @@ import json
 from typing import Union
 import jsonschema
 from common.common_configuration_key import CommonConfigurationKey
+from common.mime_type import MIMEType
 from configuration import ApiSettings, BigBrokerApi, Configuration, \
-                          PageStoreApi
+                          DnsCacheSettings, FetchEngineSettings, \
+                          HttpPoolSettings, PageDownloadSettings, \
+                          PageParserSettings, PageStoreApi, RobotsSettings
 from configuration_schema import ConfigurationSchema as schema
 
 class ConfigurationManager:
@@ -87,8 +90,32 @@ class ConfigurationManager:
         raw_settings = raw_json[schema.element_page_store]
         page_store_settings = self._process_page_store_settings(raw_settings)
 
+        raw_settings = raw_json.get(schema.element_fetch_engine, {})
+        fetch_engine_settings = self._process_fetch_engine_settings(
+            raw_settings)
+
+        raw_settings = raw_json.get(schema.element_http_pools, {})
+        http_pool_settings = self._process_http_pool_settings(raw_settings)
+
+        raw_settings = raw_json.get(schema.element_page_parser, {})
+        page_parser_settings = self._process_page_parser_settings(
+            raw_settings)
+
+        raw_settings = raw_json.get(schema.element_page_download, {})
+        page_download_settings = self._process_page_download_settings(
+            raw_settings)
+
+        raw_settings = raw_json.get(schema.element_dns_cache, {})
+        dns_cache_settings = self._process_dns_cache_settings(raw_settings)
+
+        raw_settings = raw_json.get(schema.element_robots, {})
+        robots_settings = self._process_robots_settings(raw_settings)
+
         return Configuration(api_settings, big_broker_settings,
-                             page_store_settings)
+                             page_store_settings, fetch_engine_settings,
+                             http_pool_settings, page_parser_settings,
+                             page_download_settings, dns_cache_settings,
+                             robots_settings)
 
     def _process_api_settings(self, settings) -> ApiSettings:
         """!@brief Parse the Big Broker Api settings.
@@ -126,3 +153,104 @@ class ConfigurationManager:
         auth_key = settings[CommonConfigurationKey.api_auth_key]
         api_endpoint = settings[CommonConfigurationKey.api_endpoint]
         return PageStoreApi(auth_key, api_endpoint)
+
+    def _process_fetch_engine_settings(self, settings) -> FetchEngineSettings:
+        """!@brief Process the fetch engine settings section, the section is
+                   optional so missing values fall back to the original one
+                   page at a time behaviour.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns FetchEngineSettings.
+        """
+        #pylint: disable=no-self-use
+
+        engine = settings.get(schema.fetch_engine_type,
+                              schema.fetch_engine_type_sync)
+        max_in_flight = settings.get(schema.fetch_engine_max_in_flight, 1)
+        max_per_host = settings.get(schema.fetch_engine_max_per_host, 1)
+        return FetchEngineSettings(engine, max_in_flight, max_per_host)
+
+    def _process_http_pool_settings(self, settings) -> HttpPoolSettings:
+        """!@brief Process the http pools settings section, the section and
+                   all of its values are optional.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns HttpPoolSettings.
+        """
+        #pylint: disable=no-self-use
+
+        page_store = settings.get(schema.http_pools_page_store, 4)
+        big_broker = settings.get(schema.http_pools_big_broker, 2)
+        processing_queue = settings.get(schema.http_pools_processing_queue, 4)
+        crawled_max_pools = settings.get(
+            schema.http_pools_crawled_hosts_max_pools, 100)
+        crawled_hosts = settings.get(schema.http_pools_crawled_hosts, 2)
+        return HttpPoolSettings(page_store, big_broker, processing_queue,
+                                crawled_max_pools, crawled_hosts)
+
+    def _process_page_parser_settings(self, settings) -> PageParserSettings:
+        """!@brief Process the page parser settings section, the section is
+                   optional and defaults to building a full element tree on
+                   the fetch threads.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns PageParserSettings.
+        """
+        #pylint: disable=no-self-use
+
+        mode = settings.get(schema.page_parser_mode,
+                            schema.page_parser_mode_tree)
+        byte_limit = settings.get(schema.page_parser_byte_limit, 2097152)
+        process_pool_size = settings.get(
+            schema.page_parser_process_pool_size, 0)
+        return PageParserSettings(mode, byte_limit, process_pool_size)
+
+    def _process_page_download_settings(self, settings) \
+            -> PageDownloadSettings:
+        """!@brief Process the optional page download settings section.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns PageDownloadSettings.
+        """
+        #pylint: disable=no-self-use
+
+        max_body_size = settings.get(schema.page_download_max_body_size,
+                                     10485760)
+        content_types = settings.get(
+            schema.page_download_allowed_content_types,
+            [MIMEType.HTML, MIMEType.XHTML])
+        chunk_size = settings.get(schema.page_download_chunk_size, 65536)
+        return PageDownloadSettings(max_body_size,
+                                    [entry.lower() for entry in content_types],
+                                    chunk_size)
+
+    def _process_dns_cache_settings(self, settings) -> DnsCacheSettings:
+        """!@brief Process the optional dns cache settings section.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns DnsCacheSettings.
+        """
+        #pylint: disable=no-self-use
+
+        enabled = settings.get(schema.dns_cache_enabled, True)
+        max_entries = settings.get(schema.dns_cache_max_entries, 10000)
+        ttl = settings.get(schema.dns_cache_ttl, 300)
+        negative_ttl = settings.get(schema.dns_cache_negative_ttl, 60)
+        return DnsCacheSettings(enabled, max_entries, ttl, negative_ttl)
+
+    def _process_robots_settings(self, settings) -> RobotsSettings:
+        """!@brief Process the optional robots settings section.
+        @param self The object pointer.
+        @param settings Raw JSON to process.
+        @returns RobotsSettings.
+        """
+        #pylint: disable=no-self-use
+
+        enabled = settings.get(schema.robots_enabled, True)
+        user_agent = settings.get(schema.robots_user_agent, 'siterummage')
+        max_hosts = settings.get(schema.robots_max_hosts, 10000)
+        ttl = settings.get(schema.robots_ttl, 86400)
+        error_ttl = settings.get(schema.robots_error_ttl, 3600)
+        fetch_timeout = settings.get(schema.robots_fetch_timeout, 10)
+        return RobotsSettings(enabled, user_agent, max_hosts, ttl, error_ttl,
+                              fetch_timeout)
@@ -24,6 +24,62 @@ class ConfigurationSchema:
     element_api = 'api settings'
     element_big_broker = 'big broker api'
     element_page_store = 'page store api'
+    element_fetch_engine = 'fetch engine'
+    element_http_pools = 'http pools'
+    element_page_parser = 'page parser'
+    element_page_download = 'page download'
+    element_dns_cache = 'dns cache'
+    element_robots = 'robots'
+
+    # -- Fetch engine sub-elements --
+    # -------------------------------
+    fetch_engine_type = 'engine'
+    fetch_engine_max_in_flight = 'max in flight'
+    fetch_engine_max_per_host = 'max per host'
+
+    # -- Http pools sub-elements --
+    # -----------------------------
+    http_pools_page_store = 'page store pool size'
+    http_pools_big_broker = 'big broker pool size'
+    http_pools_processing_queue = 'processing queue pool size'
+    http_pools_crawled_hosts_max_pools = 'crawled hosts max pools'
+    http_pools_crawled_hosts = 'crawled hosts pool size'
+
+    # -- Page parser sub-elements --
+    # ------------------------------
+    page_parser_mode = 'mode'
+    page_parser_byte_limit = 'byte limit'
+    page_parser_process_pool_size = 'process pool size'
+
+    # -- Page parser modes --
+    page_parser_mode_tree = 'tree'
+    page_parser_mode_streaming = 'streaming'
+
+    # -- Page download sub-elements --
+    # --------------------------------
+    page_download_max_body_size = 'max body size'
+    page_download_allowed_content_types = 'allowed content types'
+    page_download_chunk_size = 'chunk size'
+
+    # -- Dns cache sub-elements --
+    # ----------------------------
+    dns_cache_enabled = 'enabled'
+    dns_cache_max_entries = 'max entries'
+    dns_cache_ttl = 'ttl'
+    dns_cache_negative_ttl = 'negative ttl'
+
+    # -- Robots sub-elements --
+    # -------------------------
+    robots_enabled = 'enabled'
+    robots_user_agent = 'user agent'
+    robots_max_hosts = 'max hosts'
+    robots_ttl = 'ttl'
+    robots_error_ttl = 'error ttl'
+    robots_fetch_timeout = 'fetch timeout'
+
+    # -- Fetch engine types --
+    fetch_engine_type_sync = 'sync'
+    fetch_engine_type_async = 'async'
 
     # -- Queue sub-elements --
     # -------------------------
@@ -69,6 +125,170 @@ class ConfigurationSchema:
 
         "properties":
         {
+            element_fetch_engine:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    fetch_engine_type:
+                    {
+                        "type" : "string",
+                        "enum" : [fetch_engine_type_sync,
+                                  fetch_engine_type_async]
+                    },
+                    fetch_engine_max_in_flight:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    fetch_engine_max_per_host:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    }
+                },
+                "required" : [fetch_engine_type]
+            },
+            element_http_pools:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    http_pools_page_store:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    http_pools_big_broker:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    http_pools_processing_queue:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    http_pools_crawled_hosts_max_pools:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    http_pools_crawled_hosts:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    }
+                }
+            },
+            element_page_parser:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    page_parser_mode:
+                    {
+                        "type" : "string",
+                        "enum" : [page_parser_mode_tree,
+                                  page_parser_mode_streaming]
+                    },
+                    page_parser_byte_limit:
+                    {
+                        "type" : "integer",
+                        "minimum": 1024
+                    },
+                    page_parser_process_pool_size:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    }
+                }
+            },
+            element_page_download:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    page_download_max_body_size:
+                    {
+                        "type" : "integer",
+                        "minimum": 1024
+                    },
+                    page_download_allowed_content_types:
+                    {
+                        "type" : "array",
+                        "items": {"type" : "string"},
+                        "minItems": 1
+                    },
+                    page_download_chunk_size:
+                    {
+                        "type" : "integer",
+                        "minimum": 1024
+                    }
+                }
+            },
+            element_dns_cache:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    dns_cache_enabled:
+                    {
+                        "type" : "boolean"
+                    },
+                    dns_cache_max_entries:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    dns_cache_ttl:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    dns_cache_negative_ttl:
+                    {
+                        "type" : "integer",
+                        "minimum": 0
+                    }
+                }
+            },
+            element_robots:
+            {
+                "additionalProperties" : False,
+                "properties":
+                {
+                    robots_enabled:
+                    {
+                        "type" : "boolean"
+                    },
+                    robots_user_agent:
+                    {
+                        "type" : "string",
+                        "minLength": 1
+                    },
+                    robots_max_hosts:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_ttl:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_error_ttl:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    },
+                    robots_fetch_timeout:
+                    {
+                        "type" : "integer",
+                        "minimum": 1
+                    }
+                }
+            },
             element_page_store:
             {
                 "additionalProperties" : False,
@@ -0,0 +1,135 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import zlib
+
+try:
+    import brotli
+
+    # Only brotli 1.2 and later can limit the output of a single call, an
+    # older version could expand one chunk of a bomb without limit.
+    if not hasattr(brotli.Decompressor, 'can_accept_more_data'):
+        brotli = None
+
+except ImportError:
+    brotli = None
+
+class ContentDecoder:
+    ''' Incremental decoder for a Content-Encoding.  Each chunk of the body
+        read off the wire is decoded in pieces of at most max_length bytes,
+        so a small compressed body that expands to gigabytes (a
+        decompression bomb) never has to be held in memory before the
+        body size limit is hit. '''
+    __slots__ = ['_decompressor', '_encoding', '_header']
+
+    ## Encodings that can be decoded, brotli is only supported when the
+    ## optional brotli package (1.2 or later) is installed.
+    supported_encodings = ['gzip', 'x-gzip', 'deflate', 'identity'] + \
+        (['br'] if brotli else [])
+
+    ## Accept-Encoding header value sent with page requests.
+    accept_encoding = 'br, gzip, deflate' if brotli else 'gzip, deflate'
+
+    ## Exceptions raised by decode for corrupt data.
+    decode_errors = (zlib.error,) + ((brotli.error,) if brotli else ())
+
+    @property
+    def encoding(self) -> str:
+        """!@brief Content encoding being decoded (Getter).
+        @param self The object pointer.
+        @returns string.
+        """
+        return self._encoding
+
+    def __init__(self, encoding):
+        """!@brief ContentDecoder class constructor.
+        @param self The object pointer.
+        @param encoding Content-Encoding header value, None for identity.
+        @returns ContentDecoder instance.
+        @exception ValueError if the encoding is not supported.
+        """
+
+        self._encoding = (encoding or 'identity').strip().lower()
+        self._header = None
+
+        if self._encoding not in self.supported_encodings:
+            raise ValueError(f"Unsupported content encoding '{encoding}'")
+
+        if self._encoding in ('gzip', 'x-gzip'):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        elif self._encoding == 'deflate':
+            self._decompressor = zlib.decompressobj()
+            self._header = b''
+
+        elif self._encoding == 'br':
+            self._decompressor = brotli.Decompressor()
+
+        else:
+            self._decompressor = None
+
+    def decode(self, data, max_length):
+        """!@brief Decode the next chunk of the body.
+        @param self The object pointer.
+        @param data Bytes read off the wire.
+        @param max_length Largest piece of decoded data to produce at once.
+        @returns Generator of decoded bytes, each at most max_length long.
+        @exception zlib.error or brotli.error if the data is corrupt.
+        """
+
+        if not self._decompressor:
+            for offset in range(0, len(data), max_length):
+                yield data[offset:offset + max_length]
+            return
+
+        # Brotli stops once its output reaches max_length (it can overshoot
+        # by up to a block, so the output is split), the rest is drained
+        # with empty input.  Output short of the limit means it needs more
+        # input, unless it is still holding on to some of the input.
+        if self._encoding == 'br':
+            while True:
+                decoded = self._decompressor.process(
+                    data, output_buffer_limit=max_length)
+                data = b''
+                for offset in range(0, len(decoded), max_length):
+                    yield decoded[offset:offset + max_length]
+                if len(decoded) < max_length and \
+                   self._decompressor.can_accept_more_data():
+                    break
+            return
+
+        # Servers are inconsistent about 'deflate', some send a zlib stream
+        # as the RFC says and others send a raw deflate stream.  The two byte
+        # zlib header decides which, so input is held back until both bytes
+        # have been read.
+        if self._header is not None:
+            data = self._header + data
+            if len(data) < 2:
+                self._header = data
+                return
+            self._header = None
+            if (data[0] & 0x0F) != 8 or ((data[0] << 8) + data[1]) % 31:
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+
+        # zlib can take all of the input and still be holding output past
+        # max_length, it is only done once the output falls short.
+        while True:
+            decoded = self._decompressor.decompress(data, max_length)
+            data = self._decompressor.unconsumed_tail
+            if decoded:
+                yield decoded
+            if not data and len(decoded) < max_length:
+                break
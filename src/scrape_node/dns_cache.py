@@ -0,0 +1,165 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+from collections import OrderedDict
+import socket
+import threading
+import time
+
+class DnsCache:
+    ''' Cache of host name lookups for the connections made to crawled hosts.
+        Addresses are kept for the ttl and failed lookups, e.g. a host that
+        does not exist, are kept for the negative ttl so a dead domain isn't
+        looked up again for each of its links.  The least recently used
+        entries are evicted once the cache is full.  The system resolver
+        does not report the ttl of a record, so fixed ttls are used. '''
+    __slots__ = ['_entries', '_hits', '_lock', '_lookup_time', '_lookups',
+                 '_max_entries', '_max_lookup_time', '_negative_hits',
+                 '_negative_ttl', '_ttl']
+
+    @property
+    def average_lookup_ms(self) -> float:
+        """!@brief Average time taken by a lookup that missed the cache
+                   (Getter).
+        @param self The object pointer.
+        @returns float milliseconds, 0.0 if there have been no lookups.
+        """
+        with self._lock:
+            if not self._lookups:
+                return 0.0
+            return self._lookup_time * 1000 / self._lookups
+
+    @property
+    def hit_rate(self) -> float:
+        """!@brief Fraction of resolves answered by the cache (Getter).
+        @param self The object pointer.
+        @returns float between 0.0 and 1.0.
+        """
+        with self._lock:
+            total = self._hits + self._lookups
+            return self._hits / total if total else 0.0
+
+    @property
+    def hits(self) -> int:
+        """!@brief Number of resolves answered by the cache, including
+                   negative hits (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._hits
+
+    @property
+    def max_lookup_ms(self) -> float:
+        """!@brief Longest time taken by a lookup (Getter).
+        @param self The object pointer.
+        @returns float milliseconds.
+        """
+        return self._max_lookup_time * 1000
+
+    @property
+    def misses(self) -> int:
+        """!@brief Number of resolves that needed a lookup (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._lookups
+
+    @property
+    def negative_hits(self) -> int:
+        """!@brief Number of resolves answered by a cached failure (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._negative_hits
+
+    @property
+    def size(self) -> int:
+        """!@brief Number of hosts in the cache (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return len(self._entries)
+
+    def __init__(self, max_entries, ttl, negative_ttl):
+        """!@brief DnsCache class constructor.
+        @param self The object pointer.
+        @param max_entries Maximum number of hosts to cache.
+        @param ttl Seconds the addresses of a host are cached for.
+        @param negative_ttl Seconds a failed lookup is cached for.
+        @returns DnsCache instance.
+        """
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._lock = threading.Lock()
+        self._lookup_time = 0.0
+        self._lookups = 0
+        self._max_entries = max_entries
+        self._max_lookup_time = 0.0
+        self._negative_hits = 0
+        self._negative_ttl = negative_ttl
+        self._ttl = ttl
+
+    def resolve(self, host, port) -> list:
+        """!@brief Resolve a host name, this can be called from any thread.
+        @param self The object pointer.
+        @param host Host name to resolve.
+        @param port Port that will be connected to.
+        @returns List of address strings in the order the resolver returned.
+        @exception socket.gaierror if the host can't be resolved.
+        """
+
+        key = host.lower()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                addresses, error = entry[1], entry[2]
+                if error:
+                    self._negative_hits += 1
+                    raise socket.gaierror(*error)
+                return addresses
+
+        addresses = []
+        error = None
+        start_time = time.monotonic()
+
+        try:
+            results = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(result[4][0] for result in results))
+
+        except socket.gaierror as ex:
+            error = ex.args
+
+        lookup_time = time.monotonic() - start_time
+
+        with self._lock:
+            self._lookups += 1
+            self._lookup_time += lookup_time
+            self._max_lookup_time = max(self._max_lookup_time, lookup_time)
+
+            expiry = start_time + (self._negative_ttl if error else self._ttl)
+            self._entries[key] = (expiry, addresses, error)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+        if error:
+            raise socket.gaierror(*error)
+
+        return addresses
@@ -24,3 +24,5 @@ class EventID(Enum):
     StoreResults = 2
     AddLinksToQueue = 3
     SendCompleteTask = 4
+    LogHttpStatistics = 5
+    MarkNotModified = 6
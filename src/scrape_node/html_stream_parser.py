@@ -0,0 +1,223 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import hashlib
+from lxml import etree
+
+class _PageMetaCollector:
+    ''' lxml parser target that keeps only the title, meta description and
+        link hrefs of a page, no element tree is built. '''
+    __slots__ = ['_in_title', 'base_href', 'description', 'has_root',
+                 'hrefs', 'title', '_title_parts', '_title_seen']
+
+    def __init__(self):
+        self._in_title = False
+        self.has_root = False
+        self._title_parts = []
+        self._title_seen = False
+        self.base_href = None
+        self.description = ''
+        self.hrefs = []
+        self.title = ''
+
+    def start(self, tag, attrib):
+        """!@brief Parser callback for the start of an element.
+        @param self The object pointer.
+        @param tag Element tag name (lower case).
+        @param attrib Element attributes.
+        @returns None.
+        """
+
+        self.has_root = True
+
+        if tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.hrefs.append(href)
+
+        elif tag == 'title' and not self._title_seen:
+            self._in_title = True
+
+        elif tag == 'meta':
+            if attrib.get('name', '').lower() == 'description' and \
+               'content' in attrib and not self.description:
+                self.description = attrib['content']
+
+        elif tag == 'base' and self.base_href is None:
+            self.base_href = attrib.get('href')
+
+    def end(self, tag):
+        """!@brief Parser callback for the end of an element.
+        @param self The object pointer.
+        @param tag Element tag name (lower case).
+        @returns None.
+        """
+
+        if tag == 'title' and self._in_title:
+            self._in_title = False
+            self._title_seen = True
+            self.title = ''.join(self._title_parts)
+
+    def data(self, data):
+        """!@brief Parser callback for text content.
+        @param self The object pointer.
+        @param data Text content.
+        @returns None.
+        """
+        if self._in_title:
+            self._title_parts.append(data)
+
+    def close(self):
+        """!@brief Parser callback for the end of the document.
+        @param self The object pointer.
+        @returns The collector instance.
+        """
+
+        # A truncated page can stop part way through the title.
+        if self._in_title:
+            self._in_title = False
+            self.title = ''.join(self._title_parts)
+        return self
+
+class HtmlStreamParser:
+    ''' Single pass parser that pulls the title, meta description and link
+        hrefs out of a page as its raw bytes are fed in.  The page is never
+        held as an element tree and parsing stops once the byte limit is
+        reached, the page hash is the MD5 of the raw bytes parsed. '''
+    __slots__ = ['_bytes_parsed', '_byte_limit', '_collector', '_hash',
+                 '_parser', '_truncated']
+
+    @property
+    def base_href(self) -> str:
+        """!@brief Href of the page <base> element (Getter).
+        @param self The object pointer.
+        @returns string or None if the page has no <base href>.
+        """
+        return self._collector.base_href
+
+    @property
+    def bytes_parsed(self) -> int:
+        """!@brief Number of raw bytes parsed (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._bytes_parsed
+
+    @property
+    def description(self) -> str:
+        """!@brief Page meta description (Getter).
+        @param self The object pointer.
+        @returns string, empty if the page has no meta description.
+        """
+        return self._collector.description
+
+    @property
+    def has_root(self) -> bool:
+        """!@brief An element was parsed flag (Getter), without one the
+                   page is not a document lxml can build a tree from.
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._collector.has_root
+
+    @property
+    def hrefs(self) -> list:
+        """!@brief Raw href of each <a> element in page order (Getter).
+        @param self The object pointer.
+        @returns list of strings.
+        """
+        return self._collector.hrefs
+
+    @property
+    def page_hash(self) -> str:
+        """!@brief MD5 hash of the raw bytes parsed (Getter).
+        @param self The object pointer.
+        @returns hex digest string.
+        """
+        return self._hash.hexdigest()
+
+    @property
+    def title(self) -> str:
+        """!@brief Page title (Getter).
+        @param self The object pointer.
+        @returns string, empty if the page has no title.
+        """
+        return self._collector.title
+
+    @property
+    def truncated(self) -> bool:
+        """!@brief Parsing stopped at the byte limit flag (Getter).
+        @param self The object pointer.
+        @returns bool.
+        """
+        return self._truncated
+
+    def __init__(self, byte_limit):
+        """!@brief Class constructor.
+        @param self The object pointer.
+        @param byte_limit Maximum number of raw bytes to parse.
+        @returns HtmlStreamParser instance.
+        """
+        self._byte_limit = byte_limit
+        self._bytes_parsed = 0
+        self._collector = _PageMetaCollector()
+        self._hash = hashlib.md5()
+        self._parser = etree.HTMLParser(target=self._collector,
+                                        remove_comments=True,
+                                        remove_pis=True)
+        self._truncated = False
+
+    def feed(self, chunk) -> bool:
+        """!@brief Parse the next chunk of raw page bytes, anything past the
+                   byte limit is discarded.
+        @param self The object pointer.
+        @param chunk Bytes to parse.
+        @returns True if more data can be parsed, False once the byte limit
+                 has been reached.
+        """
+
+        remaining = self._byte_limit - self._bytes_parsed
+        if remaining <= 0:
+            self._truncated = self._truncated or bool(chunk)
+            return False
+
+        if len(chunk) > remaining:
+            chunk = chunk[:remaining]
+            self._truncated = True
+
+        if chunk:
+            self._hash.update(chunk)
+            self._parser.feed(chunk)
+            self._bytes_parsed += len(chunk)
+
+        return self._bytes_parsed < self._byte_limit
+
+    def close(self) -> None:
+        """!@brief Finish parsing, must be called once all of the page has
+                   been fed or feed has returned False.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        # An empty document makes lxml raise rather than call the target.
+        if not self._bytes_parsed:
+            return
+
+        try:
+            self._parser.close()
+
+        except etree.XMLSyntaxError:
+            pass
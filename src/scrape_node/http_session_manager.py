@@ -0,0 +1,260 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+from enum import Enum
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, \
+                               NewConnectionError
+from configuration import DnsCacheSettings, HttpPoolSettings
+from dns_cache import DnsCache
+from transfer_statistics import TransferStatistics
+
+class HttpEndpoint(Enum):
+    ''' Enumeration of the endpoints the scrape node makes requests to '''
+
+    PageStore = 0
+    BigBroker = 1
+    ProcessingQueue = 2
+    CrawledHosts = 3
+
+class PoolStatistics:
+    ''' Connection pool hit and miss counters for an endpoint, a hit is a
+        request that reused a kept-alive connection and a miss is a request
+        that had to open a new connection. '''
+    __slots__ = ['_lock', '_misses', '_requests']
+
+    @property
+    def hits(self) -> int:
+        """!@brief Number of requests that reused a connection (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        with self._lock:
+            return max(self._requests - self._misses, 0)
+
+    @property
+    def misses(self) -> int:
+        """!@brief Number of requests that opened a new connection (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        with self._lock:
+            return self._misses
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._misses = 0
+        self._requests = 0
+
+    def record_request(self) -> None:
+        """!@brief Record a connection being taken from the pool.
+        @param self The object pointer.
+        @returns None.
+        """
+        with self._lock:
+            self._requests += 1
+
+    def record_miss(self) -> None:
+        """!@brief Record a new connection being opened.
+        @param self The object pointer.
+        @returns None.
+        """
+        with self._lock:
+            self._misses += 1
+
+class _CountingPoolMixin:
+    ''' Mixin for urllib3 connection pools that updates PoolStatistics '''
+    #pylint: disable=too-few-public-methods
+
+    statistics = None
+
+    def _get_conn(self, timeout=None):
+        self.statistics.record_request()
+        return super()._get_conn(timeout)
+
+    def _new_conn(self):
+        self.statistics.record_miss()
+        return super()._new_conn()
+
+class _CachedDnsConnectionMixin:
+    ''' Mixin for urllib3 connections that resolves the host through a
+        DnsCache, the host name is still used for SNI and certificate checks
+        as only the address connected to is swapped. '''
+    #pylint: disable=too-few-public-methods
+
+    dns_cache = None
+
+    def _new_conn(self):
+        #pylint: disable=access-member-before-definition
+        #pylint: disable=attribute-defined-outside-init
+        host = self._dns_host
+
+        try:
+            addresses = self.dns_cache.resolve(host, self.port)
+
+        except socket.gaierror as ex:
+            raise NameResolutionError(host, self, ex) from ex
+
+        last_error = None
+
+        try:
+            for address in addresses:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+
+                except (ConnectTimeoutError, NewConnectionError) as ex:
+                    last_error = ex
+
+        finally:
+            self._dns_host = host
+
+        if last_error is None:
+            raise NewConnectionError(self, f"No addresses found for '{host}'")
+
+        raise last_error
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    ''' HTTP adapter whose connection pools record hits and misses and,
+        optionally, resolve hosts through a dns cache '''
+
+    def __init__(self, statistics, dns_cache=None, **kwargs):
+        self._dns_cache = dns_cache
+        self._statistics = statistics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+
+        attrs = {'statistics': self._statistics}
+        https_attrs = dict(attrs)
+
+        if self._dns_cache:
+            conn_attrs = {'dns_cache': self._dns_cache}
+            attrs['ConnectionCls'] = type(
+                'CachedDnsHTTPConnection',
+                (_CachedDnsConnectionMixin, HTTPConnection), conn_attrs)
+            https_attrs['ConnectionCls'] = type(
+                'CachedDnsHTTPSConnection',
+                (_CachedDnsConnectionMixin, HTTPSConnection), conn_attrs)
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('CountingHTTPConnectionPool',
+                         (_CountingPoolMixin, HTTPConnectionPool), attrs),
+            'https': type('CountingHTTPSConnectionPool',
+                          (_CountingPoolMixin, HTTPSConnectionPool),
+                          https_attrs)
+        }
+
+class HttpSessionManager:
+    ''' Owner of a keep-alive requests session per endpoint, all outbound
+        http calls made by the scrape node should go through these sessions
+        so that TCP and TLS connections are reused between calls. '''
+    __slots__ = ['_dns_cache', '_sessions', '_statistics',
+                 '_transfer_statistics']
+
+    @property
+    def dns_cache(self) -> DnsCache:
+        """!@brief Dns cache used for crawled hosts (Getter).
+        @param self The object pointer.
+        @returns DnsCache or None if the cache is disabled.
+        """
+        return self._dns_cache
+
+    @property
+    def transfer_statistics(self) -> TransferStatistics:
+        """!@brief Compression statistics of the crawled pages read (Getter).
+        @param self The object pointer.
+        @returns TransferStatistics.
+        """
+        return self._transfer_statistics
+
+    def __init__(self, pool_settings : HttpPoolSettings,
+                 dns_cache_settings : DnsCacheSettings = None):
+        """!@brief HttpSessionManager class constructor.
+        @param self The object pointer.
+        @param pool_settings Connection pool sizes.
+        @param dns_cache_settings Dns cache settings, None for no cache.
+        @returns None.
+        """
+
+        self._dns_cache = None
+        if dns_cache_settings and dns_cache_settings.enabled:
+            self._dns_cache = DnsCache(dns_cache_settings.max_entries,
+                                       dns_cache_settings.ttl,
+                                       dns_cache_settings.negative_ttl)
+
+        self._sessions = {}
+        self._statistics = {}
+        self._transfer_statistics = TransferStatistics(
+            pool_settings.crawled_hosts_max_pools)
+
+        # Each service endpoint is a single host, the crawled hosts session
+        # keeps a pool for each of the most recently used hosts.
+        pools = {
+            HttpEndpoint.PageStore: (1, pool_settings.page_store_pool_size),
+            HttpEndpoint.BigBroker: (1, pool_settings.big_broker_pool_size),
+            HttpEndpoint.ProcessingQueue:
+                (1, pool_settings.processing_queue_pool_size),
+            HttpEndpoint.CrawledHosts:
+                (pool_settings.crawled_hosts_max_pools,
+                 pool_settings.crawled_hosts_pool_size)
+        }
+
+        for endpoint, (max_pools, pool_size) in pools.items():
+            # Only crawled hosts are looked up often enough to need a cache.
+            dns_cache = self._dns_cache \
+                if endpoint is HttpEndpoint.CrawledHosts else None
+
+            statistics = PoolStatistics()
+            adapter = _CountingHTTPAdapter(statistics, dns_cache,
+                                           pool_connections=max_pools,
+                                           pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+
+            self._sessions[endpoint] = session
+            self._statistics[endpoint] = statistics
+
+    def session(self, endpoint : HttpEndpoint) -> requests.Session:
+        """!@brief Get the session for an endpoint.
+        @param self The object pointer.
+        @param endpoint Endpoint the session is for.
+        @returns requests.Session.
+        """
+        return self._sessions[endpoint]
+
+    def statistics(self, endpoint : HttpEndpoint) -> PoolStatistics:
+        """!@brief Get the connection pool statistics for an endpoint.
+        @param self The object pointer.
+        @param endpoint Endpoint the statistics are for.
+        @returns PoolStatistics.
+        """
+        return self._statistics[endpoint]
+
+    def close(self) -> None:
+        """!@brief Close all of the sessions and their pooled connections.
+        @param self The object pointer.
+        @returns None.
+        """
+        for session in self._sessions.values():
+            session.close()
@@ -0,0 +1,162 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+import hashlib
+from typing import Tuple, Union
+from lxml import html, etree
+from common.url_utils import UrlUtils
+from configuration_schema import ConfigurationSchema
+from html_stream_parser import HtmlStreamParser
+from scraped_page import ScrapedPage
+from scraped_page_builder import ScrapedPageBuilder
+
+class PageParser:
+    ''' Parses the raw bytes of a page into a ScrapedPage and a list of links.
+        The parse keeps no state and only takes and returns picklable values,
+        so it can be run in a parse process as well as on a fetch thread. '''
+
+    # Size of the chunks of raw page bytes fed to the streaming parser.
+    stream_chunk_size = 65536
+
+    @staticmethod
+    def parse(content, url, mode, byte_limit, validators=(None, None)) \
+            -> Union[Tuple[ScrapedPage, list], None]:
+        """!@brief Parse a page read from a url, a page that lxml can't parse
+                   (e.g. an empty body) is a failed parse.
+        @param content Raw page bytes.
+        @param url URL the page was read from.
+        @param mode Parse mode, either 'tree' or 'streaming'.
+        @param byte_limit Maximum bytes parsed in streaming mode.
+        @param validators (ETag, Last-Modified) headers the page was served
+                          with, recorded in the ScrapedPage.
+        @returns Tuple of ScrapedPage and list of links, or None if the page
+                 could not be parsed.
+        """
+
+        try:
+            if mode == ConfigurationSchema.page_parser_mode_streaming:
+                parsed = PageParser._parse_streaming(content, url, byte_limit)
+
+            else:
+                parsed = PageParser._parse_tree(content, url)
+
+        except (etree.LxmlError, ValueError):
+            return None
+
+        if parsed is None:
+            return None
+
+        title, description, page_hash, links = parsed
+
+        url_details = UrlUtils.split_url_into_domain_and_page(url)
+        etag, last_modified = validators
+
+        page_details = ScrapedPageBuilder().set_description(description). \
+            set_domain(url_details['domain']).set_hash(page_hash). \
+            set_title(title).set_url_path(url_details['url_path']). \
+            set_etag(etag).set_last_modified(last_modified).build()
+        return page_details, links
+
+    @staticmethod
+    def _parse_tree(content, url) -> Tuple[str, str, str, list]:
+        """!@brief Parse a page by building a full element tree, the page hash
+                   is taken from the tree serialised back to html.
+        @param content Raw page bytes.
+        @param url URL the page was read from.
+        @returns Tuple of title, description, page hash and list of links.
+        """
+
+        description = ''
+        title = ''
+
+        html_tree = html.fromstring(content)
+        page_contents = etree.tostring(html_tree)
+
+        page_hash = hashlib.md5(page_contents).hexdigest()
+
+        # Get meta data for page from head, lxml only adds a head element if
+        # the page has one.
+        head = html_tree.find('head')
+        for child in head if head is not None else ():
+            if child.tag == 'title':
+                title = child.text
+
+            elif child.tag == 'meta':
+                if 'name' in child.attrib and  child.attrib['name'] == 'description':
+                    if 'content' in child.attrib:
+                        description = child.attrib['content']
+
+        base_hrefs = html_tree.xpath('//base/@href')
+        links = PageParser._extract_links_from_page(
+            html_tree.xpath('//a/@href'),
+            base_hrefs[0] if base_hrefs else None, url)
+
+        return title, description, page_hash, links
+
+    @staticmethod
+    def _parse_streaming(content, url, byte_limit) \
+            -> Union[Tuple[str, str, str, list], None]:
+        """!@brief Parse a page in a single pass without building an element
+                   tree, only the bytes up to the byte limit are parsed and
+                   the page hash is taken from those raw bytes.
+        @param content Raw page bytes.
+        @param url URL the page was read from.
+        @param byte_limit Maximum bytes to parse.
+        @returns Tuple of title, description, page hash and list of links, or
+                 None if no element was parsed, the same pages that fail to
+                 parse in tree mode.
+        """
+
+        parser = HtmlStreamParser(byte_limit)
+        chunk_size = PageParser.stream_chunk_size
+
+        for offset in range(0, len(content), chunk_size):
+            if not parser.feed(content[offset:offset+chunk_size]):
+                break
+
+        parser.close()
+
+        if not parser.has_root:
+            return None
+
+        links = PageParser._extract_links_from_page(parser.hrefs,
+                                                    parser.base_href, url)
+        return parser.title, parser.description, parser.page_hash, links
+
+    @staticmethod
+    def _extract_links_from_page(hrefs, base_href, url) -> list:
+        """!@brief Convert the hrefs of a page into a list of unique canonical
+                   urls.
+        @param hrefs Raw href of each link on the page.
+        @param base_href Href of the page <base> element or None.
+        @param url URL the page was read from.
+        @returns list of url strings.
+        """
+
+        # Relative links are resolved against the <base href> if the page
+        # has one, which itself can be relative to the page url.
+        base_url = url
+        if base_href:
+            base_url = UrlUtils.canonicalise(base_href, url) or url
+
+        # Convert all of the hrefs into canonical urls, anything that isn't a
+        # http(s) url is dropped.
+        all_links = [UrlUtils.canonicalise(link, base_url) for link in hrefs]
+
+        # Remove invalid links, duplicates and links back to the page itself.
+        all_links = dict.fromkeys(link for link in all_links if link)
+        all_links.pop(UrlUtils.canonicalise(url), None)
+        return list(all_links)
@@ -14,155 +14,419 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
-import hashlib
-from typing import Tuple
+import threading
+from typing import Tuple, Union
 import requests
-from lxml import html, etree
+import urllib3
 from common.event import Event
 from common.http_status_code import HTTPStatusCode
 from common.logger import LogType
+from common.robots_cache import RobotsCache
 from common.url_utils import UrlUtils
+from configuration_schema import ConfigurationSchema
+from content_decoder import ContentDecoder
 from event_id import EventID
+from page_parser import PageParser
 from scraped_page_builder import ScrapedPageBuilder
 
+class SkipReason:
+    ''' Reasons recorded in the task results for a page not being scraped '''
+    #pylint: disable=too-few-public-methods
+
+    # The host's robots.txt doesn't allow the page to be crawled.
+    RobotsDisallowed = 'robots disallowed'
+
+    # The page could not be requested or the request failed part way.
+    Unreachable = 'unreachable'
+
+    # The page returned a status code other than 200 (OK).
+    HttpStatus = 'http status'
+
+    # The page is not one of the allowed content types.
+    ContentType = 'content type'
+
+    # The page body is larger than the maximum body size, once decoded.
+    BodyTooLarge = 'body too large'
+
+    # The page uses a Content-Encoding that can't be decoded or is corrupt.
+    ContentEncoding = 'content encoding'
+
+    # The page could not be parsed.
+    ParseFailed = 'parse failed'
+
+    # The scrape failed with an unexpected error.
+    ScrapeFailed = 'scrape failed'
+
+    # A rescan found the page unchanged since the last scan (304).
+    NotModified = 'not modified'
+
 class PageScraper:
-    ''' Class that emcompasses getting a page and scraping it '''
+    ''' Class that emcompasses getting a page and scraping it.  A scrape
+        keeps no state on the instance other than the in-flight url list, so
+        scrape_page can be called from several fetch threads at once. '''
     #pylint: disable=too-few-public-methods
-    __slots__ = ['_event_manager', '_logger', '_page_builder',
-                 '_scrape_successful', '_task_type', '_task_id',
-                 '_url_being_processed', '_user_agent']
+    __slots__ = ['_buffers', '_download_settings', '_event_manager',
+                 '_http_session', '_in_flight_lock', '_logger', '_parse_pool',
+                 '_parser_settings', '_robots_cache', '_robots_timeout',
+                 '_request_headers', '_transfer_statistics',
+                 '_urls_being_processed']
+
+    # Hash recorded for a page a rescan found to be unchanged.
+    not_modified_hash = '0X0304'
+
+    @property
+    def robots_cache(self) -> RobotsCache:
+        """!@brief Cache of the robots.txt rules of crawled hosts (Getter).
+        @param self The object pointer.
+        @returns RobotsCache or None if robots.txt isn't checked.
+        """
+        return self._robots_cache
 
     @property
     def url_being_processed(self) -> str:
-        """!@brief Url being processed (Getter).
+        """!@brief Most recent url still being processed (Getter).
         @param self The object pointer.
-        @returns boolean if connected or not.
+        @returns url string or None if no url is being processed.
         """
-        return self._url_being_processed
+        with self._in_flight_lock:
+            if not self._urls_being_processed:
+                return None
+            return self._urls_being_processed[-1]
 
     @property
-    def was_scrape_successful(self) -> bool:
-        """!@brief Was scrape successful flag (Getter).
+    def urls_being_processed(self) -> list:
+        """!@brief All urls currently being processed (Getter).
         @param self The object pointer.
-        @returns boolean to indicate if scrape was successful.
+        @returns list of url strings.
         """
-        return self._scrape_successful
+        with self._in_flight_lock:
+            return list(self._urls_being_processed)
 
-    def __init__(self, logger, event_manager):
+    def __init__(self, logger, event_manager, http_session, parser_settings,
+                 download_settings, parse_pool=None, transfer_statistics=None,
+                 robots_settings=None):
+        #pylint: disable=too-many-arguments
+        self._buffers = threading.local()
+        self._download_settings = download_settings
         self._event_manager = event_manager
+        self._http_session = http_session
         self._logger = logger
-        self._page_builder = ScrapedPageBuilder()
-        self._user_agent = {'User-agent': 'Mozilla/5.0'}
-        self._url_being_processed = None
-        self._scrape_successful = False
-        self._task_type = None
-        self._task_id = None
-
-    def scrape_page(self, url, task_type, task_id) -> Tuple[list, dict]:
+        self._parse_pool = parse_pool
+        self._parser_settings = parser_settings
+        self._transfer_statistics = transfer_statistics
+        self._request_headers = {'User-agent': 'Mozilla/5.0',
+                            'Accept-Encoding': ContentDecoder.accept_encoding}
+        self._urls_being_processed = []
+        self._in_flight_lock = threading.Lock()
+
+        self._robots_cache = None
+        self._robots_timeout = None
+        if robots_settings and robots_settings.enabled:
+            self._robots_timeout = robots_settings.fetch_timeout
+            self._robots_cache = RobotsCache(
+                self._fetch_robots, robots_settings.user_agent,
+                robots_settings.max_hosts, robots_settings.ttl,
+                robots_settings.error_ttl)
+
+    def scrape_page(self, url, task_type, task_id, etag=None,
+                    last_modified=None) -> Tuple[list, dict]:
         """!@brief Take a url and attempt to scrape meta data and links from it.
+                   A rescan with cache validators from the previous scan is a
+                   conditional request, if the page is unchanged the results
+                   only record that it was not modified.
         @param self The object pointer.
         @param url URL to read.
-        @returns None.
+        @param task_type Type of task (e.g. New or Rescan).
+        @param task_id Unique identifier of the task.
+        @param etag Optional ETag from the previous scan.
+        @param last_modified Optional Last-Modified from the previous scan.
+        @returns Tuple of list of links and the results dictionary.
         """
-        #pylint: disable=too-many-locals
+        #pylint: disable=too-many-arguments
+
+        headers = self._request_headers
+        if task_type == 'Rescan' and (etag or last_modified):
+            headers = dict(self._request_headers)
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        with self._in_flight_lock:
+            self._urls_being_processed.append(url)
 
-        self._url_being_processed = url
-        self._task_type = task_type
-        self._task_id = task_id
-        self._scrape_successful = False
+        try:
+            links, results = self._scrape(url, task_id, headers)
+
+        # The task still needs a result, without one it would be lost.
+        except Exception as ex:
+            #pylint: disable=broad-except
+            self._logger.log(LogType.Error,
+                             f"Scrape of url '{url}' failed, reason: {ex}")
+            links, results = [], self.failed_results(url, task_id,
+                                                     SkipReason.ScrapeFailed)
+
+        finally:
+            with self._in_flight_lock:
+                self._urls_being_processed.remove(url)
+
+        return links, results
+
+    def failed_results(self, url, task_id, skip_reason) -> dict:
+        """!@brief Generate the results of a scrape that failed.
+        @param self The object pointer.
+        @param url URL that was being scraped.
+        @param task_id Unique identifier of the task.
+        @param skip_reason Reason the scrape failed, a SkipReason.
+        @returns Results dictionary.
+        """
+        url_details = UrlUtils.split_url_into_domain_and_page(url)
+        return self._generate_failed_results(url_details, skip_reason,
+                                             task_id)
 
-        description = ''
-        title = ''
+    def _scrape(self, url, task_id, headers) -> Tuple[list, dict]:
+        """!@brief Read a url and scrape meta data and links from it.
+        @param self The object pointer.
+        @param url URL to read.
+        @param task_id Unique identifier of the task.
+        @param headers Request headers.
+        @returns Tuple of list of links and the results dictionary.
+        """
 
         url_details = UrlUtils.split_url_into_domain_and_page(url)
 
-        self._page_builder.reset()
+        if self._robots_cache and not self._robots_cache.is_allowed(url):
+            self._logger.log(LogType.Info,
+                             f"URL '{url}' disallowed by robots.txt")
+            return [], self._generate_failed_results(
+                url_details, SkipReason.RobotsDisallowed, task_id)
 
-        page = self._read_page(url)
-        if not page:
-            self._url_being_processed = None
+        content, skip_reason, validators = self._read_page(url, headers)
 
-            self._logger.log(LogType.Info, f"URL '{url}' is unreachable")
-            page_details = self._page_builder.set_hash('0X0DEAD').\
-                set_domain(url_details['domain']).\
+        if skip_reason == SkipReason.NotModified:
+            self._logger.log(LogType.Info, f"URL '{url}' not modified")
+
+            # The results only go to the broker, the page store is told that
+            # the page was scanned so its last scanned time is updated.
+            self._event_manager.queue_event(
+                Event(EventID.MarkNotModified, url_details))
+
+            page_details = ScrapedPageBuilder(). \
+                set_hash(self.not_modified_hash). \
+                set_domain(url_details['domain']). \
                 set_url_path(url_details['url_path']).build()
-            return [], self._generate_results(page_details, False, task_id)
+            return [], self._generate_results(page_details, True, task_id,
+                                              skip_reason)
+
+        if skip_reason:
+            self._logger.log(LogType.Info,
+                             f"URL '{url}' skipped, reason: {skip_reason}")
+            return [], self._generate_failed_results(url_details, skip_reason,
+                                                     task_id)
 
-        html_tree = html.fromstring(page.content)
-        page_contents = etree.tostring(html_tree)
+        mode = self._parser_settings.mode
+        byte_limit = self._parser_settings.byte_limit
 
-        page_hash = hashlib.md5(page_contents).hexdigest()
+        if self._parse_pool:
+            parsed = self._parse_pool.parse(content, url, mode, byte_limit,
+                                            validators)
+        else:
+            parsed = PageParser.parse(content, url, mode, byte_limit,
+                                      validators)
 
-        # Get meta data for page from head.
-        for child in html_tree.head:
-            if child.tag == 'title':
-                title = child.text
+        if not parsed:
+            return [], self._generate_failed_results(
+                url_details, SkipReason.ParseFailed, task_id)
 
-            elif child.tag == 'meta':
-                if 'name' in child.attrib and  child.attrib['name'] == 'description':
-                    if 'content' in child.attrib:
-                        description = child.attrib['content']
+        page_details, links = parsed
 
         self._logger.log(LogType.Info, '----- Scraped Page Information -----')
-        self._logger.log(LogType.Info, f'Title:       {title}')
-        self._logger.log(LogType.Info, f'Description: {description}')
-        self._logger.log(LogType.Info, f"MD5 Hash:    {page_hash}")
+        self._logger.log(LogType.Info, f'Title:       {page_details.title}')
+        self._logger.log(LogType.Info,
+                         f'Description: {page_details.description}')
+        self._logger.log(LogType.Info, f"MD5 Hash:    {page_details.page_hash}")
         self._logger.log(LogType.Info, f"Domain:      {url_details['domain']}")
         self._logger.log(LogType.Info, f"url path:    {url_details['url_path']}")
-
-        links = self._extract_links_from_page(html_tree)
         self._logger.log(LogType.Info, f'Total links: {len(links)}')
         self._logger.log(LogType.Info, '------------------------------------')
 
-        self._url_being_processed = None
-
-        page_details = self._page_builder.set_description(description). \
-            set_domain(url_details['domain']).set_hash(page_hash). \
-            set_title(title).set_url_path(url_details['url_path']).build()
         return links, self._generate_results(page_details, True, task_id)
 
-    def _read_page(self, url) -> requests.models.Response:
-        """!@brief Attempt to read a webpage by making a get on the page, on a
-                   successful read a response is returned, otherwise None is.
+    def _read_page(self, url, headers) -> Tuple[Union[bytes, None],
+                                                Union[str, None], tuple]:
+        """!@brief Attempt to read a webpage by streaming its body in chunks,
+                   the read is abandoned as soon as the page is found to not
+                   be an allowed content type or to be too large.  In
+                   streaming parse mode the read stops once the parser byte
+                   limit has been read, as the rest would not be parsed.
         @param self The object pointer.
         @param url URL to read.
-        @returns Response is returned on successful, otherwise None is.
+        @param headers Request headers.
+        @returns Tuple of the page body, None and the (ETag, Last-Modified)
+                 response headers on success, otherwise None, the reason the
+                 page was skipped and (None, None).
+        """
+
+        settings = self._download_settings
+        no_validators = (None, None)
+
+        try:
+            page = self._http_session.get(url, headers = headers,
+            timeout=(2, 2), stream=True)
+
+        except requests.exceptions.RequestException:
+            return None, SkipReason.Unreachable, no_validators
+
+        # Closing a response that hasn't been read to the end drops the
+        # connection rather than returning it to the pool part read.
+        with page:
+            if page.status_code == HTTPStatusCode.NotModified:
+                return None, SkipReason.NotModified, no_validators
+
+            if page.status_code != HTTPStatusCode.OK:
+                self._logger.log(LogType.Debug,
+                                 f"URL '{url}' returned status code " + \
+                                 f'{page.status_code}')
+                return None, SkipReason.HttpStatus, no_validators
+
+            content_type = page.headers.get('Content-Type')
+            if content_type is not None:
+                content_type = content_type.split(';')[0].strip().lower()
+                if content_type not in settings.allowed_content_types:
+                    return None, SkipReason.ContentType, no_validators
+
+            content_length = page.headers.get('Content-Length', '')
+            if content_length.isdigit() and \
+               int(content_length) > settings.max_body_size:
+                return None, SkipReason.BodyTooLarge, no_validators
+
+            try:
+                decoder = ContentDecoder(page.headers.get('Content-Encoding'))
+
+            except ValueError:
+                return None, SkipReason.ContentEncoding, no_validators
+
+            read_limit = None
+            if self._parser_settings.mode == \
+               ConfigurationSchema.page_parser_mode_streaming:
+                read_limit = self._parser_settings.byte_limit
+
+            try:
+                content, skip_reason = self._read_body(
+                    page, decoder, read_limit, UrlUtils.get_host(url))
+
+            except (requests.exceptions.RequestException,
+                    urllib3.exceptions.HTTPError):
+                return None, SkipReason.Unreachable, no_validators
+
+            validators = (page.headers.get('ETag'),
+                          page.headers.get('Last-Modified'))
+            return content, skip_reason, validators
+
+    def _read_body(self, page, decoder, read_limit, host) \
+            -> Tuple[Union[bytes, None], Union[str, None]]:
+        """!@brief Read the body of a page into the buffer of the calling
+                   thread, the buffer is kept between reads so it only has to
+                   grow to the size of the largest page read.  The body is
+                   read off the wire as sent and decoded a piece at a time,
+                   so the body size limit applies to the decoded size before
+                   more than a piece of it is held in memory.
+        @param self The object pointer.
+        @param page Streamed response to read the body of.
+        @param decoder ContentDecoder for the body's Content-Encoding.
+        @param read_limit Stop reading once this many decoded bytes have been
+                          read, None to read the whole body.
+        @param host Host the page is read from, for the transfer statistics.
+        @returns Tuple of the page body and None on success, otherwise None
+                 and the reason the page was skipped.
         """
+        #pylint: disable=too-many-locals
+
+        settings = self._download_settings
+
+        buffer = getattr(self._buffers, 'buffer', None)
+        if buffer is None:
+            buffer = bytearray(settings.chunk_size)
+            self._buffers.buffer = buffer
+
+        length = 0
+        wire_bytes = 0
 
         try:
-            page = requests.get(url, headers = self._user_agent,
-            timeout=(2, 2))
+            for wire_chunk in page.raw.stream(settings.chunk_size,
+                                              decode_content=False):
+                wire_bytes += len(wire_chunk)
+
+                for chunk in decoder.decode(wire_chunk, settings.chunk_size):
+                    end = length + len(chunk)
+
+                    if read_limit is not None and end >= read_limit:
+                        chunk = chunk[:read_limit - length]
+                        end = read_limit
+
+                    if end > settings.max_body_size:
+                        return None, SkipReason.BodyTooLarge
 
-        except requests.exceptions.ConnectionError:
-            return None
+                    if end > len(buffer):
+                        buffer.extend(bytes(max(end, len(buffer) * 2) -
+                                            len(buffer)))
 
-        if page.status_code != HTTPStatusCode.OK:
-            print(f"URL '{url} returned status code {page.status_code}")
-            return None
+                    buffer[length:end] = chunk
+                    length = end
 
-        return page
+                    if length == read_limit:
+                        break
+
+                if length == read_limit:
+                    break
+
+        except ContentDecoder.decode_errors:
+            return None, SkipReason.ContentEncoding
+
+        finally:
+            if self._transfer_statistics:
+                self._transfer_statistics.record(host, wire_bytes, length)
+
+        with memoryview(buffer) as view:
+            return bytes(view[:length]), None
+
+    def _fetch_robots(self, robots_url) -> Tuple[int, bytes]:
+        """!@brief Read a robots.txt file for the robots cache, at most the
+                   maximum robots.txt size is read.
+        @param self The object pointer.
+        @param robots_url Url of the robots.txt file.
+        @returns Tuple of http status code and body.
+        """
 
-    def _extract_links_from_page(self, html_tree):
-        #pylint: disable=no-self-use
+        body = bytearray()
 
-        # Extract all of the hrefs from the webpage.
-        all_links = list(html_tree.xpath('//a/@href'))
+        with self._http_session.get(robots_url, headers=self._request_headers,
+                                    timeout=self._robots_timeout,
+                                    stream=True) as response:
+            if response.status_code == HTTPStatusCode.OK:
+                for chunk in response.iter_content(
+                        self._download_settings.chunk_size):
+                    body += chunk
+                    if len(body) >= RobotsCache.max_size:
+                        break
 
-        # Remove duplicates.
-        all_links = list(dict.fromkeys(all_links))
+            return response.status_code, bytes(body)
 
-        # Remove interal links and other invalid paths.
-        all_links = [link for link in all_links if len(link)]
-        all_links = [link for link in all_links if link[0] != '#' and link[0] != '/']
-        return all_links
+    def _generate_failed_results(self, url_details, skip_reason, task_id):
+        page_details = ScrapedPageBuilder().set_hash('0X0DEAD').\
+            set_domain(url_details['domain']).\
+            set_url_path(url_details['url_path']).build()
+        return self._generate_results(page_details, False, task_id,
+                                      skip_reason)
 
     ##def results = self._generate_results(page_details, False, task_id)
-    def _generate_results(self, details, success, task_id):
+    def _generate_results(self, details, success, task_id, skip_reason=None):
         #pylint: disable=too-many-arguments
 
         send_event_body = {
             'details': details.build_json(),
             'success': success,
+            'skip_reason': skip_reason,
             'task_id': task_id
         }
 
@@ -0,0 +1,97 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+from typing import Tuple, Union
+from common.logger import Logger, LogType
+from page_parser import PageParser
+
+class ParsePool:
+    ''' Pool of processes that pages are parsed in, so parsing can use all of
+        the cores of a node and does not hold the GIL needed by the fetch and
+        messaging threads.  parse can be called from several threads at
+        once, each caller blocks until its page has been parsed. '''
+    __slots__ = ['_executor', '_lock', '_logger', '_pool_size']
+
+    @property
+    def pool_size(self) -> int:
+        """!@brief Number of parse processes (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._pool_size
+
+    def __init__(self, pool_size : int, logger : Logger) -> None:
+        """!@brief ParsePool class constructor.
+        @param self The object pointer.
+        @param pool_size Number of parse processes.
+        @param logger Instance of the logging wrapper class.
+        @returns None.
+        """
+        self._pool_size = pool_size
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+
+    def parse(self, content, url, mode, byte_limit, validators=(None, None)) \
+            -> Union[Tuple[object, list], None]:
+        """!@brief Parse a page in one of the parse processes.
+        @param self The object pointer.
+        @param content Raw page bytes.
+        @param url URL the page was read from.
+        @param mode Parse mode, either 'tree' or 'streaming'.
+        @param byte_limit Maximum bytes parsed in streaming mode.
+        @param validators (ETag, Last-Modified) headers the page was served
+                          with.
+        @returns Tuple of ScrapedPage and list of links, or None if the page
+                 could not be parsed or the parse process died.
+        """
+        #pylint: disable=too-many-arguments
+
+        executor = self._executor
+
+        try:
+            return executor.submit(PageParser.parse, content, url, mode,
+                                   byte_limit, validators).result()
+
+        except BrokenProcessPool:
+            # A parse process that dies breaks the whole pool, replace it so
+            # that only the pages in flight at the time are lost.
+            with self._lock:
+                if self._executor is executor:
+                    self._logger.log(LogType.Error,
+                                     'Parse pool | Parse process died ' + \
+                                     f"parsing '{url}', restarting pool")
+                    executor.shutdown(wait=False)
+                    self._executor = self._create_executor()
+            return None
+
+    def shutdown(self) -> None:
+        """!@brief Stop the parse processes, pages being parsed are abandoned.
+        @param self The object pointer.
+        @returns None.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Parse processes are spawned rather than forked, forking whilst the
+        # messaging and fetch threads hold locks can deadlock the child.
+        return ProcessPoolExecutor(
+            max_workers=self._pool_size,
+            mp_context=multiprocessing.get_context('spawn'))
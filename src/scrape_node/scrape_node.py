@@ -20,19 +20,22 @@ import sys
 sys.path.insert(0, '.')
 from scrape_node_app import ScrapeNodeApp
 
-app = ScrapeNodeApp()
+# Parse processes are spawned and import this module, so only start the
+# application when it is run as the main program.
+if __name__ == '__main__':
+    app = ScrapeNodeApp()
 
-if not os.getenv('SITERUMMAGE_SCRAPENODE_CONFIG'):
-    print('[ERROR] SITERUMMAGE_SCRAPENODE_CONFIG environment variable is' + \
-                      ' not defined!')
-    sys.exit(1)
+    if not os.getenv('SITERUMMAGE_SCRAPENODE_CONFIG'):
+        print('[ERROR] SITERUMMAGE_SCRAPENODE_CONFIG environment variable is' + \
+                          ' not defined!')
+        sys.exit(1)
 
-if not os.getenv('SITERUMMAGE_SCRAPENODE_MESSAGING_CONFIG'):
-    print('[ERROR] SITERUMMAGE_SCRAPENODE_MESSAGING_CONFIG environment' + \
-                      ' variable is not defined!')
-    sys.exit(1)
+    if not os.getenv('SITERUMMAGE_SCRAPENODE_MESSAGING_CONFIG'):
+        print('[ERROR] SITERUMMAGE_SCRAPENODE_MESSAGING_CONFIG environment' + \
+                          ' variable is not defined!')
+        sys.exit(1)
 
-if not app.initialise():
-    sys.exit()
+    if not app.initialise():
+        sys.exit()
 
-app.start()
+    app.start()
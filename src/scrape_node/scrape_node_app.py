@@ -31,21 +31,35 @@ from common.message_queue_config_mananger import MessagingQueueConfigManager
 from common.messaging_queue_settings import MessagingQueueSettings, QueueEntry
 from common.mime_type import MIMEType
 from common.info import BUILD_NO, COPYRIGHT_TEXT, CORE_VERSION, LICENSE_TEXT
+from async_fetch_engine import AsyncFetchEngine
 from configuration_manager import ConfigurationManager
+from configuration_schema import ConfigurationSchema
 from event_id import EventID
-from page_scraper import PageScraper
+from http_session_manager import HttpEndpoint, HttpSessionManager
+from page_scraper import PageScraper, SkipReason
+from parse_pool import ParsePool
 from scrape_node.worker_thread import WorkerThread
 
 class ScrapeNodeApp:
     ''' Entrypoint wrapper class for the scrape node application '''
     __slots__ = ['_configuration', '_crypto_utils', '_event_manager',
-                 '_is_initialised', '_logger', '_messaging_config',
-                 '_page_scraper', '_public_key',
+                 '_fetch_engine', '_http_sessions', '_is_initialised',
+                 '_logger', '_messaging_config', '_page_scraper',
+                 '_parse_pool', '_public_key',
                  '_worker_thread', '_worker_thread_run_flag']
 
     ## Title text logged during initialisation.
     title_text = 'Site Rummagge Scrape Node'
 
+    ## Interval between logging http connection pool statistics (ms).
+    http_statistics_interval = 300000
+
+    ## Number of hosts logged with the page transfer statistics.
+    transfer_statistics_top_hosts = 10
+
+    ## Longest time the main loop blocks waiting for an event (seconds).
+    max_event_wait = 1.0
+
     @property
     def is_initialised(self) -> bool:
         """!@brief is_initialised property (getter).
@@ -67,11 +81,15 @@ class ScrapeNodeApp:
 
         self._public_key = ''
         self._event_manager = EventManager()
-        self._page_scraper = PageScraper(self._logger, self._event_manager)
+        self._page_scraper = None
+        self._parse_pool = None
+        self._http_sessions = None
         self._configuration = None
         self._messaging_config = None
         self._crypto_utils = None
+        self._fetch_engine = None
         self._worker_thread = None
+        self._node_id = None
 
     def start(self) -> None:
         """!@brief ** Overridable 'run' function **
@@ -85,8 +103,8 @@ class ScrapeNodeApp:
 
         try:
             while True:
+                self._event_manager.wait_for_event(self.max_event_wait)
                 self._main_loop()
-                time.sleep(0.1)
 
         except KeyboardInterrupt:
             pass
@@ -145,8 +163,68 @@ class ScrapeNodeApp:
                          f'+= Public Key File  : {conf.public_key_file}')
         self._logger.log(LogType.Info,
                           '+= Auth Key         : ***')
+        conf = self._configuration.fetch_engine
+        self._logger.log(LogType.Info, '+== Fetch Engine Settings :->')
+        self._logger.log(LogType.Info, f'+= Engine        : {conf.engine}')
+        self._logger.log(LogType.Info,
+                         f'+= Max In Flight : {conf.max_in_flight}')
+        self._logger.log(LogType.Info,
+                         f'+= Max Per Host  : {conf.max_per_host}')
+        conf = self._configuration.http_pools
+        self._logger.log(LogType.Info, '+== Http Pool Settings :->')
+        self._logger.log(LogType.Info,
+                         f'+= Page Store       : {conf.page_store_pool_size}')
+        self._logger.log(LogType.Info,
+                         f'+= Big Broker       : {conf.big_broker_pool_size}')
+        self._logger.log(LogType.Info, '+= Processing Queue : ' + \
+                         f'{conf.processing_queue_pool_size}')
+        self._logger.log(LogType.Info, '+= Crawled Hosts    : ' + \
+                         f'{conf.crawled_hosts_max_pools} hosts of ' + \
+                         f'{conf.crawled_hosts_pool_size}')
+        conf = self._configuration.page_parser
+        self._logger.log(LogType.Info, '+== Page Parser Settings :->')
+        self._logger.log(LogType.Info, f'+= Mode       : {conf.mode}')
+        self._logger.log(LogType.Info, f'+= Byte Limit : {conf.byte_limit}')
+        self._logger.log(LogType.Info,
+                         f'+= Processes  : {conf.process_pool_size}')
+        conf = self._configuration.page_download
+        self._logger.log(LogType.Info, '+== Page Download Settings :->')
+        self._logger.log(LogType.Info,
+                         f'+= Max Body Size : {conf.max_body_size}')
+        self._logger.log(LogType.Info, '+= Content Types : ' + \
+                         ', '.join(conf.allowed_content_types))
+        self._logger.log(LogType.Info, f'+= Chunk Size    : {conf.chunk_size}')
+        conf = self._configuration.dns_cache
+        self._logger.log(LogType.Info, '+== Dns Cache Settings :->')
+        self._logger.log(LogType.Info, f'+= Enabled      : {conf.enabled}')
+        self._logger.log(LogType.Info, f'+= Max Entries  : {conf.max_entries}')
+        self._logger.log(LogType.Info, f'+= TTL          : {conf.ttl}')
+        self._logger.log(LogType.Info, f'+= Negative TTL : {conf.negative_ttl}')
+        conf = self._configuration.robots
+        self._logger.log(LogType.Info, '+== Robots Settings :->')
+        self._logger.log(LogType.Info, f'+= Enabled       : {conf.enabled}')
+        self._logger.log(LogType.Info, f'+= User Agent    : {conf.user_agent}')
+        self._logger.log(LogType.Info, f'+= Max Hosts     : {conf.max_hosts}')
+        self._logger.log(LogType.Info, f'+= TTL           : {conf.ttl}')
+        self._logger.log(LogType.Info, f'+= Error TTL     : {conf.error_ttl}')
+        self._logger.log(LogType.Info,
+                         f'+= Fetch Timeout : {conf.fetch_timeout}')
         self._logger.log(LogType.Info, '+==============================+')
 
+        parser_settings = self._configuration.page_parser
+        if parser_settings.process_pool_size:
+            self._parse_pool = ParsePool(parser_settings.process_pool_size,
+                                         self._logger)
+
+        self._http_sessions = HttpSessionManager(
+            self._configuration.http_pools, self._configuration.dns_cache)
+        self._page_scraper = PageScraper(
+            self._logger, self._event_manager,
+            self._http_sessions.session(HttpEndpoint.CrawledHosts),
+            parser_settings, self._configuration.page_download,
+            self._parse_pool, self._http_sessions.transfer_statistics,
+            self._configuration.robots)
+
         self._crypto_utils = CryptoUtils()
 
         public_key = self._configuration.api_settings.public_key_file
@@ -206,6 +284,16 @@ class ScrapeNodeApp:
             consumer_settings.queue.is_durable
         settings.queue_consumer_definition.queue.name = \
             consumer_settings.queue.name
+        settings.queue_consumer_definition.prefetch_count = \
+            consumer_settings.prefetch_count
+        settings.queue_consumer_definition.worker_threads = \
+            consumer_settings.worker_threads
+
+        settings.publishing_queues.batch_size = producers_settings.batch_size
+        settings.publishing_queues.batch_interval = \
+            producers_settings.batch_interval
+        settings.publishing_queues.publisher_confirms = \
+            producers_settings.publisher_confirms
 
         for producer in producers_settings.queues:
             entry = QueueEntry()
@@ -213,8 +301,18 @@ class ScrapeNodeApp:
             entry.is_durable = producer.is_durable
             settings.publishing_queues.add_queue(entry)
 
+        fetch_settings = self._configuration.fetch_engine
+        if fetch_settings.engine == ConfigurationSchema.fetch_engine_type_async:
+            self._fetch_engine = AsyncFetchEngine(self._page_scraper,
+                                                  self._logger,
+                                                  fetch_settings.max_in_flight,
+                                                  fetch_settings.max_per_host)
+            self._fetch_engine.start()
+
         self._worker_thread = WorkerThread(settings, self._logger,
-                                           self._page_scraper)
+                                           self._page_scraper,
+                                           self._fetch_engine,
+                                           self._node_id)
         self._worker_thread.start()
 
     def _main_loop(self) -> None:
@@ -237,6 +335,18 @@ class ScrapeNodeApp:
             self._worker_thread.stop()
             self._worker_thread.join()
 
+        if self._fetch_engine:
+            self._logger.log(LogType.Info, '=> Stopping fetch engine...')
+            self._fetch_engine.stop()
+
+        if self._parse_pool:
+            self._logger.log(LogType.Info, '=> Stopping parse pool...')
+            self._parse_pool.shutdown()
+
+        if self._http_sessions:
+            self._log_http_statistics()
+            self._http_sessions.close()
+
         self._logger.log(LogType.Info, 'Shutdown cleanup complete...')
 
     def _register_with_big_broken(self) -> Tuple[bool, str]:
@@ -254,8 +364,11 @@ class ScrapeNodeApp:
             'Content-type': MIMEType.JSON
         }
 
-        ident_raw = str(uuid.uuid1())
-        identifier = self._crypto_utils.encrypt(ident_raw, encode_base64=True)
+        # The identifier the node registers with also identifies it in the
+        # task started messages it sends.
+        self._node_id = str(uuid.uuid1())
+        identifier = self._crypto_utils.encrypt(self._node_id,
+                                                encode_base64=True)
 
         body = { "identifier": identifier }
 
@@ -267,8 +380,9 @@ class ScrapeNodeApp:
         while response is None:
 
             try:
-                response = requests.post(url, data=json.dumps(body),
-                                         headers=headers)
+                session = self._http_sessions.session(HttpEndpoint.BigBroker)
+                response = session.post(url, data=json.dumps(body),
+                                        headers=headers)
 
             except requests.exceptions.RequestException:
                 time.sleep(1)
@@ -323,6 +437,17 @@ class ScrapeNodeApp:
         self._event_manager.register_event(EventID.SendCompleteTask,
                                            self._send_complete_task)
 
+        # Event: Mark a page that was not modified as scanned.
+        self._event_manager.register_event(EventID.MarkNotModified,
+                                           self._mark_not_modified)
+
+        # Event: Log http connection pool statistics.
+        self._event_manager.register_event(EventID.LogHttpStatistics,
+                                           self._handle_log_http_statistics)
+        self._event_manager.queue_event(
+            Event(EventID.LogHttpStatistics,
+                  trigger_time=self.http_statistics_interval))
+
         # ==============================
         # == Register callback events ==
         # ==============================
@@ -335,6 +460,59 @@ class ScrapeNodeApp:
         #pylint: disable=unused-argument
         return self._page_scraper.url_being_processed
 
+    def _handle_log_http_statistics(self, event):
+        self._log_http_statistics()
+        event.trigger_time = self.http_statistics_interval
+        self._event_manager.queue_event(event)
+
+    def _log_http_statistics(self) -> None:
+        """!@brief Log the hits and misses of each http connection pool, the
+                   dns and robots caches and the compression statistics of the
+                   pages read.
+        @param self The object pointer.
+        @returns None.
+        """
+
+        self._logger.log(LogType.Info, 'Http connection pool statistics :->')
+        for endpoint in HttpEndpoint:
+            stats = self._http_sessions.statistics(endpoint)
+            self._logger.log(LogType.Info, f'+= {endpoint.name} : ' + \
+                             f'{stats.hits} hits, {stats.misses} misses')
+
+        dns_cache = self._http_sessions.dns_cache
+        if dns_cache:
+            self._logger.log(LogType.Info, 'Dns cache statistics : ' + \
+                f'{dns_cache.hits} hits ({dns_cache.negative_hits} ' + \
+                f'negative), {dns_cache.misses} misses, hit rate ' + \
+                f'{dns_cache.hit_rate:.2f}, lookups ' + \
+                f'{dns_cache.average_lookup_ms:.1f}ms average ' + \
+                f'{dns_cache.max_lookup_ms:.1f}ms max, ' + \
+                f'{dns_cache.size} hosts cached')
+
+        robots_cache = self._page_scraper.robots_cache
+        if robots_cache:
+            self._logger.log(LogType.Info, 'Robots cache statistics : ' + \
+                f'{robots_cache.hits} hits, {robots_cache.misses} misses, ' + \
+                f'{robots_cache.fetch_errors} fetch errors, ' + \
+                f'{robots_cache.size} hosts cached')
+
+        transfer_statistics = self._http_sessions.transfer_statistics
+        totals = transfer_statistics.totals
+        self._logger.log(LogType.Info, 'Page transfer statistics :->')
+        self._logger.log(LogType.Info,
+                         f'+= All hosts : {totals.pages} pages, ' + \
+                         f'{totals.wire_bytes} bytes read, ' + \
+                         f'{totals.decoded_bytes} bytes decoded, ' + \
+                         f'{totals.bytes_saved} bytes saved ' + \
+                         f'(ratio {totals.compression_ratio:.2f})')
+
+        for host, stats in transfer_statistics.top_hosts(
+                self.transfer_statistics_top_hosts):
+            self._logger.log(LogType.Info,
+                             f'+= {host} : {stats.pages} pages, ' + \
+                             f'{stats.bytes_saved} bytes saved ' + \
+                             f'(ratio {stats.compression_ratio:.2f})')
+
     def _store_results(self, event):
 
         details = event.body['details']
@@ -343,6 +521,21 @@ class ScrapeNodeApp:
 
         self._logger.log(LogType.Info, "Posting results to Page Store...")
 
+        settings = self._configuration.page_store_api
+
+        # An unchanged page has already had its last scanned time updated by
+        # the page scraper, there is nothing to store.
+        if event.body.get('skip_reason') == SkipReason.NotModified:
+            event_body = {
+                'task_id': task_id,
+                'is_successful': event.body['success']
+            }
+            send_complete_event = Event(EventID.SendCompleteTask,
+                                        event_body)
+            self._event_manager.queue_event(send_complete_event)
+            return
+
+        endpoint = f'{settings.api_endpoint}/webpage/add'
         message_body = {
             "general_settings":
             {
@@ -358,17 +551,22 @@ class ScrapeNodeApp:
             }
         }
 
-        settings = self._configuration.page_store_api
-        endpoint = f'{settings.api_endpoint}/webpage/add'
+        if details.etag:
+            message_body['general_settings']['etag'] = details.etag
+        if details.last_modified:
+            message_body['general_settings']['last_modified'] = \
+                details.last_modified
 
         headers = {
             'AuthKey': self._configuration.page_store_api.auth_key,
             'Content-type': MIMEType.JSON
         }
 
+        session = self._http_sessions.session(HttpEndpoint.PageStore)
+
         try:
-            response = requests.post(endpoint, headers=headers,
-                                     data=json.dumps(message_body))
+            response = session.post(endpoint, headers=headers,
+                                    data=json.dumps(message_body))
 
         except requests.exceptions.RequestException:
             err = 'Post results to Page Store failed, a retry will occur ' + \
@@ -383,12 +581,22 @@ class ScrapeNodeApp:
         # If OK or NotAcceptable (page url already exists) then just continue.
         if status_code in [HTTPStatusCode.OK, HTTPStatusCode.NotAcceptable]:
 
+            # A failed scrape has no links to add, the task is complete as
+            # it would just fail again.
             if not event.body['success']:
+                event_body = {
+                    'task_id': task_id,
+                    'is_successful': False
+                }
+                send_complete_event = Event(EventID.SendCompleteTask,
+                                            event_body)
+                self._event_manager.queue_event(send_complete_event)
                 return
 
             add_links_event_body = {
                 'links': event.body['links'],
-                'task_id' : task_id
+                'task_id' : task_id,
+                'success': event.body['success']
             }
             send_link_event = Event(EventID.AddLinksToQueue, add_links_event_body)
             self._event_manager.queue_event(send_link_event)
@@ -400,6 +608,54 @@ class ScrapeNodeApp:
             event.trigger_time = 10000
             self._event_manager.queue_event(event)
 
+    def _mark_not_modified(self, event):
+        """!@brief Tell the Page Store that a rescan found a page unchanged
+                   so that only its last scanned time is updated.
+        @param self The object pointer.
+        @param event Event with the domain and url path of the page.
+        @returns None.
+        """
+
+        settings = self._configuration.page_store_api
+        endpoint = f'{settings.api_endpoint}/webpage/not_modified'
+
+        headers = {
+            'AuthKey': settings.auth_key,
+            'Content-type': MIMEType.JSON
+        }
+
+        message_body = {
+            "domain": event.body['domain'],
+            "url_path": event.body['url_path']
+        }
+
+        session = self._http_sessions.session(HttpEndpoint.PageStore)
+
+        try:
+            response = session.post(endpoint, headers=headers,
+                                    data=json.dumps(message_body))
+
+        except requests.exceptions.RequestException:
+            err = 'Marking page not modified failed, a retry will occur ' + \
+                'in 10 seconds...'
+            self._logger.log(LogType.Critical, err)
+            event.trigger_time = 10000
+            self._event_manager.queue_event(event)
+            return
+
+        status_code = response.status_code
+
+        # NotAcceptable is a page the Page Store doesn't have, there is
+        # nothing to update.
+        if status_code not in [HTTPStatusCode.OK,
+                               HTTPStatusCode.NotAcceptable]:
+            err = 'Marking page not modified failed, status code ' + \
+                f'{status_code} ({response.text}), a retry will occur in ' + \
+                 '10 seconds...'
+            self._logger.log(LogType.Critical, err)
+            event.trigger_time = 10000
+            self._event_manager.queue_event(event)
+
     def _add_links_to_queue(self, event):
 
         self._logger.log(LogType.Info, 'Sending links to broker')
@@ -424,9 +680,11 @@ class ScrapeNodeApp:
             'links': links
         }
 
+        session = self._http_sessions.session(HttpEndpoint.ProcessingQueue)
+
         try:
-            response = requests.post(endpoint, headers=headers,
-                                     data=json.dumps(message_body))
+            response = session.post(endpoint, headers=headers,
+                                    data=json.dumps(message_body))
 
         except requests.exceptions.RequestException:
             err = 'Adding links to Processing Queue failed, a retry will ' + \
@@ -445,7 +703,8 @@ class ScrapeNodeApp:
                              'Links successfully added to the processing queue')
 
             event_body = {
-                'task_id': event.body['task_id']
+                'task_id': event.body['task_id'],
+                'is_successful': event.body['success']
             }
             send_complete_event = Event(EventID.SendCompleteTask, event_body)
             self._event_manager.queue_event(send_complete_event)
@@ -475,12 +734,14 @@ class ScrapeNodeApp:
 
         message_body = {
             "task_id": event_body['task_id'],
-            "is_successful": self._page_scraper.was_scrape_successful
+            "is_successful": event_body['is_successful']
         }
 
+        session = self._http_sessions.session(HttpEndpoint.BigBroker)
+
         try:
-            response = requests.post(endpoint, headers=headers,
-                                     data=json.dumps(message_body))
+            response = session.post(endpoint, headers=headers,
+                                    data=json.dumps(message_body))
 
         except requests.exceptions.RequestException:
             err = 'Sending task completion failed, a retry will occur ' + \
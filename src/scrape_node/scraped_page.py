@@ -17,8 +17,8 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 class ScrapedPage:
     ''' Class that encapsulate the data for a scraped page '''
-    __slots__ = ['_description', '_domain', '_page_hash', '_title',
-                 '_url_path']
+    __slots__ = ['_description', '_domain', '_etag', '_last_modified',
+                 '_page_hash', '_title', '_url_path']
 
     @property
     def description(self) -> str:
@@ -36,6 +36,22 @@ class ScrapedPage:
         """
         return self._domain
 
+    @property
+    def etag(self) -> str:
+        """!@brief ETag header the webpage was served with (Getter).
+        @param self The object pointer.
+        @returns str or None if there was no ETag.
+        """
+        return self._etag
+
+    @property
+    def last_modified(self) -> str:
+        """!@brief Last-Modified header the webpage was served with (Getter).
+        @param self The object pointer.
+        @returns str or None if there was no Last-Modified.
+        """
+        return self._last_modified
+
     @property
     def page_hash(self) -> str:
         """!@brief Hash of the scraped webpage (Getter).
@@ -60,7 +76,8 @@ class ScrapedPage:
         """
         return self._url_path
 
-    def __init__(self, description, domain, page_hash, title, url_path):
+    def __init__(self, description, domain, page_hash, title, url_path,
+                 etag=None, last_modified=None):
         """!@brief ScrapedPage data class constructor.
         @param self The object pointer.
         @param description Description of webpage .
@@ -68,11 +85,15 @@ class ScrapedPage:
         @param page_hash Hash of the scraped webpage.
         @param title Title of the webpage.
         @param url_path The URL part of the webpage.
+        @param etag Optional ETag header of the webpage.
+        @param last_modified Optional Last-Modified header of the webpage.
         @returns self.
         """
         #pylint: disable=too-many-arguments
         self._description = description
         self._domain = domain
+        self._etag = etag
+        self._last_modified = last_modified
         self._page_hash = page_hash
         self._title = title
         self._url_path = url_path
@@ -81,7 +102,9 @@ class ScrapedPage:
         return {
             'description': self._description,
             'domain': self._domain,
+            'etag': self._etag,
             'hash': self.page_hash,
+            'last_modified': self._last_modified,
             'title': self._title,
             'url': self._url_path
         }
@@ -18,7 +18,8 @@ from scraped_page import ScrapedPage
 
 class ScrapedPageBuilder:
     """ Class for building a ScrapedPage object """
-    __slots__ = ['_description', '_domain', '_hash', '_title', '_url_path']
+    __slots__ = ['_description', '_domain', '_etag', '_hash',
+                 '_last_modified', '_title', '_url_path']
 
     def set_description(self, value) -> object:
         """!@brief Set description parameter for page builder.
@@ -38,6 +39,15 @@ class ScrapedPageBuilder:
         self._domain = value
         return self
 
+    def set_etag(self, value):
+        """!@brief Set ETag header for page builder.
+        @param self The object pointer.
+        @param self New ETag, None if the page had none.
+        @returns instance of ScrapedPage with ETag set.
+        """
+        self._etag = value
+        return self
+
     def set_hash(self, value):
         """!@brief Set page hash for page builder.
         @param self The object pointer.
@@ -47,6 +57,15 @@ class ScrapedPageBuilder:
         self._hash = value
         return self
 
+    def set_last_modified(self, value):
+        """!@brief Set Last-Modified header for page builder.
+        @param self The object pointer.
+        @param self New Last-Modified, None if the page had none.
+        @returns instance of ScrapedPage with Last-Modified set.
+        """
+        self._last_modified = value
+        return self
+
     def set_title(self, value):
         """!@brief Set page title for page builder.
         @param self The object pointer.
@@ -68,7 +87,9 @@ class ScrapedPageBuilder:
     def __init__(self):
         self._description = ''
         self._domain = None
+        self._etag = None
         self._hash = None
+        self._last_modified = None
         self._title = ''
         self._url_path = None
 
@@ -90,7 +111,8 @@ class ScrapedPageBuilder:
             raise AttributeError('Missing url path attribute')
 
         return ScrapedPage(self._description, self._domain,  self._hash,
-                           self._title, self._url_path)
+                           self._title, self._url_path, self._etag,
+                           self._last_modified)
 
     def reset(self) -> None:
         """!@brief Reset the builder properies back to default.
@@ -100,6 +122,8 @@ class ScrapedPageBuilder:
 
         self._description = ''
         self._domain = None
+        self._etag = None
         self._hash = None
+        self._last_modified = None
         self._title = ''
         self._url_path = None
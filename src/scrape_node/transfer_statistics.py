@@ -0,0 +1,142 @@
+'''
+Copyright 2021 Siterummage
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+'''
+from collections import OrderedDict
+import threading
+
+class HostTransferStatistics:
+    ''' Bytes read off the wire and bytes after decoding for a host '''
+    __slots__ = ['_decoded_bytes', '_pages', '_wire_bytes']
+
+    @property
+    def bytes_saved(self) -> int:
+        """!@brief Bytes compression saved on the wire (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return max(self._decoded_bytes - self._wire_bytes, 0)
+
+    @property
+    def compression_ratio(self) -> float:
+        """!@brief Decoded bytes per byte read off the wire (Getter).
+        @param self The object pointer.
+        @returns float, 1.0 if nothing has been read.
+        """
+        if not self._wire_bytes:
+            return 1.0
+        return self._decoded_bytes / self._wire_bytes
+
+    @property
+    def decoded_bytes(self) -> int:
+        """!@brief Bytes after decoding (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._decoded_bytes
+
+    @property
+    def pages(self) -> int:
+        """!@brief Number of pages read (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._pages
+
+    @property
+    def wire_bytes(self) -> int:
+        """!@brief Bytes read off the wire (Getter).
+        @param self The object pointer.
+        @returns int.
+        """
+        return self._wire_bytes
+
+    def __init__(self):
+        self._decoded_bytes = 0
+        self._pages = 0
+        self._wire_bytes = 0
+
+    def record(self, wire_bytes, decoded_bytes) -> None:
+        """!@brief Record the bytes of a page read.
+        @param self The object pointer.
+        @param wire_bytes Bytes read off the wire.
+        @param decoded_bytes Bytes after decoding.
+        @returns None.
+        """
+        self._decoded_bytes += decoded_bytes
+        self._pages += 1
+        self._wire_bytes += wire_bytes
+
+class TransferStatistics:
+    ''' Compression statistics of the pages read by the scrape node, kept in
+        total and for each of the most recently read hosts. '''
+    __slots__ = ['_hosts', '_lock', '_max_hosts', '_totals']
+
+    @property
+    def totals(self) -> HostTransferStatistics:
+        """!@brief Statistics for all of the pages read (Getter).
+        @param self The object pointer.
+        @returns HostTransferStatistics.
+        """
+        return self._totals
+
+    def __init__(self, max_hosts=1000):
+        """!@brief TransferStatistics class constructor.
+        @param self The object pointer.
+        @param max_hosts Number of hosts statistics are kept for.
+        @returns TransferStatistics instance.
+        """
+        self._hosts = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_hosts = max_hosts
+        self._totals = HostTransferStatistics()
+
+    def record(self, host, wire_bytes, decoded_bytes) -> None:
+        """!@brief Record the bytes of a page read, this can be called from
+                   any thread.
+        @param self The object pointer.
+        @param host Host the page was read from.
+        @param wire_bytes Bytes read off the wire.
+        @param decoded_bytes Bytes after decoding.
+        @returns None.
+        """
+
+        with self._lock:
+            self._totals.record(wire_bytes, decoded_bytes)
+
+            stats = self._hosts.get(host)
+            if stats:
+                self._hosts.move_to_end(host)
+
+            else:
+                stats = HostTransferStatistics()
+                self._hosts[host] = stats
+                if len(self._hosts) > self._max_hosts:
+                    self._hosts.popitem(last=False)
+
+            stats.record(wire_bytes, decoded_bytes)
+
+    def top_hosts(self, count) -> list:
+        """!@brief Get the hosts compression has saved the most bytes for.
+        @param self The object pointer.
+        @param count Maximum number of hosts to get.
+        @returns List of (host, HostTransferStatistics) tuples.
+        """
+
+        with self._lock:
+            hosts = list(self._hosts.items())
+
+        hosts.sort(key=lambda entry: entry[1].bytes_saved, reverse=True)
+        return hosts[:count]
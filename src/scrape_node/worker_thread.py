@@ -14,13 +14,15 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 '''
+import functools
 import json
 import time
 from threading import Thread
 from common.logger import Logger, LogType
 from common.messaging_queue import MessagingQueue
 from common.messaging_queue_settings import MessagingQueueSettings
-from page_scraper import PageScraper
+from async_fetch_engine import AsyncFetchEngine
+from page_scraper import PageScraper, SkipReason
 
 class WorkerThread(Thread):
     """ Thread to handle RabbitMQ Messaging Queue """
@@ -36,7 +38,10 @@ class WorkerThread(Thread):
         return self._queue_consumer
 
     def __init__(self, settings : MessagingQueueSettings,
-                 logger : Logger, scraper : PageScraper) -> None:
+                 logger : Logger, scraper : PageScraper,
+                 fetch_engine : AsyncFetchEngine = None,
+                 node_id : str = None) -> None:
+        #pylint: disable=too-many-arguments
         super().__init__()
 
         self._logger = logger
@@ -44,9 +49,18 @@ class WorkerThread(Thread):
         self._queue_consumer.set_message_processor(self._receive_new_task)
         self._thread_running = False
         self._page_scraper = scraper
+        self._fetch_engine = fetch_engine
+        self._node_id = node_id
         self._reconnect_delay = 0
         self._settings = settings
 
+        # Let the broker deliver at least as many tasks as the fetch engine can
+        # have in flight, otherwise the engine would sit partly idle.
+        if self._fetch_engine:
+            self._queue_consumer.prefetch_count = max(
+                self._queue_consumer.prefetch_count,
+                self._fetch_engine.max_in_flight)
+
     def run(self) -> None:
         """!@brief Overridable method called when the thread runs, it will keep
                    running until _thread_running is set to false.  If there is
@@ -83,15 +97,75 @@ class WorkerThread(Thread):
             time.sleep(reconnect_delay)
             self._queue_consumer.reset_for_reconnect()
 
-    def _receive_new_task(self, _channel, method, _properties, body):
+    def _receive_new_task(self, channel, method, _properties, body):
         msg_body = json.loads(body)
         url = msg_body['url']
         task_type = msg_body['task_type']
         task_id = msg_body['task_id']
+        etag = msg_body.get('etag')
+        last_modified = msg_body.get('last_modified')
 
         self._logger.log(LogType.Info,
                          f'Initiated new scrape task for url {url}')
-        links, results = self._page_scraper.scrape_page(url, task_type, task_id)
+
+        # The broker's lease on the task only starts timing out once it is
+        # known that a node has taken the task, and which node it is.
+        started_body = {
+            'task_id': task_id,
+            'started': True,
+            'node_id': self._node_id
+        }
+        self._queue_consumer.publish_message('', self.processed_results_queue,
+                                             json.dumps(started_body))
+
+        if self._fetch_engine:
+            on_complete = functools.partial(self._on_scrape_complete, channel,
+                                            method.delivery_tag, url, task_id)
+            self._fetch_engine.submit(url, task_type, task_id, on_complete,
+                                      etag, last_modified)
+            return
+
+        links, results = self._page_scraper.scrape_page(url, task_type, task_id,
+                                                        etag, last_modified)
+        self._publish_results(channel, method.delivery_tag, links, results)
+
+    def _on_scrape_complete(self, channel, delivery_tag, url, task_id, links,
+                            results):
+        """!@brief Completion callback for the fetch engine, it is called on
+                   the fetch engine thread so publishing the results is handed
+                   over to the messaging queue ioloop thread.  A scrape that
+                   raised has no results, a failed result is published for
+                   it so the task isn't acknowledged without one.
+        @param self The object pointer.
+        @param channel Channel the task was delivered on.
+        @param delivery_tag Delivery tag of the task.
+        @param url URL that was scraped.
+        @param task_id Unique identifier of the task.
+        @param links List of links scraped from the page.
+        @param results Results of the scrape, None if the scrape raised.
+        @returns None.
+        """
+        #pylint: disable=too-many-arguments
+
+        if results is None:
+            results = self._page_scraper.failed_results(
+                url, task_id, SkipReason.ScrapeFailed)
+
+        callback = functools.partial(self._publish_results, channel,
+                                     delivery_tag, links, results)
+        if not self._queue_consumer.add_callback_threadsafe(callback):
+            self._logger.log(LogType.Warn,
+                             'Messaging queue disconnected, results for ' + \
+                             'task will be discarded and task redelivered')
+
+    def _publish_results(self, channel, delivery_tag, links, results):
+        #pylint: disable=too-many-arguments
+
+        # A task delivered on a channel that has since closed has already been
+        # requeued by the broker, its delivery tag isn't valid any more.
+        if not channel.is_open:
+            return
+
         if links:
             body = { 'link': links }
             print(body)
@@ -99,11 +173,12 @@ class WorkerThread(Thread):
                                                  self.processed_results_queue,
                                                  json.dumps(body))
 
-        self._queue_consumer.publish_message('', 
-                                             self.processed_results_queue,
-                                             json.dumps(results))
+        if results:
+            self._queue_consumer.publish_message('', 
+                                                 self.processed_results_queue,
+                                                 json.dumps(results))
 
-        self._queue_consumer.acknowledge_message(method.delivery_tag)
+        self._queue_consumer.acknowledge_message(delivery_tag, channel)
 
     def _get_reconnect_delay(self):
         if self._queue_consumer.was_consuming: